@@ -1,25 +1,32 @@
 # app.py
 from flask import (
     Flask, render_template, jsonify, request, 
-    redirect, url_for, flash
+    redirect, url_for, flash, Response, stream_with_context
 )
 from flask_login import (
     LoginManager, UserMixin, login_user, 
     logout_user, login_required, current_user
 )
 from flask_wtf import FlaskForm
+from flask_wtf.csrf import generate_csrf, validate_csrf
+from wtforms import ValidationError
 from wtforms import StringField, PasswordField, SubmitField
 from wtforms.validators import DataRequired, Email, EqualTo
 from flask_bcrypt import Bcrypt
 from flask_mail import Mail, Message
 import psycopg2
 import psycopg2.extras
-from config import DATABASE_CONFIG, EMAIL_CONFIG
+from config import ADMIN_EMAILS, EMAIL_CONFIG, ENRICHMENT_CONFIG
 # from tasks import scrape_jobs_task
-from database_setup import setup_database
+import bm25
+import db_pool
+import migrations
 import os
+from functools import wraps
 # --- NEW IMPORTS ---
-import re
+import json
+import base64
+import math
 from werkzeug.utils import secure_filename
 
 nlp = None # Placeholder if needed, but we don't use it anymore
@@ -53,13 +60,14 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 # Create the upload folder if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# --- Auto-initialize database on startup (FREE - no shell needed!) ---
+# --- Schema check on startup (FREE - no shell needed!) ---
+# One version query per worker; pending migrations are applied once, under an
+# advisory lock, unless DB_AUTO_MIGRATE=false (then run `python migrations.py`).
 try:
-    setup_database()
-    print("✅ Database initialized automatically on startup")
+    with db_pool.db_connection() as _conn:
+        print(f"✅ Database schema at version {migrations.check_schema(_conn)}")
 except Exception as e:
-    print(f"⚠️  Database initialization warning: {e}")
-    print("   (This is OK if tables already exist)")
+    print(f"⚠️  Database schema check failed: {e}")
 
 # --- Background Scraper (No Worker Service Needed - 100% FREE!) ---
 import threading
@@ -69,7 +77,21 @@ import sys
 
 # Import scraping functions from tasks.py
 # Import scraping functions from tasks.py
-from tasks import scrape_jobs, build_search_queries_from_skills
+from tasks import (
+    scrape_jobs, scrape_many, plan_scrape_cycle, fan_out_results, KnownLinks, find_known_links,
+    build_search_queries_from_skills, resolve_sources
+)
+from source_registry import registry as source_registry
+from session_pool import session_pool
+from ingestion import ingest_jobs
+from retention import expire_stale_jobs
+from matches import calculate_job_match_score, refresh_for_jobs, refresh_for_user
+from batch_scoring import alert_matches
+from enrichment import enrich_descriptions
+from streaming import stream_rows, ndjson
+from skill_index import skill_index
+from skill_matcher import extract_skills_from_text
+from locations import is_known_location, location_filter as location_filter_sql
 
 def run_background_scraper():
     """
@@ -111,6 +133,10 @@ def run_background_scraper():
             """)
             users = cursor.fetchall()
             
+            # Sources page deeper until they run into jobs we already have;
+            # known links are checked against the jobs table in batches
+            known_links = KnownLinks(lookup=lambda links: find_known_links(conn, links))
+            
             if not users:
                 print("⚠️  No users with skills found. Using default Python queries.", flush=True)
                 sys.stdout.flush()
@@ -118,25 +144,20 @@ def run_background_scraper():
                 default_locations = ["Bangalore, Karnataka", "Delhi", "Mumbai, Maharashtra", "Remote"]
                 queries = ["python developer", "python engineer", "python backend developer"]
                 
+                pairs = [(query, location) for location in default_locations[:3] for query in queries]
                 all_jobs = []
-                for location in default_locations[:3]:
-                    for query in queries:
-                        try:
-                            print(f"  Scraping: {query} in {location}", flush=True)
-                            sys.stdout.flush()
-                            # scrape_jobs handles all errors internally
-                            jobs = scrape_jobs(query=query, location=location, max_jobs=5)
-                            if jobs:
-                                all_jobs.extend(jobs)
-                                print(f"    Found {len(jobs)} jobs", flush=True)
-                                sys.stdout.flush()
-                            # Delay is already in scrape_jobs
-                            time.sleep(1)  # Small additional delay
-                        except Exception as e:
-                            # scrape_jobs should never raise, but just in case
-                            print(f"  Unexpected error scraping {query} in {location}: {str(e)[:50]}", flush=True)
-                            sys.stdout.flush()
-                            continue
+                try:
+                    # scrape_many handles all errors internally
+                    for (query, location), jobs in scrape_many(pairs, max_jobs=5, known_links=known_links).items():
+                        print(f"  Scraped: {query} in {location}", flush=True)
+                        if jobs:
+                            all_jobs.extend(jobs)
+                            print(f"    Found {len(jobs)} jobs", flush=True)
+                        sys.stdout.flush()
+                except Exception as e:
+                    # scrape_many should never raise, but just in case
+                    print(f"  Unexpected error scraping default queries: {str(e)[:50]}", flush=True)
+                    sys.stdout.flush()
             else:
                 print(f"✅ Found {len(users)} users with skills. Scraping personalized jobs...", flush=True)
                 sys.stdout.flush()
@@ -147,55 +168,36 @@ def run_background_scraper():
                     "Mumbai, Maharashtra", "Chennai, Tamil Nadu", "Remote"
                 ]
                 
+                # Plan the whole cycle first so a search shared by several
+                # users (same query and location) is only scraped once
+                plan = plan_scrape_cycle(users, default_locations)
+                requested = sum(len(user_ids) for user_ids in plan.values())
+                print(f"  Planned {len(plan)} unique searches (from {requested} per-user searches)", flush=True)
+                sys.stdout.flush()
+                
                 all_jobs = []
+                results = {}
+                try:
+                    # scrape_many handles all errors internally
+                    results = scrape_many(list(plan), max_jobs=5, known_links=known_links)
+                except Exception as e:
+                    # scrape_many should never raise, but just in case
+                    print(f"  Unexpected error scraping planned searches: {str(e)[:50]}", flush=True)
+                    sys.stdout.flush()
                 
-                # Scrape jobs for each user based on their skills
-                for user in users:
-                    user_skills = user['skills']
-                    preferred_location = user.get('preferred_location')
-                    
-                    if not user_skills:
-                        continue
-                    
-                    # Build search queries from user skills
-                    queries = build_search_queries_from_skills(user_skills)
-                    
-                    if not queries:
-                        continue
-                    
-                    # Determine locations to scrape
-                    if preferred_location:
-                        if preferred_location.lower() == "india":
-                            locations = default_locations
-                        elif preferred_location.lower() == "remote":
-                            locations = ["Remote"]
-                        else:
-                            locations = [preferred_location] + default_locations[:2]
-                    else:
-                        locations = default_locations[:5]
-                    
-                    print(f"  Scraping for user {user['email']} with skills: {user_skills[:3]}", flush=True)
+                for (query, location), jobs in results.items():
+                    print(f"    Scraped: {query} in {location}", flush=True)
+                    if jobs:
+                        all_jobs.extend(jobs)
+                        print(f"      Found {len(jobs)} jobs", flush=True)
                     sys.stdout.flush()
-                    
-                    # Scrape jobs for this user's skills and locations
-                    for location in locations[:3]:  # Limit to 3 locations per user
-                        for query in queries[:3]:  # Limit to 3 queries per location
-                            try:
-                                print(f"    Scraping: {query} in {location}", flush=True)
-                                sys.stdout.flush()
-                                # scrape_jobs handles all errors internally
-                                jobs = scrape_jobs(query=query, location=location, max_jobs=5)
-                                if jobs:
-                                    all_jobs.extend(jobs)
-                                    print(f"      Found {len(jobs)} jobs", flush=True)
-                                    sys.stdout.flush()
-                                # Delay is already in scrape_jobs, but add small extra delay
-                                time.sleep(1)  # Small additional delay
-                            except Exception as e:
-                                # scrape_jobs should never raise, but just in case
-                                print(f"    Unexpected error scraping {query} in {location}: {str(e)[:50]}", flush=True)
-                                sys.stdout.flush()
-                                continue
+                
+                # Fan results back out to every user who needed each search
+                user_jobs = fan_out_results(plan, results)
+                for user in users:
+                    if user['id'] in user_jobs:
+                        print(f"  {len(user_jobs[user['id']])} jobs for user {user['email']} (skills: {user['skills'][:3]})", flush=True)
+                sys.stdout.flush()
             
             # Remove duplicates based on apply_link
             seen_links = set()
@@ -208,23 +210,32 @@ def run_background_scraper():
             print(f"✅ Found {len(unique_jobs)} unique jobs from Indeed (from {len(all_jobs)} total)", flush=True)
             sys.stdout.flush()
             
-            # Save unique jobs to database
-            new_jobs_count = 0
-            for job in unique_jobs:
-                try:
-                    cursor.execute(
-                        "INSERT INTO jobs (title, company, location, apply_link) VALUES (%s, %s, %s, %s) ON CONFLICT (apply_link) DO NOTHING;",
-                        (job['title'], job['company'], job['location'], job['apply_link'])
-                    )
-                    if cursor.rowcount > 0:
-                        new_jobs_count += 1
-                except Exception as e:
-                    print(f"    Error inserting job: {e}", flush=True)
-                    sys.stdout.flush()
-                    continue
+            # Save unique jobs to database in bulk; RETURNING tells us which were new
+            new_jobs = ingest_jobs(cursor, unique_jobs)
+            new_jobs_count = len(new_jobs)
+            
+            # Score only the new jobs against every user's skills, so
+            # personalized search reads precomputed matches
+            matches_added = refresh_for_jobs(cursor, [job['apply_link'] for job in new_jobs])
+            print(f"✅ Stored {matches_added} new user/job matches", flush=True)
+            
+            # Keep the BM25 term and corpus statistics current (see bm25.py)
+            bm25.index_new_jobs(cursor, [job['apply_link'] for job in new_jobs])
+            
+            # Every alert-enabled user's best new jobs, scored in one batch
+            alerts = alert_matches(cursor, [job['apply_link'] for job in new_jobs])
             
             conn.commit()
             cursor.close()
+            
+            for email, skills, matched_jobs in alerts:
+                send_job_alert_email(email, skills, matched_jobs)
+            
+            # Expire postings no scrape has returned for a while; skipped when
+            # the cycle came back empty (e.g. every source blocked) so an
+            # outage can't age out the whole table
+            if unique_jobs:
+                expire_stale_jobs(conn, on_expired=skill_index.remove_jobs)
             conn.close()
             
             last_scrape_time = datetime.now()
@@ -237,8 +248,34 @@ def run_background_scraper():
             import traceback
             traceback.print_exc()
             sys.stdout.flush()
+            # Don't let a failed cycle keep its connection checked out
+            db_pool.release_thread_connections()
             time.sleep(60)  # Wait 1 minute before retrying
 
+def build_skill_index():
+    """Loads the skill index in the background; until it is ready, rescoring scans the jobs table."""
+    try:
+        with db_pool.db_connection() as conn:
+            skill_index.build(conn)
+    except Exception as e:
+        print(f"⚠️  Skill index build failed: {e}", flush=True)
+
+threading.Thread(target=build_skill_index, daemon=True).start()
+
+def run_enrichment_worker():
+    """Fetches missing job descriptions every ENRICHMENT_INTERVAL seconds, separately from scraping."""
+    print("📝 Description enrichment started", flush=True)
+    while True:
+        time.sleep(ENRICHMENT_CONFIG['INTERVAL'])
+        try:
+            with db_pool.db_connection() as conn:
+                enrich_descriptions(conn)
+        except Exception as e:
+            print(f"⚠️  Description enrichment failed: {e}", flush=True)
+
+if ENRICHMENT_CONFIG['ENABLED']:
+    threading.Thread(target=run_enrichment_worker, daemon=True).start()
+
 # Start background scraper in a separate thread
 try:
     scraper_thread = threading.Thread(target=run_background_scraper, daemon=True)
@@ -308,32 +345,16 @@ class LoginForm(FlaskForm):
 
 # --- Database Connection ---
 def get_db_connection():
-    """Establishes a connection to the PostgreSQL database."""
-    conn = psycopg2.connect(**DATABASE_CONFIG)
-    return conn
-
-def run_sendgrid_migration():
-    """Auto-migration: Add SendGrid columns if they don't exist."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Add SendGrid columns (IF NOT EXISTS prevents errors if already added)
-        cursor.execute("""
-            ALTER TABLE users 
-            ADD COLUMN IF NOT EXISTS sendgrid_api_key TEXT,
-            ADD COLUMN IF NOT EXISTS from_email TEXT;
-        """)
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        print("✅ Database migration complete: SendGrid columns added")
-    except Exception as e:
-        print(f"⚠️ Migration error (probably already exists): {e}")
+    """
+    Checks out a pooled connection to the PostgreSQL database.
+    conn.close() returns it to the pool rather than closing it.
+    """
+    return db_pool.get_connection()
 
-# Run migration on app startup
-run_sendgrid_migration()
+@app.teardown_request
+def release_db_connections(exc=None):
+    """Returns any connection a request forgot to close (e.g. on an error path)."""
+    db_pool.release_thread_connections()
 
 # --- Helper Function for File Upload ---
 def allowed_file(filename):
@@ -363,130 +384,6 @@ def extract_text_from_docx(filepath):
     except Exception as e:
         raise Exception(f"Error reading DOCX: {str(e)}")
 
-def extract_skills_from_text(text):
-    """
-    Extract technical skills from resume text, filtering out non-skills like
-    company names, job titles, dates, and descriptive phrases.
-    """
-    if not text:
-        return []
-    
-    skills_found = set()
-    text_lower = text.lower()
-    
-    # Comprehensive technical skills database
-    technical_skills = {
-        # Programming Languages
-        'python', 'java', 'javascript', 'typescript', 'html', 'css', 'go', 'rust', 
-        'c++', 'c#', '.net', 'php', 'ruby', 'swift', 'kotlin', 'dart',
-        # Web Frameworks & Libraries
-        'react', 'angular', 'vue', 'next.js', 'nuxt.js', 'svelte', 
-        'node.js', 'express', 'django', 'flask', 'fastapi', 'spring', 
-        'laravel', 'symfony', 'rails', 'asp.net', 'ember', 'backbone',
-        # Databases
-        'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'cassandra', 
-        'dynamodb', 'elasticsearch', 'neo4j', 'sqlite', 'oracle',
-        # Cloud & DevOps
-        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 
-        'jenkins', 'gitlab ci', 'github actions', 'ansible', 'puppet',
-        'chef', 'vagrant', 'consul', 'vault',
-        # Data Science & ML
-        'pandas', 'numpy', 'matplotlib', 'seaborn', 'plotly', 
-        'scikit-learn', 'scipy', 'tensorflow', 'pytorch', 'keras',
-        'xgboost', 'lightgbm', 'opencv', 'nltk', 'spaCy',
-        # Machine Learning & AI
-        'machine learning', 'deep learning', 'neural networks', 
-        'computer vision', 'nlp', 'natural language processing',
-        # Frontend Tools
-        'sass', 'scss', 'less', 'webpack', 'babel', 'gulp', 'grunt',
-        'tailwind css', 'bootstrap', 'material-ui', 'chakra ui',
-        # Testing
-        'jest', 'mocha', 'jasmine', 'cypress', 'selenium', 'pytest',
-        'unittest', 'junit', 'testng',
-        # Version Control & Tools
-        'git', 'svn', 'mercurial', 'perforce',
-        # Agile & Project Management
-        'agile', 'scrum', 'kanban', 'jira', 'confluence', 'trello',
-        'asana', 'monday.com',
-        # APIs & Protocols
-        'rest', 'graphql', 'soap', 'grpc', 'websocket', 'rest api',
-        # Operating Systems
-        'linux', 'unix', 'bash', 'powershell', 'shell scripting',
-        # Other Tools
-        'postman', 'insomnia', 'swagger', 'docker compose', 'kubectl',
-        'helm', 'terraform', 'vagrant', 'vagrantfile'
-    }
-    
-    # Only look for technical skills in the text
-    for skill in technical_skills:
-        if skill in text_lower:
-            skills_found.add(skill.title() if skill.islower() else skill)
-    
-    # Extract skills from "Skills:" sections with better filtering
-    skills_pattern = r'(?:technical\s+)?skills?[:\-]?\s*([^\n]{20,500})'
-    matches = re.findall(skills_pattern, text_lower, re.IGNORECASE)
-    
-    for match in matches:
-        # Clean up prefixes and split
-        clean_match = re.sub(r'^(programming|tools?|frameworks?|databases?|libraries?):\s*', '', match, flags=re.IGNORECASE)
-        
-        # Split by various delimiters
-        potential_skills = re.split(r'[,;•\n]', clean_match)
-        
-        for skill in potential_skills:
-            skill = skill.strip().lower()
-            
-            # Filter out non-skills
-            if not skill or len(skill) < 2 or len(skill) > 40:
-                continue
-            
-            # Skip if it contains job-related keywords
-            if any(word in skill for word in ['intern', 'junior', 'senior', 'developer', 
-                                                'engineer', 'manager', 'analyst', 'qa', 'quality']):
-                continue
-            
-            # Skip dates, company names, and long descriptions
-            if re.search(r'\d{4}', skill):  # Contains year
-                continue
-            
-            # Skip if it's a library name that we already know about
-            if any(sk in skill for sk in ['library', 'libraries', 'framework', 'tool', 'tools']):
-                continue
-            
-            # Only add if it's in our technical skills list or looks like one
-            if any(ts in skill or skill in ts for ts in technical_skills):
-                skills_found.add(skill.title())
-    
-    # Clean up results - remove any remaining non-skills
-    filtered_skills = []
-    for skill in skills_found:
-        skill_lower = skill.lower()
-        
-        # Skip library names that look like code
-        if skill_lower.startswith('py') and len(skill) > 8:
-            continue
-        
-        # Skip if it looks like a company name (has 'ltd', 'inc', 'corp', etc.)
-        if any(word in skill_lower for word in ['ltd', 'inc', 'corp', 'international', 'global']):
-            continue
-        
-        # Skip job titles
-        if any(word in skill_lower for word in ['intern', 'associate', 'specialist', 'officer']):
-            continue
-        
-        # Skip dates and time periods
-        if re.search(r'\d{4}|\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+\d{4}\b', skill_lower):
-            continue
-        
-        # Skip generic tools that aren't technical skills
-        if skill_lower in ['ms office', 'office', 'windows', 'mac', 'linux operating system']:
-            continue
-        
-        filtered_skills.append(skill)
-    
-    # Return sorted, unique skills
-    return sorted(list(set(filtered_skills)))
-
 # --- Core App Routes ---
 @app.route('/')
 @login_required
@@ -555,6 +452,8 @@ def upload_resume():
                 "UPDATE users SET skills = %s WHERE id = %s;", 
                 (skills, current_user.id)
             )
+            # New skills, new scores: recompute this user's precomputed matches
+            refresh_for_user(cursor, current_user.id, skills)
             conn.commit()
             cursor.close()
             conn.close()
@@ -649,46 +548,237 @@ def logout():
     logout_user()
     return redirect(url_for('login'))
 
-def calculate_job_match_score(job_data, user_skills):
+# Columns returned to the UI (leaves out the search_vector used for full-text search)
+JOB_COLUMNS = "jobid, title, company, location, description, apply_link, first_seen, last_seen"
+
+# /search page size; ?limit= is clamped to MAX_PAGE_SIZE
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_search_cursor(position):
+    """Opaque next_cursor token for a keyset position (a small dict ending in the jobid)."""
+    raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+# Values of a cursor's 'mode': the text-search modes, BM25 and personalized
+SEARCH_CURSOR_MODES = ('fts', 'fts_recent', 'substring', 'recent', 'bm25', 'personalized')
+
+def _is_cursor_number(value, types=(int, float)):
+    # bool is an int subclass, and JSON allows NaN and Infinity
+    return isinstance(value, types) and not isinstance(value, bool) and math.isfinite(value)
+
+def decode_search_cursor(token):
+    """Inverse of encode_search_cursor. Returns None for no cursor, raises ValueError for a bad one."""
+    if not token:
+        return None
+    try:
+        position = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, dict) or not _is_cursor_number(position.get('id'), int):
+        raise ValueError("Invalid cursor")
+    # Every key goes into the keyset query as a parameter, so a hand-edited
+    # cursor must fail here rather than as a database error
+    if position.get('mode', 'recent') not in SEARCH_CURSOR_MODES:
+        raise ValueError("Invalid cursor")
+    for key in ('score', 'rank'):
+        if key in position and not _is_cursor_number(position[key]):
+            raise ValueError("Invalid cursor")
+    return position
+
+def search_jobs_text(conn, cursor, query, location_filter="", location_params=(), match='fts',
+                     after=None, limit=DEFAULT_PAGE_SIZE, sort='relevance'):
     """
-    Calculate how well a job matches the user's skills.
-    Returns a match score (0-100) and list of matched skills.
+    Text search over the jobs table, one keyset page at a time.
+
+    Uses the GIN-indexed search_vector with websearch_to_tsquery, ordered by
+    (ts_rank, jobid). Falls back to the old substring ILIKE match (newest
+    first) when asked to (match='substring'), when full-text finds nothing
+    (e.g. a partial word typed so far) or when the search_vector column isn't
+    there yet. `after` is the decoded cursor of the previous page, which also
+    pins the mode so later pages don't switch between the two.
+
+    sort='recent' orders full-text matches newest first instead of by rank
+    (jobid order is first_seen order, since first_seen is only set on insert).
+
+    Returns (rows, mode) with up to limit + 1 rows, so the caller can tell
+    whether there is a next page.
     """
-    if not user_skills:
-        return 0, []
-    
-    matched_skills = []
-    job_text = f"{job_data.get('title', '')} {job_data.get('company', '')}".lower()
-    
-    # Check each user skill against job title and company
-    for skill in user_skills:
-        skill_lower = skill.lower()
-        # Check if skill appears in job title or company name
-        if skill_lower in job_text:
-            matched_skills.append(skill)
-    
-    # Calculate score: percentage of user skills that matched
-    if len(user_skills) > 0:
-        score = (len(matched_skills) / len(user_skills)) * 100
+    if after:
+        mode = after.get('mode')
+    elif match == 'substring':
+        mode = 'substring'
     else:
-        score = 0
-    
-    return round(score, 1), matched_skills
+        mode = 'fts_recent' if sort == 'recent' else 'fts'
+    if mode in ('fts', 'fts_recent'):
+        keyset, keyset_params = "", ()
+        order = "rank DESC, jobid DESC"
+        if mode == 'fts_recent':
+            order = "jobid DESC"
+            if after is not None:
+                keyset = " AND jobid < %s"
+                keyset_params = (after['id'],)
+        elif after is not None:
+            # Compare as real, the type ts_rank returns, so ties round-trip exactly
+            keyset = " AND (ts_rank(search_vector, tsq), jobid) < (%s::real, %s)"
+            keyset_params = (after.get('rank', 0), after['id'])
+        try:
+            cursor.execute(
+                f"""
+                SELECT {JOB_COLUMNS}, ts_rank(search_vector, tsq) AS rank
+                FROM jobs, websearch_to_tsquery('english', %s) AS tsq
+                WHERE search_vector @@ tsq {location_filter}{keyset}
+                ORDER BY {order}
+                LIMIT %s
+                """,
+                (query,) + tuple(location_params) + keyset_params + (limit + 1,)
+            )
+            jobs = cursor.fetchall()
+            if jobs or after is not None:
+                return jobs, mode
+        except psycopg2.Error as e:
+            print(f"⚠️ Full-text search failed, using substring match: {e}")
+            conn.rollback()
+
+    search_term = f'%{query}%'
+    keyset, keyset_params = "", ()
+    if after is not None:
+        keyset = " AND jobid < %s"
+        keyset_params = (after['id'],)
+    cursor.execute(
+        f"SELECT {JOB_COLUMNS} FROM jobs WHERE (title ILIKE %s OR company ILIKE %s OR location ILIKE %s) "
+        f"{location_filter}{keyset} ORDER BY jobid DESC LIMIT %s",
+        (search_term, search_term, search_term) + tuple(location_params) + keyset_params + (limit + 1,)
+    )
+    return cursor.fetchall(), 'substring'
+
+def search_jobs_recent(cursor, location_filter="", location_params=(), after=None, limit=DEFAULT_PAGE_SIZE):
+    """Jobs without a text query, newest first, one keyset page (up to limit + 1 rows)."""
+    keyset, keyset_params = "", ()
+    if after is not None:
+        keyset = " AND jobid < %s"
+        keyset_params = (after['id'],)
+    cursor.execute(
+        f"SELECT {JOB_COLUMNS} FROM jobs WHERE 1=1 {location_filter}{keyset} ORDER BY jobid DESC LIMIT %s",
+        tuple(location_params) + keyset_params + (limit + 1,)
+    )
+    return cursor.fetchall()
+
+def search_jobs_personalized(cursor, user_id, location_filter="", location_params=(), after=None,
+                             limit=DEFAULT_PAGE_SIZE, min_score=0):
+    """
+    Personalized page from the precomputed user_job_matches table, best
+    (score, jobid) first, as dicts with match_score and matched_skills.
+
+    Matching jobs come from the (user_id, score DESC, job_id DESC) index, so
+    Postgres reads only the top limit + 1 entries and stops. With a min_score
+    the range read ends at that score and nothing below it is fetched;
+    otherwise, once matches run out, the page continues with the user's
+    non-matching jobs (score 0), newest first. Returns up to limit + 1 rows.
+    """
+    jobs = []
+    after_score = after.get('score', 0) if after else None
+    if after is None or after_score > 0:
+        keyset, keyset_params = "", ()
+        if min_score > 0:
+            keyset = " AND m.score >= %s"
+            keyset_params = (min_score,)
+        if after is not None:
+            keyset += " AND (m.score, m.job_id) < (%s, %s)"
+            keyset_params += (after_score, after['id'])
+        cursor.execute(
+            f"""
+            SELECT {JOB_COLUMNS}, m.score AS match_score, m.matched_skills
+            FROM user_job_matches m JOIN jobs ON jobs.jobid = m.job_id
+            WHERE m.user_id = %s {location_filter}{keyset}
+            ORDER BY m.score DESC, m.job_id DESC
+            LIMIT %s
+            """,
+            (user_id,) + tuple(location_params) + keyset_params + (limit + 1,)
+        )
+        jobs = [dict(row) for row in cursor.fetchall()]
+    if len(jobs) > limit or min_score > 0:
+        return jobs
+
+    keyset, keyset_params = "", ()
+    if after is not None and after_score <= 0:
+        keyset = " AND jobid < %s"
+        keyset_params = (after['id'],)
+    cursor.execute(
+        f"""
+        SELECT {JOB_COLUMNS} FROM jobs
+        WHERE NOT EXISTS (SELECT 1 FROM user_job_matches m WHERE m.user_id = %s AND m.job_id = jobs.jobid)
+        {location_filter}{keyset}
+        ORDER BY jobid DESC
+        LIMIT %s
+        """,
+        (user_id,) + tuple(location_params) + keyset_params + (limit + 1 - len(jobs),)
+    )
+    for row in cursor.fetchall():
+        jobs.append(dict(row, match_score=0, matched_skills=[]))
+    return jobs
+
+def _page_response(jobs, limit, cursor_for, hidden=()):
+    """
+    Trims a limit + 1 result to one page and adds next_cursor when there is
+    more. `hidden` keys (used only to build the cursor) are dropped from jobs.
+    """
+    page = jobs[:limit]
+    next_cursor = encode_search_cursor(cursor_for(page[-1])) if len(jobs) > limit else None
+    for job in page:
+        for key in hidden:
+            job.pop(key, None)
+    return jsonify({"jobs": page, "next_cursor": next_cursor})
 
 @app.route('/search')
 @login_required
 def search_jobs():
-    """API endpoint to search jobs with personalized matching and location filtering."""
+    """
+    API endpoint to search jobs with personalized matching and location filtering.
+
+    Returns {"jobs": [...], "next_cursor": ...}; pass next_cursor back as
+    ?cursor= for the next page. ?limit= sets the page size.
+    ?posted_within=N keeps jobs first seen in the last N days, and
+    ?sort=recent orders text matches newest first instead of by relevance.
+    ?rank=bm25 ranks by BM25 over title, company and description instead,
+    with the query's terms (or, for personalized search, the user's skills).
+    ?min_score=N limits personalized results to jobs matching at least N%
+    of the user's skills (none, for a user without skills); it is a 400 on
+    a non-personalized search or combined with ?rank=bm25.
+    """
     query = request.args.get('q', '')
     personalized = request.args.get('personalized', 'false').lower() == 'true'
     location_param = request.args.get('location', '').strip()
-    
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-    
+    # 'substring' forces the old ILIKE matching instead of full-text search
+    match = request.args.get('match', 'fts').lower()
+    sort = request.args.get('sort', 'relevance').lower()
+    rank = request.args.get('rank', '').lower()
+    min_score = max(0.0, min(request.args.get('min_score', 0, type=float) or 0.0, 100.0))
+    posted_within = request.args.get('posted_within', type=int)
+    limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int) or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    try:
+        after = decode_search_cursor(request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if after:
+        # The cursor pins the ranking, like it pins the text-search mode
+        rank = 'bm25' if after.get('mode') == 'bm25' else ''
+    if rank == 'bm25' and min_score > 0:
+        # BM25 pages are ordered by rank, not by match score, so there is no score range to cut off
+        return jsonify({"status": "error", "message": "min_score can't be combined with rank=bm25"}), 400
+    if min_score > 0 and not personalized:
+        # Only personalized results are filtered by match score
+        return jsonify({"status": "error", "message": "min_score only applies to personalized search"}), 400
+
     # Get user skills and preferred location
     user_skills = current_user.skills if current_user.skills else []
     preferred_location = current_user.preferred_location
+    if min_score > 0 and not user_skills:
+        # Without skills every job scores 0, below any min_score
+        return _page_response([], limit, None)
+
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     
     # Build location filter, preferring explicit location parameter over stored preference.
     # Also treat simple city queries (e.g., "Chandigarh") as location-only filters
@@ -697,92 +787,56 @@ def search_jobs():
     location_params = []
     effective_location = None
     
-    # Known city/location keywords we support explicitly
-    known_locations = {
-        "bangalore", "bangalore, karnataka",
-        "chandigarh",
-        "delhi",
-        "gurgaon", "gurgaon, haryana",
-        "noida", "noida, uttar pradesh",
-        "pune", "pune, maharashtra",
-        "hyderabad", "hyderabad, telangana",
-        "mumbai", "mumbai, maharashtra",
-        "chennai", "chennai, tamil nadu",
-        "remote",
-        "india"
-    }
-
     query_lower = query.strip().lower()
 
     if location_param:
         # Explicit location parameter from UI overrides everything
         effective_location = location_param
-    elif query_lower and query_lower in known_locations and not personalized:
-        # User typed a city like "Chandigarh" as the query: treat it purely as location
+    elif query_lower and is_known_location(query_lower) and not personalized:
+        # User typed a city like "Chandigarh" (or "Bengaluru") as the query: treat it purely as location
         effective_location = query
         query = ""  # Clear text query so we only filter by location
     elif preferred_location:
         effective_location = preferred_location
 
     if effective_location:
-        # Support filtering by "India", "Remote", or specific cities
-        if effective_location.lower() == "india":
-            location_filter = " AND (location ILIKE %s OR location ILIKE %s)"
-            location_params = ['%India%', '%india%']
-        elif effective_location.lower() == "remote":
-            location_filter = " AND location ILIKE %s"
-            location_params = ['%Remote%']
-        else:
-            # Specific location (e.g., "Chandigarh")
-            location_filter = " AND location ILIKE %s"
-            location_params = [f'%{effective_location}%']
+        # "India", "Remote" and known cities (with their aliases) filter on the
+        # indexed location_id; anything else is a trigram-indexed substring match
+        location_filter, location_params = location_filter_sql(effective_location)
+
+    if posted_within and posted_within > 0:
+        # Served by the first_seen index
+        location_filter += " AND first_seen >= NOW() - %s * INTERVAL '1 day'"
+        location_params = list(location_params) + [posted_within]
     
-    if personalized and user_skills:
-        # Personalized search: get jobs (filtered by location if set) and score them
-        if location_filter:
-            cursor.execute(f"SELECT * FROM jobs WHERE 1=1 {location_filter}", location_params)
-        else:
-            cursor.execute("SELECT * FROM jobs")
-        jobs = cursor.fetchall()
-        
-        # Calculate match scores
-        jobs_with_scores = []
-        for job in jobs:
-            match_score, matched_skills = calculate_job_match_score(dict(job), user_skills)
-            job_dict = dict(job)
-            job_dict['match_score'] = match_score
-            job_dict['matched_skills'] = matched_skills
-            jobs_with_scores.append(job_dict)
-        
-        # Sort by match score (highest first)
-        jobs_with_scores.sort(key=lambda x: x['match_score'], reverse=True)
+    bm25_terms = []
+    if rank == 'bm25':
+        bm25_terms = bm25.tokenize(query) if query else bm25.tokenize(' '.join(user_skills) if personalized else '')
+    
+    if personalized and user_skills and not bm25_terms:
+        # Personalized search: read precomputed scores instead of scoring every job here
+        jobs_with_scores = search_jobs_personalized(cursor, current_user.id, location_filter, location_params,
+                                                    after=after, limit=limit, min_score=min_score)
         
         cursor.close()
         conn.close()
-        return jsonify(jobs_with_scores)
+        return _page_response(jobs_with_scores, limit,
+                              lambda job: {'mode': 'personalized', 'score': job['match_score'], 'id': job['jobid']})
     else:
         # Regular search
-        if query:
-            search_term = f'%{query}%'
-            if location_filter:
-                cursor.execute(
-                    f"SELECT * FROM jobs WHERE (title ILIKE %s OR company ILIKE %s OR location ILIKE %s) {location_filter}",
-                    (search_term, search_term, search_term) + tuple(location_params)
-                )
-            else:
-                cursor.execute(
-                    "SELECT * FROM jobs WHERE title ILIKE %s OR company ILIKE %s OR location ILIKE %s",
-                    (search_term, search_term, search_term)
-                )
-            jobs = cursor.fetchall()
+        mode = 'recent'
+        if bm25_terms:
+            # Ranked from the precomputed term/corpus statistics, no corpus pass
+            jobs = bm25.search(cursor, bm25_terms, JOB_COLUMNS, location_filter, location_params,
+                               after=after, limit=limit)
+            mode = 'bm25'
+        elif query:
+            jobs, mode = search_jobs_text(conn, cursor, query, location_filter, location_params, match=match,
+                                          after=after, limit=limit, sort=sort)
         else:
-            if location_filter:
-                cursor.execute(f"SELECT * FROM jobs WHERE 1=1 {location_filter}", location_params)
-            else:
-                cursor.execute("SELECT * FROM jobs")
-            jobs = cursor.fetchall()
+            jobs = search_jobs_recent(cursor, location_filter, location_params, after=after, limit=limit)
         
-        # Add match scores for display (even in regular search)
+        # Add match scores for display (even in regular search); only this page is scored
         jobs_list = []
         for job in jobs:
             job_dict = dict(job)
@@ -797,7 +851,49 @@ def search_jobs():
         
         cursor.close()
         conn.close()
-        return jsonify(jobs_list)
+
+        def cursor_for(job):
+            position = {'mode': mode, 'id': job['jobid']}
+            if mode in ('fts', 'bm25'):
+                position['rank'] = job['rank']
+            return position
+
+        return _page_response(jobs_list, limit, cursor_for, hidden=('rank',))
+
+@app.route('/jobs/export')
+@login_required
+def export_jobs():
+    """
+    Streams every job (filtered by ?location= and ?posted_within= like /search)
+    as newline-delimited JSON, newest first, with the user's match scores.
+    Rows come through a server-side cursor and are serialized one at a time,
+    so the response never holds the whole table in memory.
+    """
+    location_param = request.args.get('location', '').strip()
+    posted_within = request.args.get('posted_within', type=int)
+    location_filter, location_params = location_filter_sql(location_param) if location_param else ("", [])
+    if posted_within and posted_within > 0:
+        location_filter += " AND first_seen >= NOW() - %s * INTERVAL '1 day'"
+        location_params = list(location_params) + [posted_within]
+
+    sql = f"""
+        SELECT {JOB_COLUMNS}, COALESCE(m.score, 0) AS match_score,
+               COALESCE(m.matched_skills, '{{}}') AS matched_skills
+        FROM jobs LEFT JOIN user_job_matches m ON m.job_id = jobs.jobid AND m.user_id = %s
+        WHERE 1=1 {location_filter}
+        ORDER BY jobid DESC
+    """
+    params = [current_user.id] + list(location_params)
+    conn = get_db_connection()
+
+    def generate():
+        try:
+            rows = stream_rows(conn, sql, params, cursor_factory=psycopg2.extras.RealDictCursor)
+            yield from ndjson(dict(row) for row in rows)
+        finally:
+            conn.close()
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route('/trigger-scrape')
 @login_required
@@ -826,19 +922,26 @@ def test_scrape():
         # Use preferred location or default
         location = current_user.preferred_location or "India"
         
-        results = []
+        # Optionally test a single source, e.g. /test-scrape?source=LinkedIn
+        source_name = request.args.get('source')
+        sources = [source_name] if source_name else None
+        if source_name and source_registry.get(source_name) is None:
+            return jsonify({"status": "error", "message": f"Unknown source: {source_name}"})
+        
         # Try just the first query to save time
         query = queries[0]
         
         print(f"Testing scrape for: {query} in {location}")
-        jobs = scrape_jobs(query=query, location=location, max_jobs=10)
+        jobs = scrape_jobs(query=query, location=location, max_jobs=10, sources=sources)
         
         return jsonify({
             "status": "success", 
             "query": query,
             "location": location,
             "jobs_found": len(jobs),
-            "jobs": jobs
+            "jobs": jobs,
+            "sources": [source.to_dict() for source in resolve_sources(sources)],
+            "sessions": session_pool.to_dict()
         })
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
@@ -846,7 +949,56 @@ def test_scrape():
 
 
 
+def admin_required(view):
+    """Like login_required, but only for the accounts listed in ADMIN_EMAILS."""
+    @wraps(view)
+    @login_required
+    def wrapper(*args, **kwargs):
+        if (current_user.email or '').lower() not in ADMIN_EMAILS:
+            return jsonify({"status": "error", "message": "Admin access required"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def csrf_token_valid():
+    """Checks the X-CSRFToken header (or csrf_token form field) of a JSON/form POST."""
+    if not app.config.get('WTF_CSRF_ENABLED', True):
+        return True
+    try:
+        validate_csrf(request.headers.get('X-CSRFToken') or request.form.get('csrf_token'))
+    except ValidationError:
+        return False
+    return True
+
+@app.route('/sources')
+@login_required
+def list_sources():
+    """
+    Lists the scraper sources with their execution settings and timing stats.
+    The X-CSRFToken response header is the token POST /sources/<name> needs.
+    """
+    response = jsonify([source.to_dict() for source in source_registry.all()])
+    response.headers['X-CSRFToken'] = generate_csrf()
+    return response
+
+@app.route('/sources/<name>', methods=['POST'])
+@admin_required
+def update_source(name):
+    """Enables or disables a scraper source at runtime (admins only, CSRF-checked)."""
+    if not csrf_token_valid():
+        return jsonify({"status": "error", "message": "Missing or invalid CSRF token"}), 400
+    if source_registry.get(name) is None:
+        return jsonify({"status": "error", "message": f"Unknown source: {name}"}), 404
+    
+    data = request.get_json(silent=True) or request.form
+    enabled = str(data.get('enabled', '')).lower() in ('1', 'true', 'yes', 'on')
+    source = source_registry.set_enabled(name, enabled)
+    return jsonify({"status": "success", "source": source.to_dict()})
 
+@app.route('/db-pool')
+@admin_required
+def db_pool_status():
+    """Connection pool size, saturation and wait-time stats (admins only)."""
+    return jsonify(db_pool.pool_status() or {"status": "idle", "message": "Pool not opened yet"})
 
 
 # --- Email Alert Functions ---
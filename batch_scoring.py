@@ -0,0 +1,175 @@
+# batch_scoring.py
+# Scores many users against many jobs at once with a sparse matrix product.
+#
+# calculate_job_match_score handles one user and one job in Python; scoring
+# every alert-enabled user against every new job that way is users x jobs
+# calls. Here users and jobs are both encoded over a shared skill vocabulary
+# (the lowercased union of the users' skills):
+#
+#   U  users x skills, U[u, s] = how many of user u's skills are s
+#   J  jobs x skills,  J[j, s] = 1 if job j's text contains s as a whole word
+#
+# and U @ J.T gives every user's matched-skill count for every job in one
+# sparse product. A job's text is scanned once for the whole vocabulary with
+# a SkillMatcher, so building J is one pass per job however many users there
+# are. Scores use the same formula and rounding as calculate_job_match_score.
+
+import numpy as np
+from scipy import sparse
+
+from config import ALERT_CONFIG
+from matches import calculate_job_match_score
+from skill_index import job_text
+from skill_matcher import SkillMatcher
+
+# Users scored per sparse product in top_matches.
+USER_CHUNK = 1000
+
+
+def skill_vocabulary(users):
+    """Lowercased skill -> column, over every skill of (id, skills) users."""
+    vocabulary = {}
+    for _, skills in users:
+        for skill in skills or ():
+            if skill:
+                vocabulary.setdefault(skill.lower(), len(vocabulary))
+    return vocabulary
+
+
+def user_matrix(users, vocabulary):
+    """users x skills count matrix, and each user's number of skills (the score denominator)."""
+    rows, cols = [], []
+    sizes = np.zeros(len(users), dtype=np.int64)
+    for row, (_, skills) in enumerate(users):
+        skills = skills or ()
+        sizes[row] = len(skills)
+        for skill in skills:
+            if skill:
+                rows.append(row)
+                cols.append(vocabulary[skill.lower()])
+    data = np.ones(len(rows), dtype=np.int32)
+    # Duplicate (row, col) entries are summed, so a repeated skill counts twice
+    # as it does in calculate_job_match_score
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(len(users), len(vocabulary)))
+    matrix.sum_duplicates()
+    return matrix, sizes
+
+
+def job_matrix(jobs, vocabulary):
+    """jobs x skills 0/1 matrix of (jobid, title, company, description) jobs."""
+    matcher = SkillMatcher(vocabulary)
+    rows, cols = [], []
+    for row, (_, title, company, description) in enumerate(jobs):
+        for skill in matcher.find(job_text(title, company, description)):
+            rows.append(row)
+            cols.append(vocabulary[skill])
+    data = np.ones(len(rows), dtype=np.int32)
+    return sparse.csr_matrix((data, (rows, cols)), shape=(len(jobs), len(vocabulary)))
+
+
+def _percentages(counts, sizes):
+    # A [size, matched] table filled with round(), so scores are exactly
+    # calculate_job_match_score's (np.round rounds some halves differently)
+    if not len(counts):
+        return np.zeros(0)
+    table = np.zeros((sizes.max() + 1, counts.max() + 1))
+    for size in range(1, table.shape[0]):
+        for matched in range(table.shape[1]):
+            table[size, matched] = round(matched / size * 100, 1)
+    return table[sizes, counts]
+
+
+def _scores(users_by_skill, sizes, jobs_by_skill):
+    counts = (users_by_skill @ jobs_by_skill.T).tocsr()
+    counts.eliminate_zeros()
+    row_sizes = np.repeat(sizes, np.diff(counts.indptr))
+    return sparse.csr_matrix((_percentages(counts.data, row_sizes), counts.indices, counts.indptr),
+                             shape=counts.shape)
+
+
+def score_matrix(users, jobs):
+    """
+    Sparse users x jobs matrix of match scores (0-100) for (id, skills) users
+    and (jobid, title, company, description) jobs; pairs with no matched
+    skill are absent.
+    """
+    vocabulary = skill_vocabulary(users)
+    if not vocabulary or not jobs:
+        return sparse.csr_matrix((len(users), len(jobs)))
+    users_by_skill, sizes = user_matrix(users, vocabulary)
+    return _scores(users_by_skill, sizes, job_matrix(jobs, vocabulary))
+
+
+def top_matches(users, jobs, k=None, min_score=None, chunk_size=USER_CHUNK):
+    """
+    Each user's best `k` jobs scoring at least `min_score`, as
+    {user_id: [(job_id, score), ...]} ordered by score then newest job first.
+    Users with no qualifying job are left out.
+    """
+    k = k or ALERT_CONFIG['TOP_K']
+    min_score = min_score if min_score is not None else ALERT_CONFIG['MIN_SCORE']
+    vocabulary = skill_vocabulary(users)
+    if not vocabulary or not jobs:
+        return {}
+    users_by_skill, sizes = user_matrix(users, vocabulary)
+    jobs_by_skill = job_matrix(jobs, vocabulary)
+    job_ids = np.array([job[0] for job in jobs])
+
+    results = {}
+    # Users in chunks, so only chunk_size rows of the score matrix exist at once
+    for first in range(0, len(users), chunk_size):
+        scores = _scores(users_by_skill[first:first + chunk_size], sizes[first:first + chunk_size], jobs_by_skill)
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            row_scores = scores.data[start:end]
+            keep = np.flatnonzero(row_scores >= min_score)
+            if not len(keep):
+                continue
+            if len(keep) > k:
+                # Only jobs tied with or above the k-th best score need sorting
+                kth = np.partition(row_scores[keep], len(keep) - k)[len(keep) - k]
+                keep = keep[row_scores[keep] >= kth]
+            columns = scores.indices[start:end][keep]
+            # Best score first, then newest job
+            order = np.lexsort((-job_ids[columns], -row_scores[keep]))[:k]
+            results[users[first + row][0]] = [(job_ids[columns[i]].item(), row_scores[keep[i]].item()) for i in order]
+    return results
+
+
+def alert_matches(cursor, apply_links, k=None, min_score=None):
+    """
+    Best new jobs (by apply_link) for every user with email alerts on, as
+    (email, skills, [job dict with match_score and matched_skills]) tuples.
+    """
+    if not apply_links:
+        return []
+    cursor.execute(
+        "SELECT id, email, skills FROM users "
+        "WHERE email_alerts_enabled AND skills IS NOT NULL AND array_length(skills, 1) > 0"
+    )
+    recipients = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    if not recipients:
+        return []
+    cursor.execute(
+        "SELECT jobid, title, company, location, apply_link, description FROM jobs WHERE apply_link = ANY(%s)",
+        (list(apply_links),)
+    )
+    jobs = {row[0]: {'jobid': row[0], 'title': row[1], 'company': row[2], 'location': row[3], 'apply_link': row[4],
+                     'description': row[5]}
+            for row in cursor.fetchall()}
+
+    users = [(user_id, skills) for user_id, (_, skills) in recipients.items()]
+    job_rows = [(job_id, job['title'], job['company'], job['description']) for job_id, job in jobs.items()]
+    best = top_matches(users, job_rows, k, min_score)
+
+    alerts = []
+    for user_id, ranked in best.items():
+        email, skills = recipients[user_id]
+        matched_jobs = []
+        for job_id, score in ranked:
+            # matched_skills for the handful of jobs that get emailed only
+            job = jobs[job_id]
+            _, matched = calculate_job_match_score(job, skills)
+            matched_jobs.append(dict(job, match_score=score, matched_skills=matched))
+        alerts.append((email, skills, matched_jobs))
+    return alerts
@@ -0,0 +1,124 @@
+"""
+Benchmark: query latency of BM25 ranking vs the full-text ts_rank sort.
+
+Creates a scratch schema (in the database from DATABASE_URL / config.py)
+with the jobs and BM25 statistics tables from migrations.py, fills it with
+synthetic jobs (100k by default) and builds the statistics with
+bm25.index_all. Then runs a set of skill queries through the current
+/search ordering (websearch_to_tsquery + ts_rank over the GIN index) and
+through bm25.search, first page of each, and reports p50 / p95 latency.
+
+    python benchmarks/bench_bm25.py --jobs 100000 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import psycopg2
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import bm25
+from config import DATABASE_CONFIG
+from migrations import add_bm25_statistics, add_search_vector, add_seen_timestamps, create_jobs_and_users
+
+SCHEMA = 'bench_bm25'
+COLUMNS = "jobid, title, company, location, apply_link"
+QUERIES = ['python', 'python django', 'react node.js', 'kubernetes aws terraform', 'rust', 'java spring sql']
+PAGE = 20
+
+
+def build_schema(conn, jobs):
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+        cursor.execute(f"SET search_path TO {SCHEMA}")
+        create_jobs_and_users(cursor)
+        add_search_vector(cursor)
+        add_seen_timestamps(cursor)
+        cursor.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS location_id INTEGER")
+        cursor.execute("""
+            INSERT INTO jobs (title, company, location, description, apply_link)
+            SELECT (ARRAY['Senior', 'Junior', 'Lead', ''])[1 + g % 4] || ' ' ||
+                   (ARRAY['Python', 'Java', 'React', 'Go', 'Rust', 'Kubernetes', 'Django', 'Node.js',
+                          'AWS', 'Spring', 'SQL', 'Terraform'])[1 + g % 12] || ' ' ||
+                   (ARRAY['Developer', 'Engineer', 'Architect'])[1 + g % 3],
+                   'Company ' || (g % 500),
+                   (ARRAY['Bangalore, Karnataka', 'Delhi', 'Remote'])[1 + g % 3],
+                   repeat((ARRAY['Build Python services on AWS. ', 'Ship React and Node.js apps. ',
+                                 'Run Kubernetes with Terraform. ', 'Write Java Spring and SQL. '])[1 + g % 4],
+                          1 + g % 5),
+                   'https://example.com/jobs/' || g
+            FROM generate_series(1, %s) AS g
+        """, (jobs,))
+        start = time.perf_counter()
+        add_bm25_statistics(cursor)
+        seconds = time.perf_counter() - start
+        cursor.execute("ANALYZE")
+    conn.commit()
+    return seconds
+
+
+def fts_page(cursor, query):
+    # The /search ordering before rank=bm25 (see app.search_jobs_text)
+    cursor.execute(
+        f"""
+        SELECT {COLUMNS}, ts_rank(search_vector, tsq) AS rank
+        FROM jobs, websearch_to_tsquery('english', %s) AS tsq
+        WHERE search_vector @@ tsq
+        ORDER BY rank DESC, jobid DESC
+        LIMIT %s
+        """,
+        (query, PAGE + 1)
+    )
+    return cursor.fetchall()
+
+
+def bm25_page(cursor, query):
+    return bm25.search(cursor, bm25.tokenize(query), COLUMNS, limit=PAGE)
+
+
+def latencies(cursor, page, repeat):
+    timings = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            page(cursor, query)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--jobs', type=int, default=100_000, help='synthetic jobs')
+    parser.add_argument('--repeat', type=int, default=20, help='runs of each query')
+    parser.add_argument('--keep', action='store_true', help='reuse an existing schema and leave it behind')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DATABASE_CONFIG)
+    if not args.keep:
+        seconds = build_schema(conn, args.jobs)
+        print(f"{args.jobs} jobs, BM25 statistics built in {seconds:.1f} s")
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"SET search_path TO {SCHEMA}")
+        print(f"{len(QUERIES)} queries x {args.repeat}, first page of {PAGE}")
+        for name, page in (('fts ts_rank', fts_page), ('bm25', bm25_page)):
+            p50, p95 = latencies(cursor, page, args.repeat)
+            print(f"  {name:12s}: p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+    conn.rollback()
+
+    if not args.keep:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
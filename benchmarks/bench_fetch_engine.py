@@ -0,0 +1,92 @@
+"""
+Benchmark: asyncio fetch engine vs the sequential `requests.get` path.
+
+Starts a local stand-in HTTP server that answers every request after a fixed
+latency, then fetches the same batch of search URLs both ways.
+
+    python benchmarks/bench_fetch_engine.py --requests 36 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from fetch_engine import AsyncFetchEngine
+
+PAGE = ("<ul>" + "".join(
+    f'<li><h3 class="base-search-card__title">Python Developer {i}</h3></li>' for i in range(25)
+) + "</ul>").encode()
+
+
+def start_server(latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+    server = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_sequential(urls):
+    for url in urls:
+        # Same as scrape_linkedin / scrape_timesjobs: no session, new connection per call
+        requests.get(url, timeout=20)
+
+
+async def run_engine(urls, per_host_limit):
+    async with AsyncFetchEngine(per_host_limit=per_host_limit) as engine:
+        results = await engine.fetch_all([{'url': url} for url in urls])
+    assert all(result.ok for result in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=36, help='number of search fetches')
+    parser.add_argument('--latency', type=float, default=0.2, help='server latency per request (s)')
+    parser.add_argument('--per-host', type=int, default=8, help='engine concurrency per host')
+    args = parser.parse_args()
+
+    server = start_server(args.latency)
+    host, port = server.server_address
+    urls = [f"http://{host}:{port}/jobs?q=python+{i}&l=Remote" for i in range(args.requests)]
+
+    start = time.perf_counter()
+    run_sequential(urls)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    asyncio.run(run_engine(urls, args.per_host))
+    engine = time.perf_counter() - start
+
+    server.shutdown()
+    print(f"{args.requests} fetches, {args.latency * 1000:.0f} ms server latency")
+    print(f"  sequential requests.get : {sequential:7.2f} s")
+    print(f"  async engine (per host {args.per_host}) : {engine:7.2f} s  ({sequential / engine:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: per-row INSERT vs bulk execute_values vs COPY + merge for job ingestion.
+
+Loads synthetic jobs into a scratch table shaped like `jobs` (in the database
+from DATABASE_URL / config.py). Each path runs against the same starting
+state, where a fraction of the batch already exists, and must report the same
+number of new rows.
+
+    python benchmarks/bench_ingestion.py --jobs 50000 --existing 0.3
+"""
+import argparse
+import os
+import sys
+import time
+
+import psycopg2
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config import DATABASE_CONFIG
+from ingestion import ingest_jobs
+
+TABLE = 'bench_jobs'
+
+
+def synthetic_jobs(count):
+    return [
+        {
+            'title': f'Python Developer {i}',
+            'company': f'Company {i % 500}',
+            'location': ['Bangalore, Karnataka', 'Delhi', 'Remote'][i % 3],
+            'apply_link': f'https://example.com/jobs/{i}',
+        }
+        for i in range(count)
+    ]
+
+
+def reset_table(conn, existing_jobs):
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {TABLE} (
+            jobId SERIAL PRIMARY KEY,
+            title TEXT NOT NULL,
+            company TEXT,
+            location TEXT,
+            description TEXT,
+            apply_link TEXT UNIQUE NOT NULL,
+            location_id INTEGER,
+            first_seen TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            last_seen TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    """)
+    ingest_jobs(cursor, existing_jobs, table=TABLE, method='copy')
+    conn.commit()
+    cursor.close()
+
+
+def run_per_row(cursor, jobs):
+    # The original run_background_scraper loop
+    new = 0
+    for job in jobs:
+        cursor.execute(
+            f"INSERT INTO {TABLE} (title, company, location, apply_link) VALUES (%s, %s, %s, %s) "
+            f"ON CONFLICT (apply_link) DO NOTHING;",
+            (job['title'], job['company'], job['location'], job['apply_link'])
+        )
+        if cursor.rowcount > 0:
+            new += 1
+    return new
+
+
+def run_bulk(method):
+    return lambda cursor, jobs: len(ingest_jobs(cursor, jobs, table=TABLE, method=method))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--jobs', type=int, default=50000, help='jobs per batch')
+    parser.add_argument('--existing', type=float, default=0.3, help='fraction of the batch already stored')
+    args = parser.parse_args()
+
+    jobs = synthetic_jobs(args.jobs)
+    existing = jobs[:int(args.jobs * args.existing)]
+    conn = psycopg2.connect(**DATABASE_CONFIG)
+
+    results = {}
+    for name, run in (('per-row INSERT', run_per_row),
+                      ('execute_values', run_bulk('values')),
+                      ('COPY + merge', run_bulk('copy'))):
+        reset_table(conn, existing)
+        cursor = conn.cursor()
+        start = time.perf_counter()
+        new = run(cursor, jobs)
+        conn.commit()
+        results[name] = (time.perf_counter() - start, new)
+        cursor.close()
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    conn.commit()
+    conn.close()
+
+    counts = {new for _, new in results.values()}
+    assert len(counts) == 1, f"paths disagree on new rows: {results}"
+
+    baseline = results['per-row INSERT'][0]
+    print(f"{args.jobs} jobs, {len(existing)} already stored, {counts.pop()} new")
+    for name, (seconds, _) in results.items():
+        print(f"  {name:16s}: {seconds:7.2f} s  ({baseline / seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark: parse throughput per source over the saved HTML fixtures.
+
+Compares the original full-tree `html.parser` extraction with the strained,
+compiled-selector parsers in tasks.py on each available backend, and checks
+that every variant extracts the same jobs.
+
+    python benchmarks/bench_parsers.py --repeat 50 --inflate 10
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import tasks
+from tasks import clean_text
+
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures')
+
+
+# --- Original parsers (full BeautifulSoup tree + find_all), kept as the baseline ---
+
+def legacy_indeed(html, request, max_jobs=10):
+    jobs = []
+    soup = BeautifulSoup(html, 'html.parser')
+    job_cards = soup.find_all('div', class_=lambda x: x and 'job_seen_beacon' in x)
+    if not job_cards:
+        job_cards = soup.find_all('td', class_='resultContent')
+    for card in job_cards:
+        title_elem = card.find('h2', class_='jobTitle') or card.find('a', class_=lambda x: x and 'jobtitle' in x)
+        company_elem = card.find('span', class_='companyName') or card.find('span', attrs={'data-testid': 'company-name'})
+        loc_elem = card.find('div', class_='companyLocation') or card.find('div', attrs={'data-testid': 'text-location'})
+        link_elem = card.find('a', href=True)
+        link = link_elem['href'] if link_elem else "#"
+        if link.startswith('/'):
+            link = f"https://{request['domain']}" + link
+        jobs.append({
+            'title': title_elem.text.strip() if title_elem else "Unknown Title",
+            'company': company_elem.text.strip() if company_elem else "Unknown Company",
+            'location': loc_elem.text.strip() if loc_elem else request['location'],
+            'apply_link': link,
+            'source': 'Indeed'
+        })
+        if len(jobs) >= max_jobs:
+            break
+    return jobs
+
+
+def legacy_linkedin(html, request, max_jobs=10):
+    jobs = []
+    soup = BeautifulSoup(html, 'html.parser')
+    for card in soup.find_all('li'):
+        title_elem = card.find('h3', class_='base-search-card__title')
+        company_elem = card.find('h4', class_='base-search-card__subtitle')
+        loc_elem = card.find('span', class_='job-search-card__location')
+        link_elem = card.find('a', class_='base-card__full-link')
+        link = link_elem['href'] if link_elem else "#"
+        jobs.append({
+            'title': clean_text(title_elem.text) if title_elem else "Unknown Title",
+            'company': clean_text(company_elem.text) if company_elem else "Unknown Company",
+            'location': clean_text(loc_elem.text) if loc_elem else request['location'],
+            'apply_link': link.split('?')[0],
+            'source': 'LinkedIn'
+        })
+        if len(jobs) >= max_jobs:
+            break
+    return jobs
+
+
+def legacy_timesjobs(html, request, max_jobs=10):
+    jobs = []
+    soup = BeautifulSoup(html, 'html.parser')
+    job_cards = soup.find_all('li', class_='job-bx') or soup.find_all('div', class_='job-bx')
+    for card in job_cards:
+        title_elem = card.find('h2').find('a')
+        company_elem = card.find('h3', class_='joblist-comp-name')
+        loc_elem = card.find('ul', class_='top-jd-dtl').find('span')
+        jobs.append({
+            'title': clean_text(title_elem.text) if title_elem else "Unknown Title",
+            'company': clean_text(company_elem.text).replace('(More Jobs)', '').strip() if company_elem else "Unknown Company",
+            'location': clean_text(loc_elem.text) if loc_elem else request['location'],
+            'apply_link': title_elem['href'] if title_elem else "#",
+            'source': 'TimesJobs'
+        })
+        if len(jobs) >= max_jobs:
+            break
+    return jobs
+
+
+SOURCES = [
+    ('Indeed', 'indeed_search.html', {'domain': 'in.indeed.com', 'location': 'India'}, legacy_indeed, tasks.parse_indeed_jobs),
+    ('LinkedIn', 'linkedin_search.html', {'location': 'India'}, legacy_linkedin, tasks.parse_linkedin_jobs),
+    ('TimesJobs', 'timesjobs_search.html', {'location': 'India'}, legacy_timesjobs, tasks.parse_timesjobs_jobs),
+]
+
+
+def inflate(html, factor):
+    """Pads the page with non-card markup to approach real page sizes."""
+    filler = '<div class="filler"><p>' + 'Lorem ipsum <b>dolor</b> sit amet. ' * 40 + '</p></div>'
+    return html + filler * (factor * 20)
+
+
+def backends():
+    names = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        names.append('lxml')
+    except ImportError:
+        pass
+    return names
+
+
+def timed(parse, html, request, repeat):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            jobs = parse(html, request, max_jobs=50)
+        elapsed = time.perf_counter() - start
+    return jobs, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=50, help='parses per variant')
+    parser.add_argument('--inflate', type=int, default=10, help='extra non-card markup factor')
+    args = parser.parse_args()
+
+    for name, fixture, request, legacy, current in SOURCES:
+        with open(os.path.join(FIXTURES, fixture), encoding='utf-8') as f:
+            html = inflate(f.read(), args.inflate)
+
+        baseline_jobs, baseline = timed(legacy, html, request, args.repeat)
+        print(f"{name}: {len(html) / 1024:.0f} KiB page, {len(baseline_jobs)} jobs")
+        print(f"  {'full tree, html.parser':<34}: {args.repeat / baseline:7.1f} pages/s")
+        for backend in backends():
+            tasks.HTML_PARSER = backend
+            jobs, elapsed = timed(current, html, request, args.repeat)
+            assert jobs == baseline_jobs, f"{name} parser output differs on {backend}"
+            label = f"strained + selectors, {backend}"
+            print(f"  {label:<34}: {args.repeat / elapsed:7.1f} pages/s  ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
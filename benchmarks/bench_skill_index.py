@@ -0,0 +1,83 @@
+"""
+Benchmark: scoring a user against every job by substring scan vs the skill index.
+
+For synthetic corpora of 10k, 100k and 1M jobs (no database needed), scores
+one user's skills against all jobs with calculate_job_match_score and with
+SkillIndex.match, and checks both give the same scores and matched skills.
+"Load" is matching every job against the vocabulary as it is added, done
+once at startup; --description-words adds a description of that many words
+to every job.
+
+    python benchmarks/bench_skill_index.py --sizes 10000 100000 1000000
+    python benchmarks/bench_skill_index.py --sizes 50000 --description-words 300
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from matches import calculate_job_match_score
+from skill_index import SkillIndex
+
+WORDS = ['Python', 'Java', 'JavaScript', 'React', 'Django', 'Flask', 'AWS', 'Docker', 'Kubernetes', 'SQL',
+         'Senior', 'Junior', 'Backend', 'Frontend', 'Full Stack', 'Developer', 'Engineer', 'Data', 'ML', 'Go',
+         'Angular', 'Vue', 'Node.js', 'Ruby', 'Rails', 'PHP', 'Laravel', 'C#', '.NET', 'Azure', 'GCP', 'Spark',
+         'Hadoop', 'Scala', 'Kotlin', 'Swift', 'Android', 'iOS', 'Tableau', 'Excel', 'Salesforce', 'SAP',
+         'QA', 'Selenium', 'DevOps', 'SRE', 'Security', 'Network', 'Support', 'Sales', 'Marketing', 'HR']
+SKILLS = ['Python', 'Django', 'Flask', 'PostgreSQL', 'Docker', 'AWS', 'REST', 'Git', 'Linux', 'Redis']
+
+
+def synthetic_jobs(count, description_words=0, seed=42):
+    rng = random.Random(seed)
+    return [(n, ' '.join(rng.sample(WORDS, 3)), f'Company {rng.randrange(5000)}',
+             ' '.join(rng.choices(WORDS, k=description_words)) or None) for n in range(count)]
+
+
+def scan(jobs, skills):
+    scores = {}
+    for job_id, title, company, description in jobs:
+        job = {'title': title, 'company': company, 'description': description}
+        score, matched = calculate_job_match_score(job, skills)
+        if score > 0:
+            scores[job_id] = (score, matched)
+    return scores
+
+
+def indexed(index, skills):
+    return {job_id: (score, matched) for job_id, score, matched in index.match(skills)}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help='corpus sizes')
+    parser.add_argument('--description-words', type=int, default=0, help='words of description per job')
+    args = parser.parse_args()
+
+    print(f"{len(SKILLS)} user skills")
+    for size in args.sizes:
+        jobs = synthetic_jobs(size, args.description_words)
+        index = SkillIndex()
+        load_seconds, _ = timed(index.add_jobs, jobs)
+
+        scan_seconds, expected = timed(scan, jobs, SKILLS)
+        match_seconds, got = timed(indexed, index, SKILLS)
+        assert got == expected, "index and substring scan disagree"
+
+        print(f"{size:>9} jobs ({len(expected)} matching), index load {load_seconds:.2f} s")
+        print(f"  substring scan: {scan_seconds:8.3f} s")
+        print(f"  index         : {match_seconds:8.3f} s  ({scan_seconds / match_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
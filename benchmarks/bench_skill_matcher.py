@@ -0,0 +1,222 @@
+"""
+Benchmark: per-skill substring scans vs the Aho-Corasick skill matcher.
+
+On a synthetic corpus (no database needed), times resume parsing with the
+old app.extract_skills_from_text (copied below) against
+skill_matcher.extract_skills_from_text, and job scoring with one
+`skill in text` per user skill against matcher_for(skills).find, each with
+the native (pyahocorasick) and pure-Python automaton. Also reports how many
+results the whole-word rule changes ("go" no longer matching "google",
+"java" no longer matching "javascript").
+
+    python benchmarks/bench_skill_matcher.py --resumes 2000 --jobs 200000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import skill_matcher
+from skill_matcher import TECHNICAL_SKILLS, SkillMatcher, matcher_for
+
+FILLER = ['built', 'services', 'for', 'the', 'team', 'at', 'google', 'using', 'and', 'with', 'led',
+          'migration', 'of', 'platform', 'to', 'cloud', 'improved', 'latency', 'by', 'design', 'reviews',
+          'javascript', 'restful', 'gitlab', 'category', 'sqlalchemy', 'scalable', 'pipelines']
+WORDS = ['Python', 'Java', 'JavaScript', 'React', 'Django', 'Flask', 'AWS', 'Docker', 'Kubernetes', 'SQL',
+         'Senior', 'Junior', 'Backend', 'Frontend', 'Developer', 'Engineer', 'Data', 'Go', 'Google',
+         'Angular', 'Vue', 'Node.js', 'Ruby', 'Rails', 'PHP', 'C#', '.NET', 'Azure', 'GCP', 'Restaurant']
+SKILLS = ['python', 'django', 'flask', 'postgresql', 'docker', 'aws', 'rest', 'git', 'linux', 'go']
+
+
+def synthetic_resumes(count, seed=42):
+    # ~6 KB of prose with a skill every ~20 words, plus a comma-separated skills section
+    rng = random.Random(seed)
+    resumes = []
+    for _ in range(count):
+        words = [rng.choice(TECHNICAL_SKILLS) if rng.random() < 0.05 else rng.choice(FILLER) for _ in range(900)]
+        section = ', '.join(rng.sample(TECHNICAL_SKILLS, 12) + rng.sample(FILLER, 4))
+        resumes.append(f"Technical Skills: {section}\n" + ' '.join(words))
+    return resumes
+
+
+def synthetic_jobs(count, seed=42):
+    rng = random.Random(seed)
+    return [f"{' '.join(rng.sample(WORDS, 3))} Company {rng.randrange(5000)}".lower() for _ in range(count)]
+
+
+def legacy_extract_skills(text):
+    """app.extract_skills_from_text before skill_matcher, unchanged."""
+    if not text:
+        return []
+
+    skills_found = set()
+    text_lower = text.lower()
+
+    # Comprehensive technical skills database
+    technical_skills = {
+        # Programming Languages
+        'python', 'java', 'javascript', 'typescript', 'html', 'css', 'go', 'rust',
+        'c++', 'c#', '.net', 'php', 'ruby', 'swift', 'kotlin', 'dart',
+        # Web Frameworks & Libraries
+        'react', 'angular', 'vue', 'next.js', 'nuxt.js', 'svelte',
+        'node.js', 'express', 'django', 'flask', 'fastapi', 'spring',
+        'laravel', 'symfony', 'rails', 'asp.net', 'ember', 'backbone',
+        # Databases
+        'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'cassandra',
+        'dynamodb', 'elasticsearch', 'neo4j', 'sqlite', 'oracle',
+        # Cloud & DevOps
+        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform',
+        'jenkins', 'gitlab ci', 'github actions', 'ansible', 'puppet',
+        'chef', 'vagrant', 'consul', 'vault',
+        # Data Science & ML
+        'pandas', 'numpy', 'matplotlib', 'seaborn', 'plotly',
+        'scikit-learn', 'scipy', 'tensorflow', 'pytorch', 'keras',
+        'xgboost', 'lightgbm', 'opencv', 'nltk', 'spaCy',
+        # Machine Learning & AI
+        'machine learning', 'deep learning', 'neural networks',
+        'computer vision', 'nlp', 'natural language processing',
+        # Frontend Tools
+        'sass', 'scss', 'less', 'webpack', 'babel', 'gulp', 'grunt',
+        'tailwind css', 'bootstrap', 'material-ui', 'chakra ui',
+        # Testing
+        'jest', 'mocha', 'jasmine', 'cypress', 'selenium', 'pytest',
+        'unittest', 'junit', 'testng',
+        # Version Control & Tools
+        'git', 'svn', 'mercurial', 'perforce',
+        # Agile & Project Management
+        'agile', 'scrum', 'kanban', 'jira', 'confluence', 'trello',
+        'asana', 'monday.com',
+        # APIs & Protocols
+        'rest', 'graphql', 'soap', 'grpc', 'websocket', 'rest api',
+        # Operating Systems
+        'linux', 'unix', 'bash', 'powershell', 'shell scripting',
+        # Other Tools
+        'postman', 'insomnia', 'swagger', 'docker compose', 'kubectl',
+        'helm', 'terraform', 'vagrant', 'vagrantfile'
+    }
+
+    # Only look for technical skills in the text
+    for skill in technical_skills:
+        if skill in text_lower:
+            skills_found.add(skill.title() if skill.islower() else skill)
+
+    # Extract skills from "Skills:" sections with better filtering
+    skills_pattern = r'(?:technical\s+)?skills?[:\-]?\s*([^\n]{20,500})'
+    matches = re.findall(skills_pattern, text_lower, re.IGNORECASE)
+
+    for match in matches:
+        # Clean up prefixes and split
+        clean_match = re.sub(r'^(programming|tools?|frameworks?|databases?|libraries?):\s*', '', match, flags=re.IGNORECASE)
+
+        # Split by various delimiters
+        potential_skills = re.split(r'[,;•\n]', clean_match)
+
+        for skill in potential_skills:
+            skill = skill.strip().lower()
+
+            # Filter out non-skills
+            if not skill or len(skill) < 2 or len(skill) > 40:
+                continue
+
+            # Skip if it contains job-related keywords
+            if any(word in skill for word in ['intern', 'junior', 'senior', 'developer',
+                                                'engineer', 'manager', 'analyst', 'qa', 'quality']):
+                continue
+
+            # Skip dates, company names, and long descriptions
+            if re.search(r'\d{4}', skill):  # Contains year
+                continue
+
+            # Skip if it's a library name that we already know about
+            if any(sk in skill for sk in ['library', 'libraries', 'framework', 'tool', 'tools']):
+                continue
+
+            # Only add if it's in our technical skills list or looks like one
+            if any(ts in skill or skill in ts for ts in technical_skills):
+                skills_found.add(skill.title())
+
+    # Clean up results - remove any remaining non-skills
+    filtered_skills = []
+    for skill in skills_found:
+        skill_lower = skill.lower()
+
+        # Skip library names that look like code
+        if skill_lower.startswith('py') and len(skill) > 8:
+            continue
+
+        # Skip if it looks like a company name (has 'ltd', 'inc', 'corp', etc.)
+        if any(word in skill_lower for word in ['ltd', 'inc', 'corp', 'international', 'global']):
+            continue
+
+        # Skip job titles
+        if any(word in skill_lower for word in ['intern', 'associate', 'specialist', 'officer']):
+            continue
+
+        # Skip dates and time periods
+        if re.search(r'\d{4}|\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+\d{4}\b', skill_lower):
+            continue
+
+        # Skip generic tools that aren't technical skills
+        if skill_lower in ['ms office', 'office', 'windows', 'mac', 'linux operating system']:
+            continue
+
+        filtered_skills.append(skill)
+
+    # Return sorted, unique skills
+    return sorted(list(set(filtered_skills)))
+
+
+def substring_find(skills, text):
+    return [skill for skill in skills if skill in text]
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    return time.perf_counter() - start, results
+
+
+def report(label, items, legacy, engines):
+    legacy_seconds, expected = timed(legacy, items)
+    print(f"{label} ({len(items)})")
+    print(f"  substring scan  : {legacy_seconds:8.3f} s")
+    for name, fn in engines.items():
+        seconds, found = timed(fn, items)
+        changed = sum(1 for old, new in zip(expected, found) if set(old) != set(new))
+        print(f"  {name:16s}: {seconds:8.3f} s  ({legacy_seconds / seconds:.1f}x), "
+              f"{changed} results changed by whole-word matching")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--resumes', type=int, default=2000, help='synthetic resumes (~6 KB each)')
+    parser.add_argument('--jobs', type=int, default=200_000, help='synthetic job texts')
+    args = parser.parse_args()
+
+    native_taxonomy = skill_matcher.taxonomy_matcher
+    python_taxonomy = SkillMatcher(TECHNICAL_SKILLS, native=False)
+
+    def extract_with(matcher):
+        def extract(text):
+            skill_matcher.taxonomy_matcher = matcher
+            return skill_matcher.extract_skills_from_text(text)
+        return extract
+
+    report('resume extraction', synthetic_resumes(args.resumes), legacy_extract_skills,
+           {'matcher (native)': extract_with(native_taxonomy), 'matcher (python)': extract_with(python_taxonomy)})
+    skill_matcher.taxonomy_matcher = native_taxonomy
+
+    python_user = SkillMatcher(SKILLS, native=False)
+    report('job scoring', synthetic_jobs(args.jobs),
+           lambda text: substring_find(SKILLS, text),
+           {'matcher (native)': matcher_for(SKILLS).find, 'matcher (python)': python_user.find})
+
+
+if __name__ == '__main__':
+    main()
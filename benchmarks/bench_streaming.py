@@ -0,0 +1,124 @@
+"""
+Benchmark: peak memory of fetchall() + dict copies vs a server-side cursor stream.
+
+Builds a synthetic jobs-shaped table (1M rows by default) in the database
+from DATABASE_URL / config.py, then scores every row against a skill list
+the old personalized /search way (DictCursor.fetchall(), dict per row, copied
+again per job) and through streaming.stream_rows() feeding a generator. Each
+path runs in its own process so its peak RSS is measured on its own; both
+must find the same number of matches.
+
+    python benchmarks/bench_streaming.py --rows 1000000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import psycopg2
+import psycopg2.extras
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config import DATABASE_CONFIG
+from matches import calculate_job_match_score
+from streaming import stream_rows
+
+TABLE = 'bench_stream_jobs'
+SKILLS = ['Python', 'Django', 'PostgreSQL', 'AWS']
+COLUMNS = "jobid, title, company, location, description, apply_link"
+
+
+def build_table(conn, rows):
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.execute(f"""
+            CREATE TABLE {TABLE} AS
+            SELECT g AS jobid,
+                   (ARRAY['Python', 'Java', 'Django', 'Go', 'React'])[1 + g % 5] || ' Developer ' || g AS title,
+                   'Company ' || (g % 500) AS company,
+                   (ARRAY['Bangalore, Karnataka', 'Delhi', 'Remote'])[1 + g % 3] AS location,
+                   repeat('Build and maintain services. ', 10) AS description,
+                   'https://example.com/jobs/' || g AS apply_link
+            FROM generate_series(1, %s) AS g
+        """, (rows,))
+    conn.commit()
+
+
+def run_fetchall(conn):
+    # The personalized /search path before streaming
+    cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+    cursor.execute(f"SELECT {COLUMNS} FROM {TABLE}")
+    jobs = cursor.fetchall()
+    scored = []
+    for job in jobs:
+        score, matched = calculate_job_match_score(dict(job), SKILLS)
+        job_dict = dict(job)
+        job_dict['match_score'] = score
+        job_dict['matched_skills'] = matched
+        scored.append(job_dict)
+    cursor.close()
+    return sum(1 for job in scored if job['match_score'] > 0)
+
+
+def run_stream(conn):
+    rows = stream_rows(conn, f"SELECT {COLUMNS} FROM {TABLE}", cursor_factory=psycopg2.extras.RealDictCursor)
+    scores = (calculate_job_match_score(row, SKILLS)[0] for row in rows)
+    return sum(1 for score in scores if score > 0)
+
+
+MODES = {'fetchall': run_fetchall, 'stream': run_stream}
+
+
+def measure(mode):
+    """Runs one mode in this process and prints 'matches seconds peak_kb'."""
+    conn = psycopg2.connect(**DATABASE_CONFIG)
+    start = time.perf_counter()
+    matches = MODES[mode](conn)
+    seconds = time.perf_counter() - start
+    conn.close()
+    # ru_maxrss is in KB on Linux
+    print(matches, seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='rows in the synthetic jobs table')
+    parser.add_argument('--keep', action='store_true', help='reuse an existing table and leave it behind')
+    parser.add_argument('--measure', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure)
+        return
+
+    conn = psycopg2.connect(**DATABASE_CONFIG)
+    if not args.keep:
+        build_table(conn, args.rows)
+
+    results = {}
+    for mode in MODES:
+        out = subprocess.run([sys.executable, __file__, '--measure', mode],
+                             check=True, capture_output=True, text=True).stdout.split()
+        results[mode] = (int(out[0]), float(out[1]), int(out[2]))
+
+    if not args.keep:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        conn.commit()
+    conn.close()
+
+    counts = {matches for matches, _, _ in results.values()}
+    assert len(counts) == 1, f"paths disagree on matches: {results}"
+
+    print(f"{args.rows} rows, {counts.pop()} matching {SKILLS}")
+    for mode, (_, seconds, peak_kb) in results.items():
+        print(f"  {mode:9s}: {seconds:7.2f} s  peak RSS {peak_kb / 1024:8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
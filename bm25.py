@@ -0,0 +1,198 @@
+# bm25.py
+# Okapi BM25 ranking of jobs over title, company and description.
+#
+# Ranking a query needs each term's document frequency, each job's length
+# and the corpus' average length. Those are kept in tables maintained as jobs
+# come and go, so a query never has to scan the corpus:
+#
+#   job_terms     (term, job_id) -> tf     the inverted index, one row per distinct term per job
+#   term_stats    term -> doc_freq         jobs containing the term
+#   corpus_stats  doc_count, total_length  one row, for the idf and the average length
+#
+# plus jobs.doc_length (terms in the job; NULL while it isn't indexed yet).
+# index_new_jobs() adds freshly ingested jobs, reindex_jobs() redoes jobs
+# whose description was fetched later (see enrichment.py) and forget_jobs()
+# takes expired ones out again before they are deleted (see retention.py).
+# All three writers lock the corpus_stats row before anything else, so
+# concurrent ones (the scrape cycle, enrichment and retention) queue up on it
+# instead of deadlocking over term_stats rows.
+# search() then scores only the jobs on the query terms' posting lists:
+#
+#   score(job) = sum over query terms t of
+#                idf(t) * tf * (K1 + 1) / (tf + K1 * (1 - B + B * doc_length / avg_length))
+#   idf(t)     = ln(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+import re
+from collections import Counter
+
+from psycopg2.extras import execute_values
+
+from streaming import batched, stream_rows
+
+# Term frequency saturation and length normalization, the usual defaults.
+K1 = 1.2
+B = 0.75
+
+# Rows per INSERT statement sent by execute_values.
+PAGE_SIZE = 1000
+
+# Words, keeping skill spellings like "c++", "c#" and "node.js" whole
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+
+def tokenize(text):
+    """Lowercased terms of `text`, in order."""
+    return _TOKEN.findall((text or '').lower())
+
+
+def job_terms(title, company, description):
+    """Term -> frequency over a job's title, company and description."""
+    return Counter(tokenize(title) + tokenize(company) + tokenize(description))
+
+
+def _lock_statistics(cursor):
+    # Taken first by every writer, before any term_stats row
+    cursor.execute("SELECT 1 FROM corpus_stats FOR UPDATE")
+
+
+def index_jobs(cursor, jobs):
+    """
+    Adds (jobid, title, company, description) jobs to the statistics. Each
+    job must be added only once; index_new_jobs() picks the ones that aren't.
+    The caller commits.
+    """
+    postings, lengths = [], []
+    doc_freqs = Counter()
+    for job_id, title, company, description in jobs:
+        terms = job_terms(title, company, description)
+        postings.extend((term, job_id, tf) for term, tf in terms.items())
+        lengths.append((job_id, sum(terms.values())))
+        doc_freqs.update(terms.keys())
+    if not lengths:
+        return 0
+
+    _lock_statistics(cursor)
+    execute_values(cursor, "INSERT INTO job_terms (term, job_id, tf) VALUES %s", postings, page_size=PAGE_SIZE)
+    execute_values(
+        cursor,
+        "UPDATE jobs SET doc_length = v.doc_length FROM (VALUES %s) AS v (jobid, doc_length) WHERE jobs.jobid = v.jobid",
+        lengths,
+        page_size=PAGE_SIZE,
+    )
+    # Sorted, so concurrent indexers lock term rows in the same order
+    execute_values(
+        cursor,
+        "INSERT INTO term_stats (term, doc_freq) VALUES %s "
+        "ON CONFLICT (term) DO UPDATE SET doc_freq = term_stats.doc_freq + EXCLUDED.doc_freq",
+        sorted(doc_freqs.items()),
+        page_size=PAGE_SIZE,
+    )
+    cursor.execute(
+        "UPDATE corpus_stats SET doc_count = doc_count + %s, total_length = total_length + %s",
+        (len(lengths), sum(length for _, length in lengths))
+    )
+    return len(lengths)
+
+
+def index_new_jobs(cursor, apply_links):
+    """Indexes the not yet indexed jobs among `apply_links`. Returns how many were added."""
+    if not apply_links:
+        return 0
+    cursor.execute(
+        "SELECT jobid, title, company, description FROM jobs WHERE apply_link = ANY(%s) AND doc_length IS NULL",
+        (list(apply_links),)
+    )
+    return index_jobs(cursor, cursor.fetchall())
+
+
+def index_all(cursor, batch_size=5000):
+    """Indexes every job not indexed yet (e.g. when the tables are created). Returns how many were added."""
+    rows = stream_rows(cursor.connection, "SELECT jobid, title, company, description FROM jobs WHERE doc_length IS NULL")
+    return sum(index_jobs(cursor, batch) for batch in batched(rows, batch_size))
+
+
+def forget_jobs(cursor, job_ids):
+    """
+    Takes jobs out of term_stats and corpus_stats; call it in the transaction
+    that deletes them (their job_terms rows go with them, ON DELETE CASCADE).
+    """
+    if not job_ids:
+        return
+    _lock_statistics(cursor)
+    # Term rows locked in sorted order, the same order index_jobs upserts them in
+    cursor.execute(
+        "SELECT 1 FROM term_stats WHERE term IN (SELECT term FROM job_terms WHERE job_id = ANY(%s)) "
+        "ORDER BY term FOR UPDATE",
+        (list(job_ids),)
+    )
+    cursor.execute(
+        """
+        UPDATE term_stats SET doc_freq = term_stats.doc_freq - gone.jobs
+        FROM (SELECT term, COUNT(*) AS jobs FROM job_terms WHERE job_id = ANY(%s) GROUP BY term) AS gone
+        WHERE term_stats.term = gone.term
+        """,
+        (list(job_ids),)
+    )
+    cursor.execute(
+        """
+        UPDATE corpus_stats SET doc_count = doc_count - gone.jobs, total_length = total_length - gone.length
+        FROM (SELECT COUNT(*) AS jobs, COALESCE(SUM(doc_length), 0) AS length
+              FROM jobs WHERE jobid = ANY(%s) AND doc_length IS NOT NULL) AS gone
+        """,
+        (list(job_ids),)
+    )
+
+
+def reindex_jobs(cursor, job_ids):
+    """Re-indexes jobs whose text changed (e.g. a description was fetched). The caller commits."""
+    if not job_ids:
+        return 0
+    _lock_statistics(cursor)
+    forget_jobs(cursor, job_ids)
+    cursor.execute("DELETE FROM job_terms WHERE job_id = ANY(%s)", (list(job_ids),))
+    cursor.execute("SELECT jobid, title, company, description FROM jobs WHERE jobid = ANY(%s)", (list(job_ids),))
+    return index_jobs(cursor, cursor.fetchall())
+
+
+def search(cursor, terms, columns, location_filter="", location_params=(), after=None, limit=20):
+    """
+    One keyset page of jobs containing any of `terms`, best BM25 score
+    first (ties newest first), with the score as `rank`. `columns` are the
+    jobs columns to select and `after` the previous page's {'rank', 'id'}.
+    Returns up to limit + 1 rows.
+    """
+    terms = sorted(set(terms))
+    if not terms:
+        return []
+    keyset, keyset_params = "", ()
+    if after is not None:
+        keyset = " AND (ranked.rank, jobid) < (%s, %s)"
+        keyset_params = (after.get('rank', 0), after['id'])
+    cursor.execute(
+        f"""
+        WITH corpus AS (
+            SELECT doc_count, GREATEST(total_length, 1)::float8 / GREATEST(doc_count, 1) AS avg_length
+            FROM corpus_stats
+        ), query AS (
+            SELECT term, LN(1 + (corpus.doc_count - doc_freq + 0.5) / (doc_freq + 0.5)) AS idf
+            FROM term_stats, corpus
+            WHERE term = ANY(%s) AND doc_freq > 0
+        ), ranked AS (
+            SELECT t.job_id, SUM(
+                query.idf * t.tf * ({K1} + 1)
+                / (t.tf + {K1} * (1 - {B} + {B} * j.doc_length / corpus.avg_length))
+            ) AS rank
+            FROM query
+            JOIN job_terms t ON t.term = query.term
+            JOIN jobs j ON j.jobid = t.job_id, corpus
+            GROUP BY t.job_id
+        )
+        SELECT {columns}, ranked.rank
+        FROM ranked JOIN jobs ON jobs.jobid = ranked.job_id
+        WHERE 1=1 {location_filter}{keyset}
+        ORDER BY ranked.rank DESC, jobid DESC
+        LIMIT %s
+        """,
+        (terms,) + tuple(location_params) + keyset_params + (limit + 1,)
+    )
+    return cursor.fetchall()
@@ -0,0 +1,139 @@
+# circuit_breaker.py
+# Per-source circuit breakers for the scrapers.
+#
+# A source that keeps answering 403/429/5xx or timing out is blocking or
+# struggling, and hitting it again for every user and location only burns
+# the cycle. After FAILURE_THRESHOLD such responses in a row its breaker
+# opens and the source is skipped for a cooldown. When the cooldown is over a
+# single trial request is let through: success closes the breaker, another
+# failure reopens it with the cooldown doubled (up to MAX_COOLDOWN).
+
+import threading
+import time
+
+from config import CIRCUIT_BREAKER_CONFIG
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Statuses that mean "back off", as opposed to e.g. a 404 for one search.
+TRIP_STATUSES = {403, 429}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a source whose breaker is open."""
+
+
+def is_trip(status=None, error=None):
+    """Whether a response (or transport error, with status None) should count against the breaker."""
+    if status is None:
+        return error is not None
+    return status in TRIP_STATUSES or status >= 500
+
+
+class CircuitBreaker:
+    """Thread-safe breaker for one source."""
+
+    def __init__(self, name, failure_threshold=None, cooldown=None, max_cooldown=None, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold or CIRCUIT_BREAKER_CONFIG['FAILURE_THRESHOLD']
+        self.base_cooldown = cooldown if cooldown is not None else CIRCUIT_BREAKER_CONFIG['COOLDOWN']
+        self.max_cooldown = max_cooldown if max_cooldown is not None else CIRCUIT_BREAKER_CONFIG['MAX_COOLDOWN']
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+        self.opened_until = None
+        self.last_reason = None
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        """True while requests would be refused. Does not claim the half-open trial."""
+        with self._lock:
+            if self.state == OPEN:
+                return self.clock() < self.opened_until
+            return self.state == HALF_OPEN and self._trial_in_flight
+
+    def allow(self):
+        """
+        Asks to send one request. Once the cooldown is over, the first caller
+        gets the trial request and everyone else is refused until it reports.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() >= self.opened_until:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+                print(f"🔌 {self.name} circuit half-open, sending a trial request", flush=True)
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record(self, status=None, error=None):
+        """Reports the outcome of a request let through by allow()."""
+        if is_trip(status, error):
+            self._record_failure(f"HTTP {status}" if status is not None else str(error)[:100])
+        else:
+            self._record_success()
+
+    def _record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"✅ {self.name} circuit closed, source recovered", flush=True)
+            self.state = CLOSED
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self.opened_until = None
+            self._trial_in_flight = False
+
+    def _record_failure(self, reason):
+        with self._lock:
+            self.last_reason = reason
+            if self.state == HALF_OPEN:
+                # The trial failed: back off harder
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            else:
+                self.failures += 1
+                if self.state == OPEN or self.failures < self.failure_threshold:
+                    return
+            self.state = OPEN
+            self.opened_until = self.clock() + self.cooldown
+            self.times_opened += 1
+            self._trial_in_flight = False
+            print(f"🔌 {self.name} circuit open after {reason}; skipping it for {self.cooldown:.0f}s", flush=True)
+
+    def to_dict(self):
+        with self._lock:
+            retry_in = max(0.0, self.opened_until - self.clock()) if self.state == OPEN else None
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'cooldown': self.cooldown,
+                'retry_in': round(retry_in, 1) if retry_in is not None else None,
+                'times_opened': self.times_opened,
+                'last_reason': self.last_reason,
+            }
+
+
+class BreakerBoard:
+    """One CircuitBreaker per source name, created on first use."""
+
+    def __init__(self, **options):
+        self.options = options
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name, **self.options)
+            return self._breakers[name]
+
+
+# Shared by the blocking scrapers, the async engine path and the registry.
+breakers = BreakerBoard()
@@ -3,6 +3,7 @@
 # Supports both local development and cloud deployment (Render, Heroku, etc.)
 
 import os
+import json
 from urllib.parse import urlparse
 
 # Get database URL from environment (for cloud deployment) or use local config
@@ -29,6 +30,54 @@ else:
         'port': os.environ.get('POSTGRES_PORT', '5432')
     }
 
+# PostgreSQL connection pool (see db_pool.py). MAX should cover the gunicorn
+# threads plus the background scraper; TIMEOUT is how long a request waits for
+# a free connection and PING_AFTER how long a connection may sit idle before
+# it is pinged on checkout.
+DB_POOL_CONFIG = {
+    'MIN': int(os.environ.get('DB_POOL_MIN', '1')),
+    'MAX': int(os.environ.get('DB_POOL_MAX', '8')),
+    'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+    'PING_AFTER': float(os.environ.get('DB_POOL_PING_AFTER', '30')),
+}
+
+# Apply pending schema migrations when a worker starts (see migrations.py).
+# Set to false when `python migrations.py` runs as a separate deploy step.
+DB_AUTO_MIGRATE = os.environ.get('DB_AUTO_MIGRATE', 'true').lower() == 'true'
+
+# Jobs not seen by any scrape for DAYS are deleted after each cycle (see
+# retention.py), BATCH_SIZE rows per transaction.
+JOB_RETENTION_CONFIG = {
+    'DAYS': int(os.environ.get('JOB_RETENTION_DAYS', '30')),
+    'BATCH_SIZE': int(os.environ.get('JOB_RETENTION_BATCH_SIZE', '5000')),
+}
+
+# Detail-page fetching for jobs without a description (see enrichment.py).
+# Each cycle, every INTERVAL seconds, fetches at most BUDGET pages and
+# commits every BATCH_SIZE results; a page that yields nothing is retried
+# after RETRY_AFTER_HOURS, up to MAX_ATTEMPTS times.
+ENRICHMENT_CONFIG = {
+    'ENABLED': os.environ.get('ENRICHMENT_ENABLED', 'true').lower() == 'true',
+    'INTERVAL': float(os.environ.get('ENRICHMENT_INTERVAL', '900')),
+    'BUDGET': int(os.environ.get('ENRICHMENT_BUDGET', '200')),
+    'BATCH_SIZE': int(os.environ.get('ENRICHMENT_BATCH_SIZE', '25')),
+    'PER_HOST_LIMIT': int(os.environ.get('ENRICHMENT_PER_HOST_LIMIT', '2')),
+    'TOTAL_LIMIT': int(os.environ.get('ENRICHMENT_TOTAL_LIMIT', '16')),
+    'MAX_ATTEMPTS': int(os.environ.get('ENRICHMENT_MAX_ATTEMPTS', '3')),
+    'RETRY_AFTER_HOURS': float(os.environ.get('ENRICHMENT_RETRY_AFTER_HOURS', '6')),
+}
+
+# Email alerts after each scrape cycle (see batch_scoring.py): each alert-enabled
+# user gets at most TOP_K new jobs scoring at least MIN_SCORE percent.
+ALERT_CONFIG = {
+    'TOP_K': int(os.environ.get('ALERT_TOP_K', '10')),
+    'MIN_SCORE': float(os.environ.get('ALERT_MIN_SCORE', '30')),
+}
+
+# Accounts allowed to use the operator endpoints (/sources/<name>, /db-pool),
+# as a comma-separated ADMIN_EMAILS list. Empty means no account is an admin.
+ADMIN_EMAILS = {email.strip().lower() for email in os.environ.get('ADMIN_EMAILS', '').split(',') if email.strip()}
+
 # Email Configuration for Job Alerts
 # For Gmail, you need to:
 # 1. Enable "Less secure app access" or create an "App Password"
@@ -45,3 +94,79 @@ EMAIL_CONFIG = {
     'MAIL_DEFAULT_SENDER': ('Job Crawler', os.environ.get('EMAIL_USER', 'noreply@jobcrawler.com'))
 }
 
+
+# Scraper Configuration
+# SCRAPER_CONCURRENT queries every job source in parallel for one (query, location)
+# pair, so a call costs the slowest source instead of the sum of all of them.
+# SCRAPER_SOURCE_TIMEOUT is the default deadline (seconds) a source gets once it
+# starts; sources can set their own in SOURCE_SETTINGS below.
+# SCRAPER_ENGINE=async runs batches of searches on the asyncio fetch engine
+# (fetch_engine.py); 'threads' falls back to calling scrape_jobs per pair.
+SCRAPER_CONFIG = {
+    'CONCURRENT': os.environ.get('SCRAPER_CONCURRENT', 'true').lower() == 'true',
+    'MAX_WORKERS': int(os.environ.get('SCRAPER_MAX_WORKERS', '3')),
+    'SOURCE_TIMEOUT': float(os.environ.get('SCRAPER_SOURCE_TIMEOUT', '45')),
+    'ENGINE': os.environ.get('SCRAPER_ENGINE', 'async'),
+    'ASYNC_PER_HOST_LIMIT': int(os.environ.get('SCRAPER_PER_HOST_LIMIT', '4')),
+    'ASYNC_TOTAL_LIMIT': int(os.environ.get('SCRAPER_TOTAL_LIMIT', '64')),
+    'ASYNC_TIMEOUT': float(os.environ.get('SCRAPER_ASYNC_TIMEOUT', '20')),
+    'KEEPALIVE_TIMEOUT': float(os.environ.get('SCRAPER_KEEPALIVE_TIMEOUT', '60')),
+    # Page budget per (query, location, source) when crawling incrementally; paging
+    # stops early once SCRAPER_KNOWN_STOP_RATIO of a page's jobs are already known
+    'MAX_PAGES': int(os.environ.get('SCRAPER_MAX_PAGES', '3')),
+    'KNOWN_STOP_RATIO': float(os.environ.get('SCRAPER_KNOWN_STOP_RATIO', '0.8')),
+    # BeautifulSoup backend: 'lxml' or 'html.parser'; empty picks lxml when installed
+    'HTML_PARSER': os.environ.get('SCRAPER_HTML_PARSER', ''),
+}
+
+# Politeness: one token bucket per target domain (subdomains included).
+# `rate` is the sustained requests per second, `burst` how many requests may go
+# out back to back after the host has been idle. Override with a JSON object in
+# SCRAPER_RATE_LIMITS, e.g. {"linkedin.com": {"rate": 1, "burst": 4}}.
+RATE_LIMITS = {
+    'in.indeed.com': {'rate': 0.25, 'burst': 1},
+    'www.indeed.com': {'rate': 0.25, 'burst': 1},
+    'linkedin.com': {'rate': 0.5, 'burst': 2},
+    'timesjobs.com': {'rate': 0.5, 'burst': 2},
+}
+RATE_LIMITS.update(json.loads(os.environ.get('SCRAPER_RATE_LIMITS', '{}')))
+
+# On-disk HTTP cache for search pages (see http_cache.py). Entries younger than
+# HTTP_CACHE_TTL seconds are served without a request; older ones are
+# revalidated with ETag/Last-Modified. HTTP_CACHE_MAX_MB bounds the disk used.
+HTTP_CACHE_CONFIG = {
+    'ENABLED': os.environ.get('HTTP_CACHE_ENABLED', 'true').lower() == 'true',
+    'DIR': os.environ.get('HTTP_CACHE_DIR', os.path.join('.cache', 'http')),
+    'TTL': float(os.environ.get('HTTP_CACHE_TTL', '1800')),
+    'MAX_BYTES': int(float(os.environ.get('HTTP_CACHE_MAX_MB', '50')) * 1024 * 1024),
+}
+
+# Per-source circuit breakers: open after FAILURE_THRESHOLD consecutive
+# 403/429/5xx/timeout responses, skip the source for COOLDOWN seconds, and
+# double the cooldown (up to MAX_COOLDOWN) each time the recovery trial fails.
+CIRCUIT_BREAKER_CONFIG = {
+    'FAILURE_THRESHOLD': int(os.environ.get('SCRAPER_BREAKER_THRESHOLD', '3')),
+    'COOLDOWN': float(os.environ.get('SCRAPER_BREAKER_COOLDOWN', '300')),
+    'MAX_COOLDOWN': float(os.environ.get('SCRAPER_BREAKER_MAX_COOLDOWN', '7200')),
+}
+
+# Warmed requests.Sessions reused by the blocking scrapers, per (source, domain).
+# TTL is how long a session's cookies are trusted before it is re-warmed.
+SESSION_POOL_CONFIG = {
+    'SIZE': int(os.environ.get('SCRAPER_SESSION_POOL_SIZE', '2')),
+    'TTL': float(os.environ.get('SCRAPER_SESSION_TTL', '1800')),
+}
+
+# Per-source execution settings for the scraper registry (see source_registry.py).
+# `concurrency` caps simultaneous searches against the source, `timeout` is its
+# deadline in seconds, `weight` scales how many cards it contributes to a
+# single-page search (10 x weight; crawls keep whole pages), `max_pages`
+# overrides SCRAPER_MAX_PAGES and `enabled` switches it off. Override with a JSON object in
+# SCRAPER_SOURCES, e.g. {"Indeed": {"enabled": false}}.
+SOURCE_SETTINGS = {
+    'Indeed': {'concurrency': 2, 'timeout': 45, 'weight': 1.0, 'enabled': True},
+    'LinkedIn': {'concurrency': 2, 'timeout': 20, 'weight': 1.0, 'enabled': True},
+    'TimesJobs': {'concurrency': 2, 'timeout': 30, 'weight': 1.0, 'enabled': True},
+}
+for _name, _overrides in json.loads(os.environ.get('SCRAPER_SOURCES', '{}')).items():
+    SOURCE_SETTINGS.setdefault(_name, {}).update(_overrides)
@@ -0,0 +1,279 @@
+# db_pool.py
+# Thread-safe PostgreSQL connection pool behind app.get_db_connection.
+#
+# Connections are opened once and handed out again and again instead of
+# paying a TCP + auth (+ TLS) handshake on every request. Pooled connections
+# are a psycopg2 connection subclass whose close() puts them back in the pool,
+# so existing `conn = get_db_connection() ... conn.close()` code is unchanged;
+# new code can use the db_connection() context manager instead.
+#
+# psycopg2's own ThreadedConnectionPool raises when exhausted and closes idle
+# connections above minconn, so this pool blocks (up to TIMEOUT) for a free
+# connection and keeps up to MAX open. Wait time and saturation are recorded
+# so the size can be tuned under load.
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+from config import DATABASE_CONFIG, DB_POOL_CONFIG
+
+# A checkout waiting longer than this is logged as pool saturation.
+SLOW_WAIT_SECONDS = 1.0
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """No connection became free within the pool timeout."""
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """A connection whose close() returns it to the pool it came from."""
+
+    _pool = None
+
+    def close(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.release(self)
+        else:
+            super().close()
+
+    def discard(self):
+        """Really closes the connection."""
+        self._pool = None
+        super().close()
+
+
+class ConnectionPool:
+    """Bounded, blocking pool of PooledConnections."""
+
+    def __init__(self, minconn=None, maxconn=None, timeout=None, ping_after=None, connect_kwargs=None):
+        self.minconn = minconn if minconn is not None else DB_POOL_CONFIG['MIN']
+        self.maxconn = maxconn or DB_POOL_CONFIG['MAX']
+        self.timeout = timeout if timeout is not None else DB_POOL_CONFIG['TIMEOUT']
+        self.ping_after = ping_after if ping_after is not None else DB_POOL_CONFIG['PING_AFTER']
+        self.connect_kwargs = dict(connect_kwargs if connect_kwargs is not None else DATABASE_CONFIG)
+        self.pid = os.getpid()
+        self._idle = []
+        self._last_used = {}
+        self._in_use = {}
+        self._opened = 0
+        self._cond = threading.Condition()
+        self.stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'timeouts': 0,
+            'opened': 0,
+            'discarded': 0,
+            'peak_in_use': 0,
+        }
+
+    def _connect(self):
+        conn = psycopg2.connect(connection_factory=PooledConnection, **self.connect_kwargs)
+        with self._cond:
+            self.stats['opened'] += 1
+        return conn
+
+    def _healthy(self, conn, idle_for):
+        """Cheap local checks always; a round trip only for connections idle longer than ping_after."""
+        if conn.closed or conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if idle_for < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Checks out a healthy connection, waiting up to `timeout` seconds for one to be free."""
+        start = time.monotonic()
+        waited = False
+        while True:
+            with self._cond:
+                while not self._idle and self._opened >= self.maxconn:
+                    remaining = self.timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self.stats['timeouts'] += 1
+                        raise PoolTimeout(f"No database connection free after {self.timeout}s "
+                                          f"({self.maxconn} in use)")
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    conn = self._idle.pop()
+                    idle_for = time.monotonic() - self._last_used.pop(id(conn), 0)
+                else:
+                    conn = None
+                    self._opened += 1
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._opened -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._healthy(conn, idle_for):
+                self._drop(conn)
+                continue
+            break
+
+        wait = time.monotonic() - start
+        with self._cond:
+            conn._pool = self
+            self._in_use[conn] = threading.get_ident()
+            self.stats['checkouts'] += 1
+            self.stats['peak_in_use'] = max(self.stats['peak_in_use'], len(self._in_use))
+            if waited:
+                self.stats['waits'] += 1
+                self.stats['wait_seconds_total'] += wait
+                self.stats['wait_seconds_max'] = max(self.stats['wait_seconds_max'], wait)
+        if wait >= SLOW_WAIT_SECONDS:
+            print(f"⚠️ Database pool saturated: waited {wait:.2f}s for a connection "
+                  f"({self.maxconn} max)", flush=True)
+        return conn
+
+    def _drop(self, conn):
+        try:
+            conn.discard()
+        except Exception:
+            pass
+        with self._cond:
+            self._opened -= 1
+            self.stats['discarded'] += 1
+            self._cond.notify()
+
+    def release(self, conn):
+        """Returns a connection, rolling back anything left open; broken connections are dropped."""
+        with self._cond:
+            self._in_use.pop(conn, None)
+        if conn.closed or conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+            self._drop(conn)
+            return
+        try:
+            if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            if conn.autocommit:
+                conn.autocommit = False
+        except psycopg2.Error:
+            self._drop(conn)
+            return
+        with self._cond:
+            self._last_used[id(conn)] = time.monotonic()
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def prefill(self):
+        """Opens up to `minconn` connections ahead of time; failures are left for getconn() to report."""
+        while True:
+            with self._cond:
+                if self._opened >= self.minconn:
+                    return
+                self._opened += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._opened -= 1
+                return
+            with self._cond:
+                self._last_used[id(conn)] = time.monotonic()
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def release_thread(self):
+        """
+        Returns every connection still checked out by the calling thread.
+        Used at the end of a web request so an error path that skipped
+        close() cannot leak a connection.
+        """
+        me = threading.get_ident()
+        with self._cond:
+            leaked = [conn for conn, owner in self._in_use.items() if owner == me]
+        for conn in leaked:
+            conn.close()
+        return len(leaked)
+
+    def closeall(self):
+        """Closes idle connections; connections in use are closed when released."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._last_used.clear()
+        for conn in idle:
+            conn.discard()
+
+    def to_dict(self):
+        with self._cond:
+            stats = dict(self.stats)
+            in_use = len(self._in_use)
+            idle = len(self._idle)
+        stats['wait_seconds_total'] = round(stats['wait_seconds_total'], 3)
+        stats['wait_seconds_max'] = round(stats['wait_seconds_max'], 3)
+        stats['avg_wait_seconds'] = round(stats['wait_seconds_total'] / stats['waits'], 3) if stats['waits'] else 0.0
+        return {
+            'min': self.minconn,
+            'max': self.maxconn,
+            'in_use': in_use,
+            'idle': idle,
+            'saturation': round(in_use / self.maxconn, 2),
+            'stats': stats,
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Returns the process-wide pool, creating it on first use (and again after a fork)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            # A forked child must not reuse its parent's sockets; just forget them
+            _pool = ConnectionPool()
+            _pool.prefill()
+        return _pool
+
+
+def get_connection():
+    """Checks out a pooled connection. Call close() on it to give it back."""
+    return get_pool().getconn()
+
+
+@contextmanager
+def db_connection():
+    """Checks out a pooled connection and returns it to the pool afterwards."""
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _current_pool():
+    with _pool_lock:
+        return _pool if _pool is not None and _pool.pid == os.getpid() else None
+
+
+def release_thread_connections():
+    """Returns connections the calling thread forgot to close; a no-op before the pool exists."""
+    pool = _current_pool()
+    return pool.release_thread() if pool is not None else 0
+
+
+def pool_status():
+    """Pool statistics, or None before the pool has been used in this process."""
+    pool = _current_pool()
+    return pool.to_dict() if pool is not None else None
@@ -0,0 +1,219 @@
+# enrichment.py
+# Fills in jobs.description from each job's detail page.
+#
+# The scrapers only read search-result cards, which carry a title, company
+# and location but no description. This stage runs separately from scraping:
+# each cycle it picks up to BUDGET jobs that still have no description,
+# fetches their apply_link pages through the async fetch engine (bounded
+# total and per-host concurrency, plus the politeness rate limits), extracts
+# and cleans the description text and writes results back BATCH_SIZE at a
+# time, each batch its own transaction.
+#
+# All progress lives in the jobs table (description, description_attempts,
+# description_checked_at), so after a restart the next cycle simply carries
+# on with whatever is still missing. A job whose page can't be fetched or has
+# no recognizable description is retried after RETRY_AFTER_HOURS, at most
+# MAX_ATTEMPTS times; a 404/410 page gets an empty description and is not
+# retried. Enriched jobs are re-indexed for BM25 ranking (see bm25.py) and
+# rescored against users' skills (see matches.py).
+#
+#     python enrichment.py [--budget N]    # run one cycle
+
+import argparse
+import asyncio
+import html
+import json
+import sys
+
+import psycopg2
+import soupsieve as sv
+from psycopg2.extras import execute_values
+
+import bm25
+import matches
+from config import DATABASE_CONFIG, ENRICHMENT_CONFIG
+from fetch_engine import AsyncFetchEngine
+from tasks import clean_text, get_random_user_agent, make_soup
+
+# Longest description stored; detail pages occasionally include whole sites' worth of text.
+MAX_DESCRIPTION_CHARS = 20000
+
+# Statuses meaning the posting is gone for good.
+GONE_STATUSES = (404, 410)
+
+# Description containers on the sources' detail pages, tried in order.
+DESCRIPTION_SELECTORS = [
+    sv.compile('#jobDescriptionText'),                  # Indeed
+    sv.compile('div.show-more-less-html__markup'),      # LinkedIn
+    sv.compile('div.description__text'),                # LinkedIn (older layout)
+    sv.compile('div.jd-desc'),                          # TimesJobs
+    sv.compile('#JobDescription'),                      # TimesJobs (older layout)
+    sv.compile('[class*="job-description"], [id*="job-description"]'),
+]
+JSON_LD = sv.compile('script[type="application/ld+json"]')
+META_DESCRIPTION = sv.compile('meta[name="description"], meta[property="og:description"]')
+
+
+def clean_description(text):
+    """Plain text of a description that may still contain HTML or entities."""
+    if not text:
+        return ""
+    # JSON-LD descriptions are often entity-escaped HTML
+    text = html.unescape(text)
+    if '<' in text:
+        text = make_soup(text).get_text(' ')
+    return clean_text(text)[:MAX_DESCRIPTION_CHARS]
+
+
+def _json_ld_description(soup):
+    # Most job boards embed a schema.org JobPosting for search engines
+    for script in JSON_LD.select(soup):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            data = data.get('@graph', [data])
+        if not isinstance(data, list):
+            continue
+        for item in data:
+            if isinstance(item, dict) and item.get('@type') == 'JobPosting' and item.get('description'):
+                return item['description']
+    return None
+
+
+def extract_description(page):
+    """Cleaned description text of a job detail page, or '' if none is found."""
+    soup = make_soup(page)
+    for selector in DESCRIPTION_SELECTORS:
+        element = selector.select_one(soup)
+        if element is not None:
+            for junk in element.select('script, style'):
+                junk.decompose()
+            text = clean_description(element.get_text(' '))
+            if text:
+                return text
+    text = clean_description(_json_ld_description(soup))
+    if text:
+        return text
+    meta = META_DESCRIPTION.select_one(soup)
+    return clean_description(meta.get('content')) if meta is not None else ""
+
+
+def pending_jobs(cursor, limit, max_attempts=None, retry_after_hours=None):
+    """(jobid, apply_link) of up to `limit` jobs still missing a description, untried ones first."""
+    max_attempts = max_attempts or ENRICHMENT_CONFIG['MAX_ATTEMPTS']
+    retry_after_hours = retry_after_hours or ENRICHMENT_CONFIG['RETRY_AFTER_HOURS']
+    cursor.execute(
+        """
+        SELECT jobid, apply_link FROM jobs
+        WHERE description IS NULL AND description_attempts < %s
+          AND (description_checked_at IS NULL OR description_checked_at < NOW() - %s * INTERVAL '1 hour')
+        ORDER BY description_attempts, jobid DESC
+        LIMIT %s
+        """,
+        (max_attempts, retry_after_hours, limit)
+    )
+    return [(row[0], row[1]) for row in cursor.fetchall()]
+
+
+def save_descriptions(cursor, results):
+    """
+    Writes (jobid, description) results, None meaning try again later,
+    re-indexes the enriched jobs for BM25 and rescores their skill matches.
+    The caller commits.
+    """
+    if not results:
+        return
+    # Rows are locked in jobid order, as retention.py locks them, so two
+    # writers can't each hold a row the other is waiting for
+    results = sorted(results, key=lambda row: row[0])
+    execute_values(
+        cursor,
+        "UPDATE jobs SET description = v.description, description_checked_at = NOW(), "
+        "description_attempts = jobs.description_attempts + 1 "
+        "FROM (VALUES %s) AS v (jobid, description) WHERE jobs.jobid = v.jobid",
+        results,
+        template="(%s, %s::text)",
+    )
+    enriched = [job_id for job_id, description in results if description]
+    bm25.reindex_jobs(cursor, enriched)
+    matches.refresh_for_job_ids(cursor, enriched)
+
+
+async def _fetch_description(engine, job_id, url):
+    result = await engine.fetch(url, headers={'User-Agent': get_random_user_agent()})
+    if result.ok:
+        # Parsing is CPU-bound; keep it off the event loop so fetches keep flowing
+        description = await asyncio.get_running_loop().run_in_executor(None, extract_description, result.text)
+        return job_id, description or None
+    if result.status in GONE_STATUSES:
+        return job_id, ""
+    return job_id, None
+
+
+async def _enrich(jobs, engine, flush, batch_size):
+    # flush() blocks on the database; run it in a worker thread so the
+    # fetches still in flight keep going while a batch is written
+    loop = asyncio.get_running_loop()
+    batch = []
+    for done in asyncio.as_completed([_fetch_description(engine, job_id, url) for job_id, url in jobs]):
+        batch.append(await done)
+        if len(batch) >= batch_size:
+            await loop.run_in_executor(None, flush, batch)
+            batch = []
+    if batch:
+        await loop.run_in_executor(None, flush, batch)
+
+
+def enrich_descriptions(conn, budget=None, batch_size=None, engine_kwargs=None):
+    """
+    Runs one enrichment cycle of at most `budget` fetches, committing every
+    `batch_size` results. Returns {'fetched', 'enriched', 'retry'} counts.
+    """
+    budget = budget or ENRICHMENT_CONFIG['BUDGET']
+    batch_size = batch_size or ENRICHMENT_CONFIG['BATCH_SIZE']
+    engine_kwargs = engine_kwargs or {
+        'per_host_limit': ENRICHMENT_CONFIG['PER_HOST_LIMIT'],
+        'total_limit': ENRICHMENT_CONFIG['TOTAL_LIMIT'],
+    }
+    counts = {'fetched': 0, 'enriched': 0, 'retry': 0}
+
+    with conn.cursor() as cursor:
+        jobs = pending_jobs(cursor, budget)
+        conn.commit()
+        if not jobs:
+            return counts
+
+        def flush(batch):
+            save_descriptions(cursor, batch)
+            conn.commit()
+            counts['fetched'] += len(batch)
+            counts['enriched'] += sum(1 for _, description in batch if description)
+            counts['retry'] += sum(1 for _, description in batch if description is None)
+
+        async def run():
+            async with AsyncFetchEngine(**engine_kwargs) as engine:
+                await _enrich(jobs, engine, flush, batch_size)
+
+        asyncio.run(run())
+
+    print(f"📝 Enriched {counts['enriched']} of {counts['fetched']} job descriptions "
+          f"({counts['retry']} to retry)", flush=True)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch missing job descriptions (one cycle).")
+    parser.add_argument('--budget', type=int, default=None, help='most detail pages to fetch')
+    args = parser.parse_args(argv)
+    conn = psycopg2.connect(**DATABASE_CONFIG)
+    try:
+        enrich_descriptions(conn, budget=args.budget)
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# fetch_engine.py
+# Asyncio fetch engine used by the scrapers in tasks.py.
+#
+# One engine owns a single aiohttp session. Its connector keeps a pool of
+# keep-alive connections per host, so dozens of (query, location, source)
+# fetches can be in flight from one thread without paying a new TCP+TLS
+# handshake for every search.
+
+import asyncio
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config import SCRAPER_CONFIG
+from politeness import scheduler as default_scheduler
+
+
+class FetchResult:
+    """Outcome of a single fetch. `status` is None when the request itself failed."""
+
+    def __init__(self, url, status=None, text='', error=None, elapsed=0.0, headers=None):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.headers = headers or {}
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.status == 200
+
+
+class AsyncFetchEngine:
+    """
+    Pooled asyncio HTTP client with bounded concurrency per host.
+
+    Use it as an async context manager so the connection pool is closed:
+
+        async with AsyncFetchEngine() as engine:
+            results = await engine.fetch_all(requests)
+    """
+
+    def __init__(self, per_host_limit=None, total_limit=None, timeout=None, keepalive_timeout=None,
+                 scheduler=default_scheduler):
+        self.per_host_limit = per_host_limit or SCRAPER_CONFIG['ASYNC_PER_HOST_LIMIT']
+        self.total_limit = total_limit or SCRAPER_CONFIG['ASYNC_TOTAL_LIMIT']
+        self.timeout = timeout or SCRAPER_CONFIG['ASYNC_TIMEOUT']
+        self.keepalive_timeout = keepalive_timeout or SCRAPER_CONFIG['KEEPALIVE_TIMEOUT']
+        self.scheduler = scheduler
+        self._session = None
+        self._host_slots = {}
+        self._warmups = {}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.total_limit,
+            limit_per_host=self.per_host_limit,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        self._session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.CookieJar())
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _host_slot(self, host):
+        # Semaphores are created lazily so they bind to the running loop.
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_slots[host]
+
+    async def fetch(self, url, params=None, headers=None, timeout=None, verify=True):
+        """GETs a URL. Errors and timeouts are returned in the result, never raised."""
+        loop = asyncio.get_running_loop()
+        host = urlsplit(url).netloc
+        if self.scheduler is not None:
+            await self.scheduler.acquire_async(host)
+        async with self._host_slot(host):
+            # Start the clock once we hold a slot so queueing doesn't eat the timeout
+            start = loop.time()
+            try:
+                async with self._session.get(
+                    url,
+                    params=params,
+                    headers=headers,
+                    ssl=bool(verify),
+                    timeout=aiohttp.ClientTimeout(total=timeout or self.timeout),
+                ) as response:
+                    text = await response.text(errors='replace')
+                    return FetchResult(str(response.url), response.status, text,
+                                       elapsed=loop.time() - start, headers=dict(response.headers))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                return FetchResult(url, error=e, elapsed=loop.time() - start)
+
+    async def warm_up(self, url, headers=None, timeout=10):
+        """Visits `url` once per engine; later fetches to that host reuse its cookies."""
+        if url not in self._warmups:
+            self._warmups[url] = asyncio.ensure_future(self.fetch(url, headers=headers, timeout=timeout))
+        return await self._warmups[url]
+
+    async def fetch_request(self, request, headers=None):
+        """
+        Fetches one request dict as built by the tasks.build_*_request helpers.
+        `headers` replaces the request's own headers (e.g. to add cache validators).
+        """
+        if request.get('warmup_url'):
+            await self.warm_up(request['warmup_url'], headers=request.get('headers'))
+        return await self.fetch(
+            request['url'],
+            params=request.get('params'),
+            headers=headers if headers is not None else request.get('headers'),
+            timeout=request.get('timeout'),
+            verify=request.get('verify', True),
+        )
+
+    async def fetch_all(self, requests):
+        """Fetches all request dicts concurrently; results keep the input order."""
+        return await asyncio.gather(*(self.fetch_request(request) for request in requests))
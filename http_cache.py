@@ -0,0 +1,210 @@
+# http_cache.py
+# On-disk cache for scraper search pages.
+#
+# Entries are keyed by the normalized request URL plus params. A fresh entry
+# (younger than the TTL) is served without touching the network; a stale one
+# is revalidated with If-None-Match / If-Modified-Since so an unchanged page
+# costs a 304 instead of a full download. Every entry also records a content
+# hash of the page and the jobs parsed from it, so an unchanged page skips
+# HTML parsing entirely. Total size on disk is bounded by evicting the least
+# recently used entries.
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import HTTP_CACHE_CONFIG
+
+
+class CachedPage:
+    """A page as handed to the parsers, whether it came from the network or the cache."""
+
+    def __init__(self, key, status, text, content_hash=None, from_cache=False):
+        self.key = key
+        self.status = status
+        self.text = text
+        self.content_hash = content_hash
+        self.from_cache = from_cache
+
+
+def make_key(url, params=None):
+    """Cache key for a request: scheme and host lowercased, query params merged and sorted."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query.extend((str(k), str(v)) for k, v in (params or {}).items())
+    normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', urlencode(sorted(query)), ''))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8', errors='replace')).hexdigest()
+
+
+class HTTPCache:
+    """Size-bounded on-disk cache of search pages with conditional revalidation."""
+
+    def __init__(self, directory=None, ttl=None, max_bytes=None, enabled=None):
+        self.directory = directory or HTTP_CACHE_CONFIG['DIR']
+        self.ttl = ttl if ttl is not None else HTTP_CACHE_CONFIG['TTL']
+        self.max_bytes = max_bytes if max_bytes is not None else HTTP_CACHE_CONFIG['MAX_BYTES']
+        self.enabled = enabled if enabled is not None else HTTP_CACHE_CONFIG['ENABLED']
+        self._lock = threading.Lock()
+        self._written_since_evict = 0
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f"{key}.{suffix}")
+
+    def _write_atomic(self, path, data):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return len(data)
+
+    def _load_meta(self, key):
+        try:
+            with open(self._path(key, 'json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_meta(self, key, meta):
+        return self._write_atomic(self._path(key, 'json'), json.dumps(meta).encode('utf-8'))
+
+    def _load_body(self, key):
+        try:
+            with open(self._path(key, 'body'), 'rb') as f:
+                return f.read().decode('utf-8', errors='replace')
+        except OSError:
+            return None
+
+    def prepare(self, url, params=None, headers=None):
+        """
+        Looks up a request before it is sent.
+
+        Returns (page, headers): `page` is a CachedPage when a fresh entry can
+        be served without any request, otherwise None and `headers` carries the
+        conditional validators of any stale entry.
+        """
+        headers = dict(headers or {})
+        if not self.enabled:
+            return None, headers
+
+        key = make_key(url, params)
+        meta = self._load_meta(key)
+        if meta is None:
+            return None, headers
+
+        if time.time() - meta['fetched_at'] < self.ttl:
+            body = self._load_body(key)
+            if body is not None:
+                os.utime(self._path(key, 'json'))
+                return CachedPage(key, 200, body, meta['content_hash'], from_cache=True), headers
+
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return None, headers
+
+    def resolve(self, url, params, status, response_headers, text):
+        """
+        Turns a network response into a CachedPage, storing 200s and serving
+        the cached body for a 304.
+        """
+        key = make_key(url, params)
+        if not self.enabled:
+            return CachedPage(key, status, text, content_hash(text) if status == 200 else None)
+
+        meta = self._load_meta(key)
+        if status == 304 and meta is not None:
+            body = self._load_body(key)
+            if body is not None:
+                meta['fetched_at'] = time.time()
+                self._save_meta(key, meta)
+                return CachedPage(key, 200, body, meta['content_hash'], from_cache=True)
+
+        if status != 200:
+            return CachedPage(key, status, text)
+
+        page_hash = content_hash(text)
+        new_meta = {
+            'url': url,
+            'fetched_at': time.time(),
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'content_hash': page_hash,
+            # Parsed jobs survive a re-download as long as the content is identical
+            'parsed': meta['parsed'] if meta and meta.get('content_hash') == page_hash else {},
+        }
+        written = self._write_atomic(self._path(key, 'body'), text.encode('utf-8', errors='replace'))
+        written += self._save_meta(key, new_meta)
+        self._note_written(written)
+        return CachedPage(key, 200, text, page_hash)
+
+    def load_parsed(self, page, max_jobs):
+        """Returns jobs previously parsed from this exact page content, or None."""
+        if not self.enabled or page.content_hash is None:
+            return None
+        meta = self._load_meta(page.key)
+        if meta is None or meta.get('content_hash') != page.content_hash:
+            return None
+        return meta.get('parsed', {}).get(str(max_jobs))
+
+    def store_parsed(self, page, max_jobs, jobs):
+        if not self.enabled or page.content_hash is None:
+            return
+        meta = self._load_meta(page.key)
+        if meta is None or meta.get('content_hash') != page.content_hash:
+            return
+        meta.setdefault('parsed', {})[str(max_jobs)] = jobs
+        self._note_written(self._save_meta(page.key, meta))
+
+    def _note_written(self, nbytes):
+        with self._lock:
+            self._written_since_evict += nbytes
+            # Only rescan the directory once enough has been written to matter
+            if self._written_since_evict < self.max_bytes // 10:
+                return
+            self._written_since_evict = 0
+        self.evict()
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                return
+            entries = {}
+            total = 0
+            for name in names:
+                key, _, suffix = name.partition('.')
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                total += stat.st_size
+                size, last_used = entries.get(key, (0, 0))
+                if suffix == 'json':
+                    last_used = stat.st_mtime
+                entries[key] = (size + stat.st_size, last_used)
+
+            for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+                if total <= self.max_bytes:
+                    break
+                for suffix in ('json', 'body'):
+                    try:
+                        os.remove(self._path(key, suffix))
+                    except OSError:
+                        pass
+                total -= size
+
+
+# Shared by the blocking scrapers and the async engine.
+http_cache = HTTPCache()
@@ -0,0 +1,118 @@
+# ingestion.py
+# Bulk loading of scraped jobs into the jobs table.
+#
+# A cycle's jobs go to Postgres in a handful of statements instead of one
+# INSERT round trip per job: multi-row INSERTs via execute_values for normal
+# batches, or COPY into a temporary staging table followed by a single merge
+# for large ones. Both are upserts on apply_link: new jobs are inserted with
+# first_seen = last_seen = now, jobs already stored get last_seen bumped (see
+# retention.py, which expires jobs not seen for a while). RETURNING (xmax = 0)
+# tells the caller exactly which jobs were new. Each job's location is
+# normalized to its canonical locations.id on the way in.
+#
+# Rows go in apply_link order, so concurrent upserts of overlapping batches
+# lock the rows they share in the same order instead of deadlocking.
+
+import csv
+import io
+
+from psycopg2.extras import execute_values
+
+from locations import load_location_ids, location_id_for
+
+# Rows per INSERT statement sent by execute_values.
+PAGE_SIZE = 1000
+# Batches at least this big go through COPY instead.
+COPY_THRESHOLD = 5000
+
+COLUMNS = ('title', 'company', 'location', 'apply_link', 'location_id')
+
+# A job seen again within this long keeps its last_seen, so the same posting
+# returned by several searches in one cycle is only rewritten once.
+TOUCH_INTERVAL = '1 hour'
+
+
+def _upsert_clause(table):
+    # xmax is 0 only on a freshly inserted row version, not on an updated one
+    return (
+        f"ON CONFLICT (apply_link) DO UPDATE SET last_seen = NOW() "
+        f"WHERE {table}.last_seen < NOW() - INTERVAL '{TOUCH_INTERVAL}' "
+        f"RETURNING apply_link, (xmax = 0) AS inserted"
+    )
+
+
+def _clean(value):
+    # Postgres text cannot hold NUL bytes, which occasionally show up in scraped HTML
+    return value.replace('\x00', '') if isinstance(value, str) else value
+
+
+def _unique_rows(jobs):
+    """Jobs with a usable apply_link, deduplicated by it (first one wins)."""
+    unique = {}
+    for job in jobs:
+        link = _clean(job.get('apply_link'))
+        if link and link not in unique:
+            unique[link] = job
+    return unique
+
+
+def _row(job, location_ids):
+    fields = tuple(_clean(job.get(column)) for column in COLUMNS[:-1])
+    return fields + (location_id_for(job.get('location'), location_ids),)
+
+
+def insert_values(cursor, jobs, table='jobs', page_size=PAGE_SIZE, location_ids=None):
+    """Multi-row INSERT ... ON CONFLICT DO UPDATE; returns the set of apply_links that were inserted."""
+    rows = [_row(job, location_ids or {}) for job in jobs]
+    if not rows:
+        return set()
+    returned = execute_values(
+        cursor,
+        f"INSERT INTO {table} ({', '.join(COLUMNS)}) VALUES %s " + _upsert_clause(table),
+        rows,
+        page_size=page_size,
+        fetch=True,
+    )
+    return {row[0] for row in returned if row[1]}
+
+
+def insert_copy(cursor, jobs, table='jobs', location_ids=None):
+    """COPY into a staging table, then one merge into `table`; returns the set of apply_links inserted."""
+    rows = [_row(job, location_ids or {}) for job in jobs]
+    if not rows:
+        return set()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(rows)
+    buffer.seek(0)
+
+    cursor.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS jobs_staging "
+        "(title TEXT, company TEXT, location TEXT, apply_link TEXT, location_id INTEGER) ON COMMIT DROP"
+    )
+    cursor.copy_expert(f"COPY jobs_staging ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    cursor.execute(
+        f"INSERT INTO {table} ({', '.join(COLUMNS)}) "
+        f"SELECT {', '.join(COLUMNS)} FROM jobs_staging ORDER BY apply_link " + _upsert_clause(table)
+    )
+    inserted = {row[0] for row in cursor.fetchall() if row[1]}
+    cursor.execute("DROP TABLE jobs_staging")
+    return inserted
+
+
+def ingest_jobs(cursor, jobs, table='jobs', method=None):
+    """
+    Inserts scraped jobs in bulk and returns the ones that were new, in input order.
+
+    `method` is 'values' or 'copy'; by default COPY is used for batches of
+    COPY_THRESHOLD or more. The caller owns the transaction and commits.
+    """
+    unique = _unique_rows(jobs)
+    if not unique:
+        return []
+    if method is None:
+        method = 'copy' if len(unique) >= COPY_THRESHOLD else 'values'
+    insert = insert_copy if method == 'copy' else insert_values
+    rows = [unique[link] for link in sorted(unique)]
+    inserted = insert(cursor, rows, table=table, location_ids=load_location_ids(cursor))
+    return [job for link, job in unique.items() if link in inserted]
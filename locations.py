@@ -0,0 +1,122 @@
+# locations.py
+# Canonical job locations and the aliases scraped cards use for them.
+#
+# Scraped location strings vary ("Bengaluru, Karnataka", "Bangalore Urban",
+# "Gurugram, Haryana", "Work from home"). Jobs are normalized at ingestion to
+# a row in the `locations` table and store its id, so /search filters by
+# location with an index lookup on jobs.location_id. Strings that match no
+# canonical location keep location_id NULL and are still reachable through
+# the pg_trgm index on jobs.location.
+
+import re
+
+# name -> (country, aliases). Aliases are lowercase and matched as whole words.
+CANONICAL_LOCATIONS = {
+    'Remote': (None, ['remote', 'work from home', 'wfh', 'anywhere']),
+    'Bangalore, Karnataka': ('India', ['bangalore', 'bengaluru', 'bangalore urban', 'bengaluru urban', 'blr']),
+    'Chandigarh': ('India', ['chandigarh', 'mohali', 'panchkula']),
+    'Delhi': ('India', ['delhi', 'new delhi', 'delhi ncr']),
+    'Gurgaon, Haryana': ('India', ['gurgaon', 'gurugram']),
+    'Noida, Uttar Pradesh': ('India', ['noida', 'greater noida']),
+    'Pune, Maharashtra': ('India', ['pune']),
+    'Hyderabad, Telangana': ('India', ['hyderabad', 'secunderabad']),
+    'Mumbai, Maharashtra': ('India', ['mumbai', 'bombay', 'navi mumbai', 'thane']),
+    'Chennai, Tamil Nadu': ('India', ['chennai', 'madras']),
+    'Kolkata, West Bengal': ('India', ['kolkata', 'calcutta']),
+}
+
+COUNTRIES = {'india': 'India'}
+
+_ALIASES = {alias: name for name, (_, aliases) in CANONICAL_LOCATIONS.items() for alias in aliases}
+_ALIASES.update({name.lower(): name for name in CANONICAL_LOCATIONS})
+# Longest alias first so "navi mumbai" wins over "mumbai"; remote is checked before cities
+_ALIAS_PATTERN = re.compile(
+    r'\b(' + '|'.join(re.escape(alias) for alias in sorted(_ALIASES, key=len, reverse=True)) + r')\b'
+)
+_REMOTE_PATTERN = re.compile(r'\b(' + '|'.join(re.escape(a) for a in CANONICAL_LOCATIONS['Remote'][1]) + r')\b')
+
+# Filled from the locations table on first use: canonical name -> id
+_location_ids = {}
+
+
+def canonical_location(text):
+    """Returns the canonical location name for a scraped or typed location string, or None."""
+    if not text:
+        return None
+    lowered = ' '.join(text.lower().split())
+    if lowered in _ALIASES:
+        return _ALIASES[lowered]
+    # A job that mentions remote work anywhere ("Pune (Remote)") counts as remote
+    if _REMOTE_PATTERN.search(lowered):
+        return 'Remote'
+    match = _ALIAS_PATTERN.search(lowered)
+    return _ALIASES[match.group(1)] if match else None
+
+
+def is_known_location(text):
+    """Whether `text` is exactly a location name, alias or supported country (not just mentions one)."""
+    lowered = ' '.join((text or '').lower().split())
+    return lowered in _ALIASES or lowered in COUNTRIES
+
+
+def location_filter(text):
+    """
+    SQL fragment (to AND onto a jobs query) and params for a location filter.
+    Canonical locations and countries use jobs.location_id; anything else is
+    a substring match served by the trigram index.
+    """
+    text = (text or '').strip()
+    country = COUNTRIES.get(text.lower())
+    if country:
+        # Cities we don't have canonical rows for still say "India" in the string
+        return (" AND (location_id IN (SELECT id FROM locations WHERE country = %s) OR location ILIKE %s)",
+                [country, f'%{country}%'])
+    name = canonical_location(text)
+    if name:
+        return " AND location_id = (SELECT id FROM locations WHERE name = %s)", [name]
+    return " AND location ILIKE %s", [f'%{text}%']
+
+
+def sync_locations(cursor):
+    """Upserts CANONICAL_LOCATIONS into the locations table."""
+    for name, (country, aliases) in CANONICAL_LOCATIONS.items():
+        cursor.execute(
+            """
+            INSERT INTO locations (name, country, aliases) VALUES (%s, %s, %s)
+            ON CONFLICT (name) DO UPDATE SET country = EXCLUDED.country, aliases = EXCLUDED.aliases
+            """,
+            (name, country, aliases)
+        )
+
+
+def load_location_ids(cursor):
+    """Canonical name -> locations.id, cached for the life of the process."""
+    if not _location_ids:
+        cursor.execute("SELECT id, name FROM locations")
+        _location_ids.update({row[1]: row[0] for row in cursor.fetchall()})
+    return _location_ids
+
+
+def location_id_for(text, location_ids):
+    name = canonical_location(text)
+    return location_ids.get(name) if name else None
+
+
+def backfill_location_ids(cursor):
+    """Sets location_id on existing jobs that don't have one yet. Returns the number of rows updated."""
+    location_ids = load_location_ids(cursor)
+    cursor.execute("SELECT DISTINCT location FROM jobs WHERE location_id IS NULL AND location IS NOT NULL")
+    by_id = {}
+    for (text,) in cursor.fetchall():
+        location_id = location_id_for(text, location_ids)
+        if location_id is not None:
+            by_id.setdefault(location_id, []).append(text)
+
+    updated = 0
+    for location_id, texts in by_id.items():
+        cursor.execute(
+            "UPDATE jobs SET location_id = %s WHERE location_id IS NULL AND location = ANY(%s)",
+            (location_id, texts)
+        )
+        updated += cursor.rowcount
+    return updated
@@ -0,0 +1,160 @@
+# matches.py
+# Precomputed skill match scores between users and jobs.
+#
+# A job's score for a user only changes when new jobs arrive, a job's
+# description is fetched (see enrichment.py) or the user's skills change, so
+# it is computed at those points and stored in
+# user_job_matches instead of on every personalized /search. The table is
+# indexed on (user_id, score DESC, job_id DESC), so a personalized page is a
+# short index range read. Only jobs that match at least one skill (score > 0)
+# are stored; the rest are implicitly score 0. Full rescoring reads posting
+# lists from the in-memory skill index (see skill_index.py) once it is built
+# and has lists for every skill involved, caught up first with jobs other
+# processes ingested. Otherwise it streams the jobs table through a
+# server-side cursor (see streaming.py), so it runs in constant memory
+# however many jobs there are, and that pass fills in the index's lists for
+# the skills it didn't have.
+
+from psycopg2.extras import execute_values
+
+from skill_index import job_text, skill_index
+from skill_matcher import matcher_for
+from streaming import batched, stream_rows
+
+# Rows per INSERT statement sent by execute_values.
+PAGE_SIZE = 1000
+
+
+def calculate_job_match_score(job_data, user_skills):
+    """
+    Calculate how well a job matches the user's skills.
+    Returns a match score (0-100) and list of matched skills.
+    """
+    if not user_skills:
+        return 0, []
+
+    text = job_text(job_data.get('title'), job_data.get('company'), job_data.get('description'))
+
+    # One pass over the job text with the user's compiled skills; a skill
+    # counts when it appears as a whole word in the title, company name or
+    # description
+    found = set(matcher_for(user_skills).find(text))
+    matched_skills = [skill for skill in user_skills if skill.lower() in found]
+
+    # Calculate score: percentage of user skills that matched
+    score = (len(matched_skills) / len(user_skills)) * 100
+
+    return round(score, 1), matched_skills
+
+
+def score_rows(users, jobs):
+    """
+    Yields (user_id, job_id, score, matched_skills) for every matching pair of
+    (id, skills) users and (jobid, title, company, description) jobs. `jobs`
+    may be a stream.
+    """
+    for job_id, title, company, description in jobs:
+        job_data = {'title': title, 'company': company, 'description': description}
+        for user_id, skills in users:
+            score, matched = calculate_job_match_score(job_data, skills)
+            if score > 0:
+                yield (user_id, job_id, score, matched)
+
+
+def _store(cursor, rows):
+    stored = 0
+    for batch in batched(rows, PAGE_SIZE):
+        # The join skips jobs deleted since they were scored (e.g. by retention)
+        execute_values(
+            cursor,
+            "INSERT INTO user_job_matches (user_id, job_id, score, matched_skills) "
+            "SELECT v.user_id, v.job_id, v.score, v.matched_skills "
+            "FROM (VALUES %s) AS v (user_id, job_id, score, matched_skills) JOIN jobs ON jobs.jobid = v.job_id "
+            "ON CONFLICT (user_id, job_id) DO UPDATE "
+            "SET score = EXCLUDED.score, matched_skills = EXCLUDED.matched_skills",
+            batch,
+            page_size=PAGE_SIZE,
+        )
+        stored += len(batch)
+    return stored
+
+
+def _all_jobs(cursor):
+    return stream_rows(cursor.connection, "SELECT jobid, title, company, description FROM jobs")
+
+
+def _index_covers(cursor, skills):
+    # The index only knows the jobs this process ingested since it was built
+    if not skill_index.ready:
+        return False
+    skill_index.catch_up(cursor)
+    return skill_index.covers(skills)
+
+
+def _scanned_jobs(cursor, skills):
+    jobs = _all_jobs(cursor)
+    return skill_index.learn(skills, jobs) if skill_index.ready else jobs
+
+
+def _indexed_rows(user_id, skills):
+    return ((user_id, job_id, score, matched) for job_id, score, matched in skill_index.match(skills))
+
+
+def _refresh_jobs(cursor, jobs):
+    skill_index.add_jobs(jobs)
+    cursor.execute("SELECT id, skills FROM users WHERE skills IS NOT NULL AND array_length(skills, 1) > 0")
+    users = [(row[0], row[1]) for row in cursor.fetchall()]
+    return _store(cursor, score_rows(users, jobs))
+
+
+def refresh_for_jobs(cursor, apply_links):
+    """
+    Scores newly ingested jobs (by apply_link) against every user with skills.
+    Returns the number of matches stored. The caller commits.
+    """
+    if not apply_links:
+        return 0
+    cursor.execute("SELECT jobid, title, company, description FROM jobs WHERE apply_link = ANY(%s)",
+                   (list(apply_links),))
+    jobs = [(row[0], row[1], row[2], row[3]) for row in cursor.fetchall()]
+    return _refresh_jobs(cursor, jobs)
+
+
+def refresh_for_job_ids(cursor, job_ids):
+    """
+    Rescores jobs whose text changed, e.g. after their description was
+    fetched, against every user with skills. Returns the number of matches
+    stored. The caller commits.
+    """
+    if not job_ids:
+        return 0
+    cursor.execute("DELETE FROM user_job_matches WHERE job_id = ANY(%s)", (list(job_ids),))
+    cursor.execute("SELECT jobid, title, company, description FROM jobs WHERE jobid = ANY(%s)", (list(job_ids),))
+    jobs = [(row[0], row[1], row[2], row[3]) for row in cursor.fetchall()]
+    return _refresh_jobs(cursor, jobs)
+
+
+def refresh_for_user(cursor, user_id, skills):
+    """
+    Recomputes all of one user's matches, e.g. after their skills changed.
+    Returns the number of matches stored. The caller commits.
+    """
+    cursor.execute("DELETE FROM user_job_matches WHERE user_id = %s", (user_id,))
+    if not skills:
+        return 0
+    if _index_covers(cursor, skills):
+        return _store(cursor, _indexed_rows(user_id, skills))
+    return _store(cursor, score_rows([(user_id, skills)], _scanned_jobs(cursor, skills)))
+
+
+def refresh_all(cursor):
+    """Recomputes matches for every user with skills. Returns the number of matches stored."""
+    cursor.execute("SELECT id, skills FROM users WHERE skills IS NOT NULL AND array_length(skills, 1) > 0")
+    users = [(row[0], row[1]) for row in cursor.fetchall()]
+    cursor.execute("DELETE FROM user_job_matches")
+    if not users:
+        return 0
+    all_skills = [skill for _, skills in users for skill in skills]
+    if _index_covers(cursor, all_skills):
+        return sum(_store(cursor, _indexed_rows(user_id, skills)) for user_id, skills in users)
+    return _store(cursor, score_rows(users, _scanned_jobs(cursor, all_skills)))
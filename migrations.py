@@ -0,0 +1,325 @@
+# migrations.py
+# Versioned schema migrations.
+#
+# Each migration runs once, in its own transaction, and is recorded in the
+# schema_migrations table. migrate() takes a Postgres advisory lock first, so
+# when several workers (or a deploy step and a worker) start together only one
+# applies the pending migrations and the rest wait and then find nothing to do.
+# App startup only runs check_schema(): a version lookup comparing the
+# recorded version with LATEST_VERSION.
+#
+#     python migrations.py            # apply pending migrations
+#     python migrations.py status     # show applied / pending migrations
+#
+# Add new schema changes as a new function at the end of MIGRATIONS; never
+# edit one that has shipped.
+
+import sys
+
+import psycopg2
+
+from config import DATABASE_CONFIG, DB_AUTO_MIGRATE
+from bm25 import index_all
+from locations import sync_locations, backfill_location_ids
+from matches import refresh_all
+
+# Arbitrary key shared by every process that runs migrations.
+ADVISORY_LOCK_ID = 720_416_001
+
+
+def create_jobs_and_users(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS jobs (
+        jobId SERIAL PRIMARY KEY,
+        title TEXT NOT NULL,
+        company TEXT,
+        location TEXT,
+        description TEXT,
+        apply_link TEXT UNIQUE NOT NULL
+    );
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL
+    );
+    ''')
+
+
+def add_user_profile_columns(cursor):
+    # skills is a TEXT[] (PostgreSQL array of strings)
+    cursor.execute('''
+        ALTER TABLE users
+        ADD COLUMN IF NOT EXISTS skills TEXT[],
+        ADD COLUMN IF NOT EXISTS email_alerts_enabled BOOLEAN DEFAULT FALSE,
+        ADD COLUMN IF NOT EXISTS last_email_check TIMESTAMP,
+        ADD COLUMN IF NOT EXISTS email_smtp_server TEXT,
+        ADD COLUMN IF NOT EXISTS email_smtp_port INTEGER,
+        ADD COLUMN IF NOT EXISTS email_username TEXT,
+        ADD COLUMN IF NOT EXISTS email_password TEXT,
+        ADD COLUMN IF NOT EXISTS preferred_location TEXT;
+    ''')
+
+
+def add_sendgrid_columns(cursor):
+    cursor.execute('''
+        ALTER TABLE users
+        ADD COLUMN IF NOT EXISTS sendgrid_api_key TEXT,
+        ADD COLUMN IF NOT EXISTS from_email TEXT;
+    ''')
+
+
+def add_search_vector(cursor):
+    # A generated column keeps the vector in sync with every insert/update;
+    # title weighs most, then company, location and description.
+    cursor.execute('''
+        ALTER TABLE jobs
+        ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(company, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(location, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'D')
+        ) STORED;
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS jobs_search_vector_idx ON jobs USING GIN (search_vector);")
+
+
+def add_locations(cursor):
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS locations (
+        id SERIAL PRIMARY KEY,
+        name TEXT UNIQUE NOT NULL,
+        country TEXT,
+        aliases TEXT[] NOT NULL DEFAULT '{}'
+    );
+    ''')
+    cursor.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS location_id INTEGER REFERENCES locations(id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS jobs_location_id_idx ON jobs (location_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS jobs_location_trgm_idx ON jobs USING GIN (location gin_trgm_ops);")
+    sync_locations(cursor)
+    backfill_location_ids(cursor)
+
+
+def add_seen_timestamps(cursor):
+    # NOW() is not volatile, so Postgres 11+ adds these without rewriting the table;
+    # existing jobs start their retention clock at the migration
+    cursor.execute('''
+        ALTER TABLE jobs
+        ADD COLUMN IF NOT EXISTS first_seen TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        ADD COLUMN IF NOT EXISTS last_seen TIMESTAMPTZ NOT NULL DEFAULT NOW();
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS jobs_first_seen_idx ON jobs (first_seen);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS jobs_last_seen_idx ON jobs (last_seen);")
+
+
+def add_user_job_matches(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS user_job_matches (
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        job_id INTEGER NOT NULL REFERENCES jobs(jobid) ON DELETE CASCADE,
+        score DOUBLE PRECISION NOT NULL,
+        matched_skills TEXT[] NOT NULL DEFAULT '{}',
+        PRIMARY KEY (user_id, job_id)
+    );
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS user_job_matches_user_score_idx
+        ON user_job_matches (user_id, score DESC, job_id DESC);
+    ''')
+    # Retention deletes cascade through job_id
+    cursor.execute("CREATE INDEX IF NOT EXISTS user_job_matches_job_idx ON user_job_matches (job_id);")
+    refresh_all(cursor)
+
+
+def rescore_whole_word_matches(cursor):
+    # Skills now match job text as whole words ("java" no longer in "javascript")
+    refresh_all(cursor)
+
+
+def add_bm25_statistics(cursor):
+    # Inverted index and corpus statistics for BM25 ranking (see bm25.py)
+    cursor.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS doc_length INTEGER;")
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS job_terms (
+        term TEXT NOT NULL,
+        job_id INTEGER NOT NULL REFERENCES jobs(jobid) ON DELETE CASCADE,
+        tf INTEGER NOT NULL,
+        PRIMARY KEY (term, job_id)
+    );
+    ''')
+    # Retention deletes cascade through job_id
+    cursor.execute("CREATE INDEX IF NOT EXISTS job_terms_job_idx ON job_terms (job_id);")
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS term_stats (
+        term TEXT PRIMARY KEY,
+        doc_freq INTEGER NOT NULL
+    );
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS corpus_stats (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        doc_count BIGINT NOT NULL DEFAULT 0,
+        total_length BIGINT NOT NULL DEFAULT 0
+    );
+    ''')
+    cursor.execute("INSERT INTO corpus_stats (id) VALUES (TRUE) ON CONFLICT DO NOTHING;")
+    index_all(cursor)
+
+
+def add_description_enrichment(cursor):
+    # Progress of detail-page fetching (see enrichment.py)
+    cursor.execute('''
+        ALTER TABLE jobs
+        ADD COLUMN IF NOT EXISTS description_attempts SMALLINT NOT NULL DEFAULT 0,
+        ADD COLUMN IF NOT EXISTS description_checked_at TIMESTAMPTZ;
+    ''')
+    # Only jobs still waiting for a description, in the order they are picked up
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS jobs_missing_description_idx
+        ON jobs (description_attempts, jobid DESC) WHERE description IS NULL;
+    ''')
+
+
+def add_description_checked_index(cursor):
+    # Jobs enriched since a worker's skill index last caught up (see skill_index.py)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS jobs_description_checked_at_idx ON jobs (description_checked_at);
+    ''')
+
+
+# (version, name, function). The early ones use IF NOT EXISTS throughout so a
+# database created before schema_migrations existed is adopted without errors.
+MIGRATIONS = [
+    (1, 'create jobs and users', create_jobs_and_users),
+    (2, 'user profile and email columns', add_user_profile_columns),
+    (3, 'sendgrid columns', add_sendgrid_columns),
+    (4, 'full-text search vector', add_search_vector),
+    (5, 'canonical locations', add_locations),
+    (6, 'job first_seen / last_seen', add_seen_timestamps),
+    (7, 'precomputed user job matches', add_user_job_matches),
+    (8, 'rescore matches on whole words', rescore_whole_word_matches),
+    (9, 'bm25 statistics', add_bm25_statistics),
+    (10, 'description enrichment progress', add_description_enrichment),
+    (11, 'description_checked_at index', add_description_checked_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(cursor):
+    """Highest applied migration, or 0 on a database that has never been migrated."""
+    cursor.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        return 0
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+    return cursor.fetchone()[0]
+
+
+def _applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def pending_migrations(cursor):
+    """Migrations not yet recorded in schema_migrations, in order."""
+    if current_version(cursor) == 0:
+        return list(MIGRATIONS)
+    applied = _applied_versions(cursor)
+    return [m for m in MIGRATIONS if m[0] not in applied]
+
+
+def migrate(conn):
+    """
+    Applies pending migrations under the advisory lock and returns the
+    versions applied. Stops at the first failure (that migration is rolled
+    back and the error re-raised); earlier ones stay committed.
+    """
+    conn.autocommit = False
+    cursor = conn.cursor()
+    cursor.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_ID,))
+    applied = []
+    try:
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        ''')
+        conn.commit()
+        # Read after taking the lock: another process may have just finished
+        done = _applied_versions(cursor)
+        for version, name, apply in MIGRATIONS:
+            if version in done:
+                continue
+            try:
+                apply(cursor)
+                cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                print(f"❌ Migration {version} ({name}) failed")
+                raise
+            print(f"✅ Applied migration {version}: {name}")
+            applied.append(version)
+    finally:
+        if conn.closed == 0:
+            conn.rollback()
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_ID,))
+            conn.commit()
+        cursor.close()
+    return applied
+
+
+def check_schema(conn, auto_migrate=None):
+    """
+    Startup check: just the version lookup when the schema is current. When it is behind,
+    applies the pending migrations if DB_AUTO_MIGRATE is on, otherwise only
+    warns. Returns the schema version afterwards.
+    """
+    auto_migrate = DB_AUTO_MIGRATE if auto_migrate is None else auto_migrate
+    with conn.cursor() as cursor:
+        version = current_version(cursor)
+    conn.rollback()
+    if version >= LATEST_VERSION:
+        return version
+    if not auto_migrate:
+        print(f"⚠️  Database schema is at version {version}, code expects {LATEST_VERSION}. "
+              f"Run `python migrations.py`.")
+        return version
+    migrate(conn)
+    return LATEST_VERSION
+
+
+def print_status(conn):
+    with conn.cursor() as cursor:
+        version = current_version(cursor)
+        pending = pending_migrations(cursor)
+    conn.rollback()
+    print(f"Schema version {version} (latest {LATEST_VERSION})")
+    for number, name, _ in pending:
+        print(f"  pending: {number} {name}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else 'migrate'
+    if command not in ('migrate', 'status'):
+        print("usage: python migrations.py [migrate|status]")
+        return 2
+    conn = psycopg2.connect(**DATABASE_CONFIG)
+    try:
+        if command == 'status':
+            print_status(conn)
+        else:
+            applied = migrate(conn)
+            print(f"Database is at version {LATEST_VERSION} ({len(applied)} migrations applied).")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
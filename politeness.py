@@ -0,0 +1,83 @@
+# politeness.py
+# Central per-domain rate limiting for the scrapers.
+#
+# Every configured target host gets a token bucket (see RATE_LIMITS in
+# config.py). Scrapers ask the scheduler for a slot right before a request
+# instead of sleeping a fixed amount, so an idle host is hit immediately and
+# requests to different hosts never wait on each other.
+
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+from config import RATE_LIMITS
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `burst` stored."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Takes one token and returns how many seconds the caller must wait
+        before using it. Tokens may go negative, which queues later callers
+        behind earlier ones in arrival order.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class PolitenessScheduler:
+    """Hands out request slots per domain. Hosts without a configured limit pass straight through."""
+
+    def __init__(self, limits=None):
+        self.limits = limits if limits is not None else RATE_LIMITS
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, target):
+        """Returns the bucket for a URL or hostname, matching configured domains and their subdomains."""
+        host = urlsplit(target).hostname if '://' in target else target.split(':')[0]
+        host = (host or '').lower()
+        matches = [domain for domain in self.limits if host == domain or host.endswith('.' + domain)]
+        if not matches:
+            return None
+        domain = max(matches, key=len)
+        with self._lock:
+            if domain not in self._buckets:
+                limit = self.limits[domain]
+                self._buckets[domain] = TokenBucket(limit['rate'], limit['burst'])
+            return self._buckets[domain]
+
+    def acquire(self, target):
+        """Blocks until `target`'s host may be requested. Returns the time waited."""
+        bucket = self.bucket_for(target)
+        wait = bucket.reserve() if bucket else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, target):
+        """Async variant of acquire() for the fetch engine."""
+        bucket = self.bucket_for(target)
+        wait = bucket.reserve() if bucket else 0.0
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+# Shared by every scraper thread, the async engine and /test-scrape.
+scheduler = PolitenessScheduler()
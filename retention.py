@@ -0,0 +1,69 @@
+# retention.py
+# Expiry of job postings that scrapes no longer return.
+#
+# Every ingestion bumps jobs.last_seen for postings that are still listed (see
+# ingestion.py), so a job whose last_seen is older than RETENTION_DAYS has
+# most likely been filled or taken down. Expired rows are deleted in small
+# batches, each its own transaction, walking the last_seen index; that keeps
+# locks short and WAL bursts small instead of one large DELETE. Each batch
+# also takes its jobs out of the BM25 statistics (see bm25.py).
+#
+# jobs is not partitioned by month: Postgres requires a partitioned table's
+# unique constraints to include the partition key, and apply_link must stay
+# unique on its own for the ingestion upsert and KnownLinks to work.
+
+from bm25 import forget_jobs
+from config import JOB_RETENTION_CONFIG
+
+
+def expire_stale_jobs(conn, days=None, batch_size=None, max_batches=None, on_expired=None):
+    """
+    Deletes jobs not seen for `days` days, `batch_size` rows per commit.
+    `on_expired` is called with each committed batch's job ids (e.g. to drop
+    them from the skill index). Returns the number of jobs deleted.
+    """
+    days = days if days is not None else JOB_RETENTION_CONFIG['DAYS']
+    batch_size = batch_size or JOB_RETENTION_CONFIG['BATCH_SIZE']
+    deleted = 0
+    batches = 0
+    with conn.cursor() as cursor:
+        while max_batches is None or batches < max_batches:
+            cursor.execute(
+                """
+                SELECT jobid FROM jobs
+                WHERE last_seen < NOW() - %s * INTERVAL '1 day'
+                ORDER BY last_seen
+                LIMIT %s
+                """,
+                (days, batch_size)
+            )
+            candidates = [row[0] for row in cursor.fetchall()]
+            expired = []
+            if candidates:
+                # Lock them in jobid order, as enrichment does, which keeps an
+                # ingestion from bumping last_seen before the DELETE; rows it
+                # bumped meanwhile drop out of the re-check
+                cursor.execute(
+                    """
+                    SELECT jobid FROM jobs
+                    WHERE jobid = ANY(%s) AND last_seen < NOW() - %s * INTERVAL '1 day'
+                    ORDER BY jobid
+                    FOR UPDATE
+                    """,
+                    (candidates, days)
+                )
+                expired = [row[0] for row in cursor.fetchall()]
+            if expired:
+                # Their BM25 statistics go in the same transaction
+                forget_jobs(cursor, expired)
+                cursor.execute("DELETE FROM jobs WHERE jobid = ANY(%s)", (expired,))
+            conn.commit()
+            batches += 1
+            deleted += len(expired)
+            if on_expired is not None and expired:
+                on_expired(expired)
+            if len(candidates) < batch_size:
+                break
+    if deleted:
+        print(f"🧹 Expired {deleted} jobs not seen for {days} days", flush=True)
+    return deleted
@@ -0,0 +1,141 @@
+# session_pool.py
+# Long-lived, warmed requests.Sessions for the blocking scrapers.
+#
+# Sessions are pooled per (source, domain). A session visits its source's
+# homepage once to collect cookies and is then reused for every search until
+# it reaches its TTL or is invalidated (e.g. after a 403), so a search costs
+# one round trip over a kept-alive connection instead of a fresh session,
+# a homepage visit and a new TCP+TLS handshake. A session is checked out by
+# one thread at a time, which makes the pool safe to share between the
+# background scraper and /test-scrape requests.
+
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import SESSION_POOL_CONFIG
+from politeness import scheduler as default_scheduler
+
+
+class PooledSession:
+    """A requests.Session plus the bookkeeping the pool needs to reuse it."""
+
+    def __init__(self, key, headers=None):
+        self.key = key
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+        self.created_at = time.monotonic()
+        self.warmed = False
+        self.invalid = False
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def invalidate(self):
+        """Marks the session for replacement once it is checked back in."""
+        self.invalid = True
+
+    def close(self):
+        self.session.close()
+
+
+class SessionPool:
+    """Bounded pools of PooledSessions keyed by (source, domain)."""
+
+    def __init__(self, size=None, ttl=None, warmup_timeout=10, scheduler=default_scheduler):
+        self.size = size or SESSION_POOL_CONFIG['SIZE']
+        self.ttl = ttl if ttl is not None else SESSION_POOL_CONFIG['TTL']
+        self.warmup_timeout = warmup_timeout
+        self.scheduler = scheduler
+        self._idle = {}
+        self._open = {}
+        self._cond = threading.Condition()
+        self.stats = {'created': 0, 'reused': 0, 'warmups': 0, 'expired': 0, 'invalidated': 0}
+
+    def _expired(self, pooled):
+        return self.ttl > 0 and time.monotonic() - pooled.created_at >= self.ttl
+
+    def _take(self, key, headers):
+        with self._cond:
+            while True:
+                idle = self._idle.setdefault(key, [])
+                while idle:
+                    pooled = idle.pop()
+                    if not self._expired(pooled):
+                        self.stats['reused'] += 1
+                        return pooled
+                    self.stats['expired'] += 1
+                    self._open[key] -= 1
+                    pooled.close()
+                if self._open.get(key, 0) < self.size:
+                    self._open[key] = self._open.get(key, 0) + 1
+                    self.stats['created'] += 1
+                    break
+                self._cond.wait()
+        return PooledSession(key, headers)
+
+    def _give_back(self, pooled):
+        with self._cond:
+            if pooled.invalid or self._expired(pooled):
+                self.stats['invalidated' if pooled.invalid else 'expired'] += 1
+                self._open[pooled.key] -= 1
+                pooled.close()
+            else:
+                self._idle[pooled.key].append(pooled)
+            self._cond.notify()
+
+    def warm_up(self, pooled, warmup_url):
+        """Visits `warmup_url` with the session to collect cookies. Failures are logged, not raised."""
+        print(f"   Visiting {warmup_url} to establish session...")
+        self.stats['warmups'] += 1
+        try:
+            if self.scheduler is not None:
+                self.scheduler.acquire(warmup_url)
+            pooled.get(warmup_url, timeout=self.warmup_timeout)
+        except Exception as e:
+            print(f"   ⚠️ Could not visit homepage: {e}")
+        # Even a failed visit counts; the next refresh will try again
+        pooled.warmed = True
+
+    @contextmanager
+    def checkout(self, source, domain, headers=None, warmup_url=None):
+        """
+        Yields a PooledSession for (source, domain), warming it first if it is
+        new. Blocks while all `size` sessions for that key are in use.
+        """
+        pooled = self._take((source, domain), headers)
+        try:
+            if warmup_url and not pooled.warmed:
+                self.warm_up(pooled, warmup_url)
+            yield pooled
+        finally:
+            self._give_back(pooled)
+
+    def clear(self):
+        """Closes every idle session; sessions in use are closed when checked in."""
+        with self._cond:
+            for key, idle in self._idle.items():
+                for pooled in idle:
+                    pooled.close()
+                self._open[key] -= len(idle)
+                idle.clear()
+
+    def to_dict(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'ttl': self.ttl,
+                'open': {f"{source}@{domain}": count for (source, domain), count in self._open.items()},
+                'stats': dict(self.stats),
+            }
+
+
+# Shared by every blocking scraper call.
+session_pool = SessionPool()
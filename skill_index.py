@@ -0,0 +1,238 @@
+# skill_index.py
+# In-memory inverted index from skills to the jobs that mention them.
+#
+# calculate_job_match_score looks for every skill in every job's "title
+# company description" text. This index keeps, per skill in its vocabulary,
+# the set of job ids whose text contains it (a posting list), and per job the
+# skills it matched. Scoring a user is then a lookup of their skills' posting
+# lists and a count per job, instead of jobs x skills substring scans.
+#
+# The vocabulary is the resume taxonomy plus every user's skills, loaded when
+# the index is built. Each job's text is matched against the whole vocabulary
+# in one Aho-Corasick pass (skill_matcher.SkillMatcher, the same whole-word
+# rule as calculate_job_match_score) as the job is added, and the text is then
+# dropped, so memory is the posting lists, not the description column. A
+# skill outside the vocabulary has no posting list until learn() fills it in
+# during a pass over the jobs table (see matches.py); covers() tells the two
+# apart.
+#
+# Each process (every gunicorn worker) has its own index, and jobs can be
+# ingested by another process's scraper or enriched with a description by
+# another process. catch_up() reads those from the database before the index
+# is trusted for a full rescore (see matches.py).
+
+import threading
+
+from skill_matcher import TECHNICAL_SKILLS, SkillMatcher
+from streaming import batched, stream_rows
+
+# catch_up() re-reads jobs first seen or enriched this long before the
+# previous sync, so rows from a transaction that committed after that sync
+# (job ids are not committed in order) are still picked up.
+CATCH_UP_OVERLAP_MINUTES = 15
+
+
+def job_text(title, company, description):
+    """The lowercased text calculate_job_match_score matches skills against."""
+    return f"{title or ''} {company or ''} {description or ''}".lower()
+
+
+def _vocabulary(skills):
+    return {skill.lower() for skill in skills if skill}
+
+
+class SkillIndex:
+    """Thread-safe skill -> job-id posting lists over the job corpus."""
+
+    def __init__(self, skills=TECHNICAL_SKILLS):
+        self._postings = {skill: set() for skill in _vocabulary(skills)}
+        # Skills whose posting list covers every indexed job
+        self._complete = set(self._postings)
+        self._matcher = SkillMatcher(self._postings)
+        # Skills each indexed job matched (a tuple, smaller than a set), to drop or replace it
+        self._skills_of = {}
+        self._lock = threading.Lock()
+        # Jobs added or removed while learn() passes over the jobs table
+        self._learning = 0
+        self._changed = []
+        # Highest job id seen and database time of the last build or catch-up
+        self._last_jobid = 0
+        self._synced_at = None
+        self.ready = False
+
+    def __len__(self):
+        return len(self._skills_of)
+
+    def _extend(self, skills):
+        # Call with the lock held; jobs added from now on are matched against `skills` too
+        new = _vocabulary(skills) - set(self._postings)
+        if new:
+            for skill in new:
+                self._postings[skill] = set()
+            self._matcher = SkillMatcher(self._postings)
+        return new
+
+    def covers(self, skills):
+        """Whether every one of `skills` has a complete posting list."""
+        with self._lock:
+            return _vocabulary(skills) <= self._complete
+
+    def add_jobs(self, jobs):
+        """
+        Adds (jobid, title, company, description) rows, replacing the skills of
+        jobs already indexed.
+        """
+        jobs = list(jobs)
+        # Match outside the lock, so lookups aren't held up by the text scans
+        matcher = self._matcher
+        found = [(job_id, tuple(matcher.find(job_text(title, company, description))))
+                 for job_id, title, company, description in jobs]
+        with self._lock:
+            if matcher is not self._matcher:
+                # The vocabulary grew meanwhile; match again with every skill
+                return self._add_jobs_locked(jobs)
+            self._store(found)
+
+    def _add_jobs_locked(self, jobs):
+        find = self._matcher.find
+        self._store([(job_id, tuple(find(job_text(title, company, description))))
+                     for job_id, title, company, description in jobs])
+
+    def _store(self, found):
+        for job_id, skills in found:
+            previous = self._skills_of.get(job_id)
+            if previous is not None and set(previous) == set(skills):
+                continue
+            for skill in set(previous or ()) - set(skills):
+                self._postings[skill].discard(job_id)
+            for skill in skills:
+                self._postings[skill].add(job_id)
+            self._skills_of[job_id] = skills
+            self._last_jobid = max(self._last_jobid, job_id)
+            if self._learning:
+                self._changed.append(job_id)
+
+    def remove_jobs(self, job_ids):
+        with self._lock:
+            for job_id in job_ids:
+                skills = self._skills_of.pop(job_id, None)
+                if skills is not None:
+                    for skill in skills:
+                        self._postings[skill].discard(job_id)
+                    if self._learning:
+                        self._changed.append(job_id)
+
+    def postings(self, skill):
+        """Ids of jobs whose text contains `skill` (case-insensitive), None if it isn't covered."""
+        skill = skill.lower()
+        with self._lock:
+            if skill not in self._complete:
+                return None
+            return set(self._postings[skill])
+
+    def learn(self, skills, jobs):
+        """
+        Passes (jobid, title, company, description) rows through while
+        filling in posting lists for those of `skills` not covered yet; they
+        are covered once the rows run out. For a pass over the whole jobs
+        table that is made anyway, e.g. scoring a user's new skills.
+        """
+        with self._lock:
+            new = _vocabulary(skills) - self._complete
+            if new:
+                self._extend(new)
+                start = len(self._changed)
+                self._learning += 1
+        if not new:
+            yield from jobs
+            return
+        matcher = SkillMatcher(new)
+        learned = []
+        try:
+            for job in jobs:
+                yield job
+                job_id, title, company, description = job
+                found = matcher.find(job_text(title, company, description))
+                if found:
+                    learned.append((job_id, found))
+            with self._lock:
+                # Jobs added, changed or removed during the pass are already
+                # matched against the new skills (or gone)
+                changed = set(self._changed[start:])
+                for job_id, found in learned:
+                    indexed = self._skills_of.get(job_id)
+                    if indexed is None or job_id in changed:
+                        continue
+                    for skill in found:
+                        self._postings[skill].add(job_id)
+                    self._skills_of[job_id] = indexed + tuple(found)
+                self._complete |= new
+        finally:
+            with self._lock:
+                self._learning -= 1
+                if not self._learning:
+                    self._changed = []
+
+    def match(self, user_skills):
+        """
+        Yields (job_id, score, matched_skills) for every indexed job matching
+        at least one skill, with the same score and skill order as
+        calculate_job_match_score. Every skill must be covered (see covers()).
+        """
+        if not user_skills:
+            return
+        # Walking the posting lists in skill order builds each job's matched
+        # list in the order calculate_job_match_score reports it
+        scores = [round(count / len(user_skills) * 100, 1) for count in range(len(user_skills) + 1)]
+        matched = {}
+        with self._lock:
+            for skill in user_skills:
+                for job_id in self._postings.get(skill.lower(), ()):
+                    matched.setdefault(job_id, []).append(skill)
+        results = [(job_id, scores[len(skills)], skills) for job_id, skills in matched.items()]
+        yield from results
+
+    def catch_up(self, cursor):
+        """
+        Adds the jobs ingested or enriched since the last build or catch-up,
+        including those written by other processes. Returns how many rows
+        were read.
+        """
+        with self._lock:
+            last_jobid, synced_at = self._last_jobid, self._synced_at
+        cursor.execute("SELECT NOW()")
+        now = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT jobid, title, company, description FROM jobs "
+            "WHERE jobid > %s OR first_seen >= %s::timestamptz - %s * INTERVAL '1 minute' "
+            "OR description_checked_at >= %s::timestamptz - %s * INTERVAL '1 minute'",
+            (last_jobid, synced_at, CATCH_UP_OVERLAP_MINUTES, synced_at, CATCH_UP_OVERLAP_MINUTES)
+        )
+        rows = [(row[0], row[1], row[2], row[3]) for row in cursor.fetchall()]
+        self.add_jobs(rows)
+        with self._lock:
+            self._synced_at = now
+        return len(rows)
+
+    def build(self, conn, batch_size=5000):
+        """Loads every user skill and job from the database (streamed) and marks the index ready."""
+        with conn.cursor() as cursor:
+            # The load's own snapshot time, where the first catch_up() starts from
+            cursor.execute("SELECT NOW()")
+            synced_at = cursor.fetchone()[0]
+            cursor.execute("SELECT DISTINCT skill FROM users, unnest(skills) AS skill")
+            with self._lock:
+                new = self._extend(row[0] for row in cursor.fetchall())
+        # In batches, so lookups from request threads aren't held up for the whole load
+        for batch in batched(stream_rows(conn, "SELECT jobid, title, company, description FROM jobs"), batch_size):
+            self.add_jobs(batch)
+        conn.rollback()
+        with self._lock:
+            self._complete |= new
+            self._synced_at = synced_at
+        self.ready = True
+        print(f"✅ Skill index built over {len(self)} jobs and {len(self._postings)} skills", flush=True)
+
+
+# Shared by the web app and the background scraper.
+skill_index = SkillIndex()
@@ -0,0 +1,276 @@
+# skill_matcher.py
+# Multi-pattern skill matching with an Aho-Corasick automaton.
+#
+# Resume parsing used to test `skill in text` once per taxonomy entry, and job
+# scoring once per user skill, each a full scan of the text. A SkillMatcher
+# compiles its patterns once into a trie with failure links and then finds
+# every pattern in a single left-to-right pass. Matches are whole words: a
+# pattern edge that is a word character must not touch another word
+# character, so "go" is not found in "google" nor "java" in "javascript",
+# while "c++" and ".net" still match next to punctuation.
+#
+# The resume taxonomy is compiled once at import (taxonomy_matcher) and used
+# by extract_skills_from_text; matchers for users' skill lists, used by job
+# scoring, are cached by matcher_for(). The automaton runs in C
+# via pyahocorasick when it is installed, otherwise in pure Python.
+
+import re
+from collections import deque
+from functools import lru_cache
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Technical skills recognised in resumes. Lowercase entries are shown title-cased.
+TECHNICAL_SKILLS = (
+    # Programming Languages
+    'python', 'java', 'javascript', 'typescript', 'html', 'css', 'go', 'rust',
+    'c++', 'c#', '.net', 'php', 'ruby', 'swift', 'kotlin', 'dart',
+    # Web Frameworks & Libraries
+    'react', 'angular', 'vue', 'next.js', 'nuxt.js', 'svelte',
+    'node.js', 'express', 'django', 'flask', 'fastapi', 'spring',
+    'laravel', 'symfony', 'rails', 'asp.net', 'ember', 'backbone',
+    # Databases
+    'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'cassandra',
+    'dynamodb', 'elasticsearch', 'neo4j', 'sqlite', 'oracle',
+    # Cloud & DevOps
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform',
+    'jenkins', 'gitlab ci', 'github actions', 'ansible', 'puppet',
+    'chef', 'vagrant', 'consul', 'vault',
+    # Data Science & ML
+    'pandas', 'numpy', 'matplotlib', 'seaborn', 'plotly',
+    'scikit-learn', 'scipy', 'tensorflow', 'pytorch', 'keras',
+    'xgboost', 'lightgbm', 'opencv', 'nltk', 'spaCy',
+    # Machine Learning & AI
+    'machine learning', 'deep learning', 'neural networks',
+    'computer vision', 'nlp', 'natural language processing',
+    # Frontend Tools
+    'sass', 'scss', 'less', 'webpack', 'babel', 'gulp', 'grunt',
+    'tailwind css', 'bootstrap', 'material-ui', 'chakra ui',
+    # Testing
+    'jest', 'mocha', 'jasmine', 'cypress', 'selenium', 'pytest',
+    'unittest', 'junit', 'testng',
+    # Version Control & Tools
+    'git', 'svn', 'mercurial', 'perforce',
+    # Agile & Project Management
+    'agile', 'scrum', 'kanban', 'jira', 'confluence', 'trello',
+    'asana', 'monday.com',
+    # APIs & Protocols
+    'rest', 'graphql', 'soap', 'grpc', 'websocket', 'rest api',
+    # Operating Systems
+    'linux', 'unix', 'bash', 'powershell', 'shell scripting',
+    # Other Tools
+    'postman', 'insomnia', 'swagger', 'docker compose', 'kubectl',
+    'helm', 'vagrantfile',
+)
+
+def _is_word(char):
+    # Same characters as the regex \w (for str patterns) that skill_pattern uses
+    return char.isalnum() or char == '_'
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over a fixed set of (case-insensitive) patterns."""
+
+    def __init__(self, patterns, native=True):
+        self.patterns = list(dict.fromkeys(p.lower() for p in patterns if p))
+        # Per pattern: whether its first / last character needs a word boundary
+        self._edges = [(_is_word(p[0]), _is_word(p[-1])) for p in self.patterns]
+        self._automaton = None
+        if native and ahocorasick is not None and self.patterns:
+            self._automaton = ahocorasick.Automaton()
+            for index, pattern in enumerate(self.patterns):
+                self._automaton.add_word(pattern, index)
+            self._automaton.make_automaton()
+            return
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][char] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = child
+            self._out[node].append(index)
+
+        # Breadth-first, so every failure target is finished before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                state = self._fail[node]
+                while state and char not in self._goto[state]:
+                    state = self._fail[state]
+                self._fail[child] = self._goto[state].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _bounded(self, text, start, end, index):
+        left, right = self._edges[index]
+        if left and start > 0:
+            char = text[start - 1]
+            if char.isalnum() or char == '_':
+                return False
+        if right and end < len(text):
+            char = text[end]
+            if char.isalnum() or char == '_':
+                return False
+        return True
+
+    def find(self, text):
+        """Patterns found in `text` as whole words, in order of first appearance."""
+        text = text.lower()
+        patterns = self.patterns
+        found = {}
+        if self._automaton is not None:
+            for last, index in self._automaton.iter(text):
+                if index not in found and self._bounded(text, last + 1 - len(patterns[index]), last + 1, index):
+                    found[index] = None
+            return [patterns[index] for index in found]
+
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in out[node]:
+                if index not in found:
+                    end = position + 1
+                    if self._bounded(text, end - len(patterns[index]), end, index):
+                        found[index] = None
+        return [patterns[index] for index in found]
+
+    def contains_any(self, text):
+        return bool(self.find(text))
+
+
+@lru_cache(maxsize=4096)
+def skill_pattern(skill):
+    """Compiled regex testing one skill with the same whole-word rule as SkillMatcher."""
+    skill = skill.lower()
+    if not skill:
+        # SkillMatcher ignores empty patterns
+        return re.compile(r'(?!)')
+    left = r'(?<!\w)' if _is_word(skill[0]) else ''
+    right = r'(?!\w)' if _is_word(skill[-1]) else ''
+    return re.compile(left + re.escape(skill) + right)
+
+
+@lru_cache(maxsize=1024)
+def _matcher_for(skills):
+    return SkillMatcher(skills)
+
+
+def matcher_for(skills):
+    """Compiled (and cached) matcher for a user's skill list."""
+    return _matcher_for(tuple(skills))
+
+
+taxonomy_matcher = SkillMatcher(TECHNICAL_SKILLS)
+
+# Original spelling of each taxonomy entry, by lowercase
+SKILL_NAMES = {skill.lower(): skill for skill in TECHNICAL_SKILLS}
+
+# Every substring of every taxonomy entry, so "is this resume fragment part of
+# a known skill" is a set lookup instead of a scan of the taxonomy.
+_TAXONOMY_SUBSTRINGS = frozenset(
+    skill[i:j] for skill in SKILL_NAMES for i in range(len(skill)) for j in range(i + 1, len(skill) + 1)
+)
+
+
+def is_taxonomy_fragment(fragment):
+    """Whether a skills-section fragment contains a taxonomy skill or is part of one."""
+    fragment = fragment.lower()
+    return fragment in _TAXONOMY_SUBSTRINGS or taxonomy_matcher.contains_any(fragment)
+
+
+def extract_skills_from_text(text):
+    """
+    Extract technical skills from resume text, filtering out non-skills like
+    company names, job titles, dates, and descriptive phrases.
+    """
+    if not text:
+        return []
+
+    skills_found = set()
+    text_lower = text.lower()
+
+    # One pass over the resume finds every taxonomy skill it mentions as a word
+    for skill in taxonomy_matcher.find(text_lower):
+        name = SKILL_NAMES[skill]
+        skills_found.add(name.title() if name.islower() else name)
+
+    # Extract skills from "Skills:" sections with better filtering
+    skills_pattern = r'(?:technical\s+)?skills?[:\-]?\s*([^\n]{20,500})'
+    matches = re.findall(skills_pattern, text_lower, re.IGNORECASE)
+
+    for match in matches:
+        # Clean up prefixes and split
+        clean_match = re.sub(r'^(programming|tools?|frameworks?|databases?|libraries?):\s*', '', match, flags=re.IGNORECASE)
+
+        # Split by various delimiters
+        potential_skills = re.split(r'[,;•\n]', clean_match)
+
+        for skill in potential_skills:
+            skill = skill.strip().lower()
+
+            # Filter out non-skills
+            if not skill or len(skill) < 2 or len(skill) > 40:
+                continue
+
+            # Skip if it contains job-related keywords
+            if any(word in skill for word in ['intern', 'junior', 'senior', 'developer',
+                                                'engineer', 'manager', 'analyst', 'qa', 'quality']):
+                continue
+
+            # Skip dates, company names, and long descriptions
+            if re.search(r'\d{4}', skill):  # Contains year
+                continue
+
+            # Skip if it's a library name that we already know about
+            if any(sk in skill for sk in ['library', 'libraries', 'framework', 'tool', 'tools']):
+                continue
+
+            # Only add if it's in our technical skills list or looks like one
+            if is_taxonomy_fragment(skill):
+                skills_found.add(skill.title())
+
+    # Clean up results - remove any remaining non-skills
+    filtered_skills = []
+    for skill in skills_found:
+        skill_lower = skill.lower()
+
+        # Skip library names that look like code
+        if skill_lower.startswith('py') and len(skill) > 8:
+            continue
+
+        # Skip if it looks like a company name (has 'ltd', 'inc', 'corp', etc.)
+        if any(word in skill_lower for word in ['ltd', 'inc', 'corp', 'international', 'global']):
+            continue
+
+        # Skip job titles
+        if any(word in skill_lower for word in ['intern', 'associate', 'specialist', 'officer']):
+            continue
+
+        # Skip dates and time periods
+        if re.search(r'\d{4}|\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+\d{4}\b', skill_lower):
+            continue
+
+        # Skip generic tools that aren't technical skills
+        if skill_lower in ['ms office', 'office', 'windows', 'mac', 'linux operating system']:
+            continue
+
+        filtered_skills.append(skill)
+
+    # Return sorted, unique skills
+    return sorted(list(set(filtered_skills)))
@@ -0,0 +1,131 @@
+# source_registry.py
+# Registry of job sources for the scrapers.
+#
+# Each source registers a request builder, an HTML parser and its blocking
+# scrape function together with its own execution settings (concurrency
+# limit, timeout, weight, enabled flag). The aggregator, the background loop
+# and /test-scrape all dispatch through the registry, so a source can be
+# added, tuned or switched off without touching any of them.
+
+import threading
+import time
+
+from circuit_breaker import breakers
+from config import SCRAPER_CONFIG, SOURCE_SETTINGS
+
+# Cards a source with weight 1.0 contributes per single-page search. Crawls of
+# several pages keep whole pages, so each page's offset follows on from the last.
+BASE_JOBS_PER_SOURCE = 10
+
+
+class ScraperSource:
+    """One job source and its execution settings and timing stats."""
+
+    def __init__(self, name, build_request, parse, scrape, concurrency=2, timeout=None, weight=1.0, enabled=True,
+                 max_pages=None):
+        self.name = name
+        self.build_request = build_request
+        self.parse = parse
+        self.scrape = scrape
+        self.concurrency = concurrency
+        self.timeout = timeout or SCRAPER_CONFIG['SOURCE_TIMEOUT']
+        self.weight = weight
+        self.enabled = enabled
+        self.max_pages = max_pages or SCRAPER_CONFIG['MAX_PAGES']
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self.stats = {
+            'calls': 0,
+            'failures': 0,
+            'jobs': 0,
+            'total_seconds': 0.0,
+            'last_seconds': None,
+            'last_error': None,
+        }
+
+    @property
+    def breaker(self):
+        """This source's circuit breaker (shared with fetch_page via the breaker board)."""
+        return breakers.get(self.name)
+
+    @property
+    def max_jobs(self):
+        """How many cards this source contributes per search (scaled by weight)."""
+        return max(1, round(BASE_JOBS_PER_SOURCE * self.weight))
+
+    def run(self, query, location, page=0, whole_page=False):
+        """
+        Runs the blocking scraper for one result page under this source's
+        concurrency limit, recording its timing. `whole_page` keeps every card
+        on the page rather than max_jobs.
+        """
+        with self._slots:
+            start = time.monotonic()
+            try:
+                jobs = self.scrape(query, location, max_jobs=None if whole_page else self.max_jobs, page=page)
+            except Exception as e:
+                self.record(time.monotonic() - start, 0, error=e)
+                raise
+        self.record(time.monotonic() - start, len(jobs or []))
+        return jobs
+
+    def record(self, seconds, jobs, error=None):
+        with self._lock:
+            self.stats['calls'] += 1
+            self.stats['jobs'] += jobs
+            self.stats['total_seconds'] += seconds
+            self.stats['last_seconds'] = round(seconds, 3)
+            if error is not None:
+                self.stats['failures'] += 1
+                self.stats['last_error'] = str(error)[:200]
+
+    def to_dict(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats['avg_seconds'] = round(stats['total_seconds'] / stats['calls'], 3) if stats['calls'] else None
+        stats['total_seconds'] = round(stats['total_seconds'], 3)
+        return {
+            'name': self.name,
+            'enabled': self.enabled,
+            'concurrency': self.concurrency,
+            'timeout': self.timeout,
+            'weight': self.weight,
+            'max_jobs': self.max_jobs,
+            'max_pages': self.max_pages,
+            'circuit': self.breaker.to_dict(),
+            'stats': stats,
+        }
+
+
+class SourceRegistry:
+    """Ordered collection of ScraperSources; settings from SOURCE_SETTINGS override registration defaults."""
+
+    def __init__(self, settings=None):
+        self.settings = settings if settings is not None else SOURCE_SETTINGS
+        self._sources = {}
+
+    def register(self, name, build_request, parse, scrape, **defaults):
+        options = dict(defaults)
+        options.update(self.settings.get(name, {}))
+        source = ScraperSource(name, build_request, parse, scrape, **options)
+        self._sources[name] = source
+        return source
+
+    def get(self, name):
+        return self._sources.get(name)
+
+    def all(self):
+        return list(self._sources.values())
+
+    def enabled(self):
+        return [source for source in self._sources.values() if source.enabled]
+
+    def set_enabled(self, name, enabled):
+        source = self._sources[name]
+        source.enabled = bool(enabled)
+        print(f"{'✅ Enabled' if source.enabled else '⏸️ Disabled'} scraper source {name}", flush=True)
+        return source
+
+
+# Populated by tasks.py when the scrapers are defined.
+registry = SourceRegistry()
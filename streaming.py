@@ -0,0 +1,46 @@
+# streaming.py
+# Streaming reads of large result sets.
+#
+# A client-side cursor's fetchall() pulls the whole result into libpq and
+# then builds every row as a Python object, so reading the jobs table costs a
+# multiple of its size in memory. stream_rows() uses a named (server-side)
+# cursor instead: Postgres keeps the result and hands it over ITERSIZE rows
+# per round trip, and rows are yielded one by one to generator stages
+# (scoring, filtering, batching, serialization) that never hold more than a
+# batch. Named cursors live inside a transaction, so the connection must not
+# be in autocommit mode.
+
+import itertools
+import json
+import uuid
+
+# Rows fetched per round trip by a server-side cursor.
+ITERSIZE = 2000
+
+
+def stream_rows(conn, sql, params=(), itersize=ITERSIZE, cursor_factory=None):
+    """Yields the rows of `sql` through a server-side cursor; the cursor is closed when the generator is."""
+    cursor = conn.cursor(name=f"stream_{uuid.uuid4().hex[:12]}", cursor_factory=cursor_factory)
+    cursor.itersize = itersize
+    try:
+        cursor.execute(sql, params)
+        for row in cursor:
+            yield row
+    finally:
+        cursor.close()
+
+
+def batched(rows, size):
+    """Groups an iterable into lists of up to `size` items."""
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def ndjson(items):
+    """Serializes dicts one JSON document per line, e.g. for a streamed Flask Response."""
+    for item in items:
+        yield json.dumps(item, default=str, separators=(',', ':')) + '\n'
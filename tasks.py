@@ -1,13 +1,22 @@
 # tasks.py
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve as sv
 import psycopg2
 import psycopg2.extras
-from config import DATABASE_CONFIG
+from config import DATABASE_CONFIG, SCRAPER_CONFIG
 import time
 import random
 from urllib.parse import urlencode, quote_plus
 import re
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from fetch_engine import AsyncFetchEngine
+from politeness import scheduler
+from http_cache import http_cache
+from session_pool import session_pool
+from circuit_breaker import breakers, CircuitOpenError
+from source_registry import registry
 
 # --- Helper Functions ---
 
@@ -26,283 +35,610 @@ def clean_text(text):
         return ""
     return re.sub(r'\s+', ' ', text).strip()
 
-# --- Scrapers ---
+# --- HTML Parsing ---
+# Pages are parsed with lxml when it is installed (SCRAPER_HTML_PARSER overrides),
+# and only the job-card subtrees are built: each source has a SoupStrainer for
+# its cards and precompiled CSS selectors for the fields inside them.
+
+def _default_html_parser():
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+HTML_PARSER = SCRAPER_CONFIG['HTML_PARSER'] or _default_html_parser()
+
+def make_soup(html, parse_only=None):
+    """Builds a BeautifulSoup tree with the configured backend, optionally restricted by a strainer."""
+    return BeautifulSoup(html, HTML_PARSER, parse_only=parse_only)
+
+INDEED_CARDS = SoupStrainer(['div', 'td'], class_=re.compile(r'job_seen_beacon|resultContent'))
+INDEED_SELECTORS = {
+    'card': sv.compile('div[class*="job_seen_beacon"]'),
+    'card_fallback': sv.compile('td.resultContent'),
+    'title': sv.compile('h2.jobTitle'),
+    'title_fallback': sv.compile('a[class*="jobtitle"]'),
+    'company': sv.compile('span.companyName'),
+    'company_fallback': sv.compile('span[data-testid="company-name"]'),
+    'location': sv.compile('div.companyLocation'),
+    'location_fallback': sv.compile('div[data-testid="text-location"]'),
+    'link': sv.compile('a[href]'),
+}
+
+LINKEDIN_CARDS = SoupStrainer('li')
+LINKEDIN_SELECTORS = {
+    'card': sv.compile('li'),
+    'title': sv.compile('h3.base-search-card__title'),
+    'company': sv.compile('h4.base-search-card__subtitle'),
+    'location': sv.compile('span.job-search-card__location'),
+    'link': sv.compile('a.base-card__full-link'),
+}
 
-def scrape_indeed(query, location, max_jobs=10):
+# Strainers see the raw class attribute, so multi-class cards need a regex
+TIMESJOBS_CARDS = SoupStrainer(['li', 'div'], class_=re.compile(r'(^|\s)job-bx(\s|$)'))
+TIMESJOBS_SELECTORS = {
+    'card': sv.compile('li.job-bx'),
+    'card_fallback': sv.compile('div.job-bx'),
+    'heading': sv.compile('h2'),
+    'title': sv.compile('a'),
+    'company': sv.compile('h3.joblist-comp-name'),
+    'details': sv.compile('ul.top-jd-dtl'),
+    'location': sv.compile('span'),
+}
+
+def fetch_page(req):
     """
-    Scrapes real jobs from Indeed.com.
+    GETs a request dict through the HTTP cache and returns a CachedPage.
+    Fresh cache entries skip the network entirely; stale ones are revalidated
+    with a conditional GET.
+
+    Network requests are gated by the source's circuit breaker: while it is
+    open CircuitOpenError is raised, and every response or transport error is
+    reported back to it. Cache hits never touch the breaker.
     """
-    print(f"🔎 Scraping Indeed for '{query}' in '{location}'...")
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Referer': 'https://www.google.com/',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Sec-Fetch-Dest': 'document',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'cross-site',
-        'Cache-Control': 'max-age=0',
-    }
-    
-    params = {
-        'q': query,
-        'l': location,
-        'sort': 'date',
-        'limit': 50,
-        'from': 'searchOnHP',
-        'vjk': ''
+    page, headers = http_cache.prepare(req['url'], req['params'], req['headers'])
+    if page is not None:
+        return page
+
+    breaker = breakers.get(req['source'])
+    if not breaker.allow():
+        raise CircuitOpenError(f"{req['source']} circuit is open")
+    try:
+        response = _get_with_session(req, headers)
+    except Exception as e:
+        breaker.record(error=e)
+        raise
+    breaker.record(status=response.status_code)
+    return http_cache.resolve(req['url'], req['params'], response.status_code, response.headers, response.text)
+
+def _get_with_session(req, headers):
+    """
+    Sends the request on a pooled session for its source and domain, warmed
+    with the source's homepage cookies on first use. A 403 on a warmed session
+    usually means its cookies went stale, so that session is dropped and the
+    search is retried once on a freshly warmed one.
+    """
+    attempts = 2 if req.get('warmup_url') else 1
+    for attempt in range(attempts):
+        with session_pool.checkout(req['source'], req['domain'], headers=req['headers'],
+                                   warmup_url=req.get('warmup_url')) as session:
+            scheduler.acquire(req['domain'])
+            response = session.get(req['url'], params=req['params'], headers=headers,
+                                   timeout=req['timeout'], verify=req['verify'])
+            if response.status_code == 403:
+                session.invalidate()
+                if attempt + 1 < attempts:
+                    print(f"   Session for {req['domain']} was refused, refreshing cookies...")
+                    continue
+            break
+    return response
+
+def parse_page(page, req, parse, max_jobs=10):
+    """
+    Parses a page with `parse`, reusing the cached result when its content is
+    unchanged. `max_jobs=None` keeps every card on the page.
+    """
+    jobs = http_cache.load_parsed(page, max_jobs)
+    if jobs is not None:
+        print(f"♻️ {req['source']} page unchanged, reusing {len(jobs)} parsed jobs")
+        return jobs
+    jobs = parse(page.text, req, max_jobs=max_jobs)
+    http_cache.store_parsed(page, max_jobs, jobs)
+    return jobs
+
+# --- Scrapers ---
+# Each source is split into a request builder and an HTML parser so the same
+# logic can run on the blocking `requests` path or the asyncio fetch engine.
+
+INDEED_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Referer': 'https://www.google.com/',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'cross-site',
+    'Cache-Control': 'max-age=0',
+}
+
+def build_indeed_request(query, location, page=0):
+    """Builds the Indeed search request for a (query, location) pair and result page."""
+    # Try Indian domain first for better results in India
+    domain = "in.indeed.com" if "india" in location.lower() or "bangalore" in location.lower() or "delhi" in location.lower() or "mumbai" in location.lower() else "www.indeed.com"
+    req = {
+        'source': 'Indeed',
+        'query': query,
+        'location': location,
+        'domain': domain,
+        'warmup_url': f"https://{domain}/",
+        'url': f"https://{domain}/jobs",
+        'params': {
+            'q': query,
+            'l': location,
+            'sort': 'date',
+            'limit': 50,
+            'from': 'searchOnHP',
+            'vjk': ''
+        },
+        'headers': dict(INDEED_HEADERS),
+        'timeout': 20,
+        'verify': True,
     }
-    
+    if page:
+        req['params']['start'] = page * 10
+    return req
+
+def parse_indeed_jobs(html, request, max_jobs=10):
+    """Parses Indeed job cards out of a search results page."""
+    domain = request['domain']
+    location = request['location']
     jobs = []
-    try:
-        # Try Indian domain first for better results in India
-        domain = "in.indeed.com" if "india" in location.lower() or "bangalore" in location.lower() or "delhi" in location.lower() or "mumbai" in location.lower() else "www.indeed.com"
-        base_url = f"https://{domain}/"
-        search_url = f"https://{domain}/jobs"
-        
-        # Use a session to persist cookies
-        session = requests.Session()
-        session.headers.update(headers)
+    soup = make_soup(html, INDEED_CARDS)
+    
+    # Indeed changes classes often, try multiple selectors
+    job_cards = INDEED_SELECTORS['card'].select(soup)
+    if not job_cards:
+        job_cards = INDEED_SELECTORS['card_fallback'].select(soup)
         
-        # 1. Visit Homepage first to get cookies
-        print(f"   Visiting {base_url} to establish session...")
+    print(f"ℹ️ Found {len(job_cards)} job cards on Indeed")
+    
+    for card in job_cards:
         try:
-            session.get(base_url, timeout=10)
-            time.sleep(random.uniform(2, 4)) # Increased delay
+            # Title
+            title_elem = INDEED_SELECTORS['title'].select_one(card) or INDEED_SELECTORS['title_fallback'].select_one(card)
+            title = title_elem.text.strip() if title_elem else "Unknown Title"
+            
+            # Company
+            company_elem = INDEED_SELECTORS['company'].select_one(card) or INDEED_SELECTORS['company_fallback'].select_one(card)
+            company = company_elem.text.strip() if company_elem else "Unknown Company"
+            
+            # Location
+            loc_elem = INDEED_SELECTORS['location'].select_one(card) or INDEED_SELECTORS['location_fallback'].select_one(card)
+            loc = loc_elem.text.strip() if loc_elem else location
+            
+            # Link
+            link_elem = INDEED_SELECTORS['link'].select_one(card)
+            if link_elem and link_elem['href'].startswith('/'):
+                link = f"https://{domain}" + link_elem['href']
+            elif link_elem:
+                link = link_elem['href']
+            else:
+                link = "#"
+            
+            jobs.append({
+                'title': title,
+                'company': company,
+                'location': loc,
+                'apply_link': link,
+                'source': 'Indeed'
+            })
+            
+            if max_jobs and len(jobs) >= max_jobs:
+                break
         except Exception as e:
-            print(f"   ⚠️ Could not visit homepage: {e}")
+            continue
+    
+    return jobs
+
+def scrape_indeed(query, location, max_jobs=10, page=0):
+    """
+    Scrapes real jobs from Indeed.com.
+    """
+    print(f"🔎 Scraping Indeed for '{query}' in '{location}'{f' (page {page + 1})' if page else ''}...")
+    
+    jobs = []
+    try:
+        req = build_indeed_request(query, location, page=page)
         
-        # 2. Perform Search
-        response = session.get(search_url, params=params, timeout=20)
+        # Pooled session keeps the homepage cookies between searches
+        response = fetch_page(req)
         
-        if response.status_code == 403:
+        if response.status == 403:
              print(f"⚠️ Indeed blocked the request (403). Skipping Indeed for now.")
              return []
-        if response.status_code != 200:
-            print(f"⚠️ Indeed returned status {response.status_code}")
+        if response.status != 200:
+            print(f"⚠️ Indeed returned status {response.status}")
             return []
             
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Indeed changes classes often, try multiple selectors
-        job_cards = soup.find_all('div', class_=lambda x: x and 'job_seen_beacon' in x)
-        if not job_cards:
-            job_cards = soup.find_all('td', class_='resultContent')
-            
-        print(f"ℹ️ Found {len(job_cards)} job cards on Indeed")
-        
-        for card in job_cards:
-            try:
-                # Title
-                title_elem = card.find('h2', class_='jobTitle') or card.find('a', class_=lambda x: x and 'jobtitle' in x)
-                title = title_elem.text.strip() if title_elem else "Unknown Title"
-                
-                # Company
-                company_elem = card.find('span', class_='companyName') or card.find('span', attrs={'data-testid': 'company-name'})
-                company = company_elem.text.strip() if company_elem else "Unknown Company"
-                
-                # Location
-                loc_elem = card.find('div', class_='companyLocation') or card.find('div', attrs={'data-testid': 'text-location'})
-                loc = loc_elem.text.strip() if loc_elem else location
-                
-                # Link
-                link_elem = card.find('a', href=True)
-                if link_elem and link_elem['href'].startswith('/'):
-                    link = f"https://{domain}" + link_elem['href']
-                elif link_elem:
-                    link = link_elem['href']
-                else:
-                    link = "#"
-                
-                jobs.append({
-                    'title': title,
-                    'company': company,
-                    'location': loc,
-                    'apply_link': link,
-                    'source': 'Indeed'
-                })
-                
-                if len(jobs) >= max_jobs:
-                    break
-            except Exception as e:
-                continue
+        jobs = parse_page(response, req, parse_indeed_jobs, max_jobs=max_jobs)
             
     except Exception as e:
         print(f"❌ Error scraping Indeed: {e}")
 
     return jobs
 
-def scrape_linkedin(query, location, max_jobs=10):
+def build_linkedin_request(query, location, page=0):
+    """Builds the LinkedIn guest job search request for a result page (25 cards each)."""
+    return {
+        'source': 'LinkedIn',
+        'query': query,
+        'location': location,
+        'domain': 'www.linkedin.com',
+        'warmup_url': None,
+        # LinkedIn public jobs URL structure
+        'url': "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search",
+        'params': {
+            'keywords': query,
+            'location': location,
+            'start': page * 25
+        },
+        'headers': {
+            'User-Agent': get_random_user_agent(),
+            'Accept-Language': 'en-US,en;q=0.9',
+        },
+        'timeout': 10,
+        'verify': True,
+    }
+
+def parse_linkedin_jobs(html, request, max_jobs=10):
+    """Parses LinkedIn guest API job cards."""
+    location = request['location']
+    jobs = []
+    soup = make_soup(html, LINKEDIN_CARDS)
+    job_cards = LINKEDIN_SELECTORS['card'].select(soup)
+    
+    print(f"ℹ️ Found {len(job_cards)} job cards on LinkedIn")
+    
+    for card in job_cards:
+        try:
+            title_elem = LINKEDIN_SELECTORS['title'].select_one(card)
+            title = clean_text(title_elem.text) if title_elem else "Unknown Title"
+            
+            company_elem = LINKEDIN_SELECTORS['company'].select_one(card)
+            company = clean_text(company_elem.text) if company_elem else "Unknown Company"
+            
+            loc_elem = LINKEDIN_SELECTORS['location'].select_one(card)
+            loc = clean_text(loc_elem.text) if loc_elem else location
+            
+            link_elem = LINKEDIN_SELECTORS['link'].select_one(card)
+            link = link_elem['href'] if link_elem else "#"
+            
+            # Clean up tracking params from link
+            if '?' in link:
+                link = link.split('?')[0]
+            
+            jobs.append({
+                'title': title,
+                'company': company,
+                'location': loc,
+                'apply_link': link,
+                'source': 'LinkedIn'
+            })
+            
+            if max_jobs and len(jobs) >= max_jobs:
+                break
+        except Exception:
+            continue
+    
+    return jobs
+
+def scrape_linkedin(query, location, max_jobs=10, page=0):
     """
     Scrapes public LinkedIn job search page.
     """
-    print(f"🔎 Scraping LinkedIn for '{query}' in '{location}'...")
-    
-    headers = {
-        'User-Agent': get_random_user_agent(),
-        'Accept-Language': 'en-US,en;q=0.9',
-    }
+    print(f"🔎 Scraping LinkedIn for '{query}' in '{location}'{f' (page {page + 1})' if page else ''}...")
     
     jobs = []
     try:
-        # LinkedIn public jobs URL structure
-        base_url = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
-        params = {
-            'keywords': query,
-            'location': location,
-            'start': 0
-        }
-        
-        response = requests.get(base_url, params=params, headers=headers, timeout=10)
+        req = build_linkedin_request(query, location, page=page)
+        response = fetch_page(req)
         
-        if response.status_code != 200:
-            print(f"⚠️ LinkedIn returned status {response.status_code}")
+        if response.status != 200:
+            print(f"⚠️ LinkedIn returned status {response.status}")
             return []
             
-        soup = BeautifulSoup(response.text, 'html.parser')
-        job_cards = soup.find_all('li')
-        
-        print(f"ℹ️ Found {len(job_cards)} job cards on LinkedIn")
-        
-        for card in job_cards:
-            try:
-                title_elem = card.find('h3', class_='base-search-card__title')
-                title = clean_text(title_elem.text) if title_elem else "Unknown Title"
-                
-                company_elem = card.find('h4', class_='base-search-card__subtitle')
-                company = clean_text(company_elem.text) if company_elem else "Unknown Company"
-                
-                loc_elem = card.find('span', class_='job-search-card__location')
-                loc = clean_text(loc_elem.text) if loc_elem else location
-                
-                link_elem = card.find('a', class_='base-card__full-link')
-                link = link_elem['href'] if link_elem else "#"
-                
-                # Clean up tracking params from link
-                if '?' in link:
-                    link = link.split('?')[0]
-                
-                jobs.append({
-                    'title': title,
-                    'company': company,
-                    'location': loc,
-                    'apply_link': link,
-                    'source': 'LinkedIn'
-                })
-                
-                if len(jobs) >= max_jobs:
-                    break
-            except Exception:
-                continue
+        jobs = parse_page(response, req, parse_linkedin_jobs, max_jobs=max_jobs)
                 
     except Exception as e:
         print(f"❌ Error scraping LinkedIn: {e}")
         
     return jobs
 
-def scrape_timesjobs(query, location, max_jobs=10):
-    """
-    Scrapes TimesJobs (good for India).
-    """
-    print(f"🔎 Scraping TimesJobs for '{query}' in '{location}'...")
-    
-    headers = {
-        'User-Agent': get_random_user_agent()
-    }
-    
-    jobs = []
-    try:
+def build_timesjobs_request(query, location, page=0):
+    """Builds the TimesJobs search request for a result page."""
+    req = {
+        'source': 'TimesJobs',
+        'query': query,
+        'location': location,
+        'domain': 'www.timesjobs.com',
+        'warmup_url': None,
         # TimesJobs search URL
-        base_url = "https://www.timesjobs.com/candidate/job-search.html"
-        params = {
+        'url': "https://www.timesjobs.com/candidate/job-search.html",
+        'params': {
             'searchType': 'personalizedSearch',
             'from': 'submit',
             'txtKeywords': query,
             'txtLocation': location
-        }
-        
+        },
+        'headers': {
+            'User-Agent': get_random_user_agent()
+        },
+        'timeout': 15,
         # Disable SSL verification for TimesJobs as a workaround for certificate issues
-        response = requests.get(base_url, params=params, headers=headers, timeout=15, verify=False)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Try multiple selectors for robustness
-        job_cards = soup.find_all('li', class_='job-bx')
-        if not job_cards:
-            job_cards = soup.find_all('div', class_='job-bx')
-        
-        print(f"ℹ️ Found {len(job_cards)} job cards on TimesJobs")
-        
-        for card in job_cards:
-            try:
-                title_elem = card.find('h2').find('a')
-                title = clean_text(title_elem.text) if title_elem else "Unknown Title"
-                
-                company_elem = card.find('h3', class_='joblist-comp-name')
-                company = clean_text(company_elem.text) if company_elem else "Unknown Company"
-                # Remove "(More Jobs)" text if present
-                company = company.replace('(More Jobs)', '').strip()
-                
-                loc_elem = card.find('ul', class_='top-jd-dtl').find('span')
-                loc = clean_text(loc_elem.text) if loc_elem else location
-                
-                link = title_elem['href'] if title_elem else "#"
-                
-                jobs.append({
-                    'title': title,
-                    'company': company,
-                    'location': loc,
-                    'apply_link': link,
-                    'source': 'TimesJobs'
-                })
-                
-                if len(jobs) >= max_jobs:
-                    break
-            except Exception:
-                continue
-                
-    except Exception as e:
-        print(f"❌ Error scraping TimesJobs: {e}")
-        
+        'verify': False,
+    }
+    if page:
+        req['params']['sequence'] = page + 1
+        req['params']['startPage'] = 1
+    return req
+
+def parse_timesjobs_jobs(html, request, max_jobs=10):
+    """Parses TimesJobs result cards."""
+    location = request['location']
+    jobs = []
+    soup = make_soup(html, TIMESJOBS_CARDS)
+    
+    # Try multiple selectors for robustness
+    job_cards = TIMESJOBS_SELECTORS['card'].select(soup)
+    if not job_cards:
+        job_cards = TIMESJOBS_SELECTORS['card_fallback'].select(soup)
+    
+    print(f"ℹ️ Found {len(job_cards)} job cards on TimesJobs")
+    
+    for card in job_cards:
+        try:
+            title_elem = TIMESJOBS_SELECTORS['title'].select_one(TIMESJOBS_SELECTORS['heading'].select_one(card))
+            title = clean_text(title_elem.text) if title_elem else "Unknown Title"
+            
+            company_elem = TIMESJOBS_SELECTORS['company'].select_one(card)
+            company = clean_text(company_elem.text) if company_elem else "Unknown Company"
+            # Remove "(More Jobs)" text if present
+            company = company.replace('(More Jobs)', '').strip()
+            
+            loc_elem = TIMESJOBS_SELECTORS['location'].select_one(TIMESJOBS_SELECTORS['details'].select_one(card))
+            loc = clean_text(loc_elem.text) if loc_elem else location
+            
+            link = title_elem['href'] if title_elem else "#"
+            
+            jobs.append({
+                'title': title,
+                'company': company,
+                'location': loc,
+                'apply_link': link,
+                'source': 'TimesJobs'
+            })
+            
+            if max_jobs and len(jobs) >= max_jobs:
+                break
+        except Exception:
+            continue
+    
     return jobs
 
-def scrape_jobs(query, location, max_jobs=20):
+def scrape_timesjobs(query, location, max_jobs=10, page=0):
     """
-    Aggregator function that scrapes jobs from multiple platforms.
+    Scrapes TimesJobs (good for India).
     """
-    all_jobs = []
+    print(f"🔎 Scraping TimesJobs for '{query}' in '{location}'{f' (page {page + 1})' if page else ''}...")
     
-    # 1. Scrape Indeed
+    jobs = []
     try:
-        indeed_jobs = scrape_indeed(query, location, max_jobs=10)
-        if indeed_jobs:
-            all_jobs.extend(indeed_jobs)
+        req = build_timesjobs_request(query, location, page=page)
+        response = fetch_page(req)
+        jobs = parse_page(response, req, parse_timesjobs_jobs, max_jobs=max_jobs)
+                
     except Exception as e:
-        print(f"Error in Indeed scraper: {e}")
+        print(f"❌ Error scraping TimesJobs: {e}")
         
-    # 2. Scrape LinkedIn
+    return jobs
+
+# --- Source Registry ---
+# Registered in the order the sequential path runs them. Settings such as
+# concurrency, timeout, weight and enabled come from SOURCE_SETTINGS.
+
+registry.register('Indeed', build_indeed_request, parse_indeed_jobs, scrape_indeed)
+registry.register('LinkedIn', build_linkedin_request, parse_linkedin_jobs, scrape_linkedin)
+registry.register('TimesJobs', build_timesjobs_request, parse_timesjobs_jobs, scrape_timesjobs)
+
+def resolve_sources(sources=None):
+    """Maps a list of source names (or ScraperSources) to registered sources; None means all enabled."""
+    if sources is None:
+        return registry.enabled()
+    resolved = []
+    for source in sources:
+        if isinstance(source, str):
+            source = registry.get(source)
+        if source is not None:
+            resolved.append(source)
+    return resolved
+
+def find_known_links(conn, links):
+    """Returns which of `links` already exist in the jobs table, in one query."""
+    if not links:
+        return set()
+    cursor = conn.cursor()
     try:
-        # Add small delay
-        time.sleep(random.uniform(1, 3))
-        linkedin_jobs = scrape_linkedin(query, location, max_jobs=10)
-        if linkedin_jobs:
-            all_jobs.extend(linkedin_jobs)
-    except Exception as e:
-        print(f"Error in LinkedIn scraper: {e}")
-        
-    # 3. Scrape TimesJobs
+        cursor.execute("SELECT apply_link FROM jobs WHERE apply_link = ANY(%s)", (list(links),))
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+class KnownLinks:
+    """
+    Tracks which apply_links a crawl has already seen, so paging can stop once
+    a source is only returning jobs we have.
+
+    `lookup` is called with a batch of links and returns the subset that is
+    already stored (e.g. find_known_links against the jobs table); each link is
+    looked up at most once. Links seen earlier in the same crawl count as known
+    for the stop rule but not for is_new().
+    """
+
+    def __init__(self, lookup=None, stop_ratio=None, links=()):
+        self.lookup = lookup
+        self.stop_ratio = stop_ratio if stop_ratio is not None else SCRAPER_CONFIG['KNOWN_STOP_RATIO']
+        self._stored = set(links)
+        self._checked = set(links)
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def _check(self, links):
+        with self._lock:
+            unchecked = [link for link in dict.fromkeys(links) if link not in self._checked]
+        stored = set()
+        if self.lookup and unchecked:
+            try:
+                stored = set(self.lookup(unchecked))
+            except Exception as e:
+                # Without the lookup we can still page; we just stop less precisely
+                print(f"⚠️ Known-link lookup failed: {str(e)[:100]}", flush=True)
+                return
+        with self._lock:
+            self._checked.update(unchecked)
+            self._stored.update(stored)
+
+    def is_new(self, link):
+        with self._lock:
+            return link not in self._stored
+
+    def page_is_stale(self, jobs):
+        """Records a page of jobs and returns True when enough of them were already known to stop paging."""
+        links = [job['apply_link'] for job in jobs]
+        if not links:
+            return True
+        self._check(links)
+        with self._lock:
+            known = sum(1 for link in links if link in self._stored or link in self._seen)
+            self._seen.update(links)
+        return known >= self.stop_ratio * len(links)
+
+def crawl_source(source, query, location, known_links=None):
+    """
+    Scrapes a source page by page. Without `known_links` only the first page is
+    fetched; with it, paging continues until a page is mostly known jobs, comes
+    back empty, or the source's page budget runs out.
+    """
+    pages = source.max_pages if known_links is not None else 1
+    all_jobs = []
+    for page in range(pages):
+        if source.breaker.is_open():
+            print(f"⏭️ Skipping {source.name}: circuit open ({source.breaker.last_reason})")
+            break
+        # The next page's offset starts after this whole page, so a crawl
+        # keeps every card it fetched rather than the first max_jobs
+        jobs = source.run(query, location, page=page, whole_page=known_links is not None)
+        if not jobs:
+            break
+        all_jobs.extend(jobs)
+        if known_links is None or known_links.page_is_stale(jobs):
+            break
+    return all_jobs
+
+def _scrape_sources_sequentially(sources, query, location, known_links=None):
+    """Runs each source one after another; pacing is left to the politeness scheduler."""
+    all_jobs = []
+    for source in sources:
+        try:
+            jobs = crawl_source(source, query, location, known_links)
+            if jobs:
+                all_jobs.extend(jobs)
+        except Exception as e:
+            print(f"Error in {source.name} scraper: {e}")
+    return all_jobs
+
+def _scrape_sources_concurrently(sources, query, location, max_workers, source_timeout=None, known_links=None):
+    """
+    Runs every source in a thread pool and merges results as they finish.
+    A source still running its timeout (or `source_timeout`, if given) after it
+    started is dropped; its thread is left to finish on its own request timeouts.
+    """
+    all_jobs = []
+    started = {}
+    deadline = {source.name: source_timeout or source.timeout for source in sources}
+
+    def run(source):
+        started[source.name] = time.monotonic()
+        return crawl_source(source, query, location, known_links)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scraper')
+    pending = {executor.submit(run, source): source.name for source in sources}
     try:
-        # Add small delay
-        time.sleep(random.uniform(1, 3))
-        times_jobs = scrape_timesjobs(query, location, max_jobs=10)
-        if times_jobs:
-            all_jobs.extend(times_jobs)
-    except Exception as e:
-        print(f"Error in TimesJobs scraper: {e}")
-        
+        while pending:
+            now = time.monotonic()
+            for future, name in list(pending.items()):
+                if name in started and now - started[name] >= deadline[name]:
+                    print(f"⏱️ {name} scraper missed its {deadline[name]}s deadline, skipping")
+                    del pending[future]
+            if not pending:
+                break
+
+            deadlines = [started[name] + deadline[name] for name in pending.values() if name in started]
+            timeout = max(0, min(deadlines) - now) if deadlines else max(deadline.values())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    jobs = future.result()
+                    if jobs:
+                        all_jobs.extend(jobs)
+                except Exception as e:
+                    print(f"Error in {name} scraper: {e}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return all_jobs
+
+def scrape_jobs(query, location, max_jobs=20, concurrent=None, max_workers=None, source_timeout=None, sources=None,
+                known_links=None):
+    """
+    Aggregator function that scrapes jobs from multiple platforms.
+
+    Dispatches to the enabled sources in the registry (or just `sources`, by
+    name). In concurrent mode (the default, see SCRAPER_CONFIG) they are
+    queried in parallel, each with its own deadline; otherwise one by one.
+    Passing a KnownLinks tracker makes each source page deeper until it runs
+    into jobs that are already known (see crawl_source).
+    """
+    if concurrent is None:
+        concurrent = SCRAPER_CONFIG['CONCURRENT']
+
+    sources = resolve_sources(sources)
+    if not sources:
+        return []
+
+    if concurrent:
+        all_jobs = _scrape_sources_concurrently(
+            sources, query, location,
+            max_workers=max_workers or SCRAPER_CONFIG['MAX_WORKERS'],
+            source_timeout=source_timeout,
+            known_links=known_links,
+        )
+    else:
+        all_jobs = _scrape_sources_sequentially(sources, query, location, known_links)
+
+    return _merge_jobs(all_jobs, max_jobs, known_links)
+
+def _merge_jobs(all_jobs, max_jobs, known_links=None):
+    """
+    Dedupes jobs by apply_link, mixes sources and caps the result. With a
+    KnownLinks tracker, new jobs found by paging are all kept and `max_jobs`
+    only bounds how many already-stored ones are returned alongside them.
+    """
     # Deduplicate based on link
     unique_jobs = []
     seen_links = set()
@@ -314,9 +650,178 @@ def scrape_jobs(query, location, max_jobs=20):
             
     # Shuffle to mix sources
     random.shuffle(unique_jobs)
+
+    if known_links is not None:
+        new_jobs = [job for job in unique_jobs if known_links.is_new(job['apply_link'])]
+        old_jobs = [job for job in unique_jobs if not known_links.is_new(job['apply_link'])]
+        return new_jobs + old_jobs[:max(0, max_jobs - len(new_jobs))]
     
     return unique_jobs[:max_jobs]
 
+async def _fetch_page_async(engine, req):
+    page, headers = http_cache.prepare(req['url'], req.get('params'), req.get('headers'))
+    if page is not None:
+        return page, None
+    breaker = breakers.get(req.get('source'))
+    if not breaker.allow():
+        return None, CircuitOpenError(f"{req.get('source')} circuit is open")
+    try:
+        result = await engine.fetch_request(req, headers=headers)
+    except Exception as e:
+        # Whatever goes wrong, the breaker hears back; otherwise a half-open
+        # trial stays in flight and the source is refused for good
+        breaker.record(error=e)
+        return None, e
+    breaker.record(status=result.status, error=result.error)
+    if result.error is not None:
+        return None, result.error
+    return http_cache.resolve(req['url'], req.get('params'), result.status, result.headers, result.text), None
+
+async def _scrape_source_async(engine, source, slots, query, location, page=0, whole_page=False):
+    """
+    Fetches and parses one result page of a (query, location) search, recording
+    its timing. `whole_page` keeps every card rather than the source's max_jobs.
+    """
+    req = source.build_request(query, location, page=page)
+    # The deadline applies to the request itself, not to time spent queued
+    # behind the politeness scheduler
+    req['timeout'] = min(req.get('timeout') or source.timeout, source.timeout)
+    loop = asyncio.get_running_loop()
+    async with slots:
+        start = loop.time()
+        response, error = await _fetch_page_async(engine, req)
+
+        if isinstance(error, CircuitOpenError):
+            # Another search got the half-open trial; not a failure of this one
+            return []
+        if error is not None:
+            print(f"❌ Error scraping {source.name}: {error}")
+            source.record(loop.time() - start, 0, error=error)
+            return []
+        if response.status != 200:
+            print(f"⚠️ {source.name} returned status {response.status}")
+            source.record(loop.time() - start, 0, error=f"HTTP {response.status}")
+            return []
+        try:
+            # Parsing is CPU-bound; keep it off the event loop so other fetches keep flowing
+            jobs = await loop.run_in_executor(None, parse_page, response, req, source.parse,
+                                              None if whole_page else source.max_jobs)
+        except Exception as e:
+            print(f"Error in {source.name} scraper: {e}")
+            source.record(loop.time() - start, 0, error=e)
+            return []
+        source.record(loop.time() - start, len(jobs))
+        return jobs
+
+async def _crawl_source_async(engine, source, slots, query, location, known_links=None):
+    """Async counterpart of crawl_source(): pages are fetched in order, each under the source's slots."""
+    pages = source.max_pages if known_links is not None else 1
+    all_jobs = []
+    for page in range(pages):
+        if source.breaker.is_open():
+            print(f"⏭️ Skipping {source.name}: circuit open ({source.breaker.last_reason})")
+            break
+        jobs = await _scrape_source_async(engine, source, slots, query, location, page=page,
+                                          whole_page=known_links is not None)
+        if not jobs:
+            break
+        all_jobs.extend(jobs)
+        # The known-link lookup may hit the database, so keep it off the loop
+        if known_links is None or await asyncio.to_thread(known_links.page_is_stale, jobs):
+            break
+    return all_jobs
+
+async def _scrape_many_async(pairs, max_jobs, sources, known_links=None):
+    # Per-source concurrency limits, bound to this run's event loop
+    slots = {source.name: asyncio.Semaphore(source.concurrency) for source in sources}
+    searches = [(pair, source) for pair in pairs for source in sources]
+
+    async with AsyncFetchEngine() as engine:
+        results = await asyncio.gather(*(
+            _crawl_source_async(engine, source, slots[source.name], query, location, known_links)
+            for (query, location), source in searches
+        ))
+
+    grouped = {pair: [] for pair in pairs}
+    for (pair, _), jobs in zip(searches, results):
+        grouped[pair].extend(jobs)
+
+    return {pair: _merge_jobs(jobs, max_jobs, known_links) for pair, jobs in grouped.items()}
+
+def scrape_many(pairs, max_jobs=20, engine=None, sources=None, known_links=None):
+    """
+    Scrapes a batch of (query, location) pairs and returns {pair: jobs}.
+
+    With the async engine (the default, see SCRAPER_CONFIG) every
+    (query, location, source) fetch is issued from this one thread over pooled
+    keep-alive connections; with 'threads' each pair goes through scrape_jobs.
+    A KnownLinks tracker shared across the batch enables incremental paging.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    if (engine or SCRAPER_CONFIG['ENGINE']) == 'async':
+        return asyncio.run(_scrape_many_async(pairs, max_jobs, resolve_sources(sources), known_links))
+
+    results = {}
+    for query, location in pairs:
+        results[(query, location)] = scrape_jobs(query=query, location=location, max_jobs=max_jobs, sources=sources,
+                                                 known_links=known_links)
+    return results
+
+
+def locations_for_user(preferred_location, default_locations):
+    """Picks the locations to scrape for a user's preferred location."""
+    if preferred_location:
+        if preferred_location.lower() == "india":
+            return default_locations
+        elif preferred_location.lower() == "remote":
+            return ["Remote"]
+        else:
+            return [preferred_location] + default_locations[:2]
+    return default_locations[:5]
+
+def _pair_key(query, location):
+    return (' '.join(query.lower().split()), ' '.join(location.lower().split()))
+
+def plan_scrape_cycle(users, default_locations, max_locations=3, max_queries=3):
+    """
+    Planning stage of a background cycle: collects every user's
+    (query, location) pairs and collapses duplicates across users, ignoring
+    case and extra whitespace.
+
+    Returns {(query, location): [user_id, ...]} in first-seen order, so each
+    unique search is scraped once and its results can be fanned back out.
+    """
+    plan = {}
+    canonical = {}
+
+    for user in users:
+        user_skills = user['skills']
+        if not user_skills:
+            continue
+
+        # Build search queries from user skills
+        queries = build_search_queries_from_skills(user_skills)
+        if not queries:
+            continue
+
+        locations = locations_for_user(user.get('preferred_location'), default_locations)
+        for location in locations[:max_locations]:
+            for query in queries[:max_queries]:
+                pair = canonical.setdefault(_pair_key(query, location), (query, location))
+                user_ids = plan.setdefault(pair, [])
+                if user['id'] not in user_ids:
+                    user_ids.append(user['id'])
+
+    return plan
+
+def fan_out_results(plan, results):
+    """Maps each user to the deduped jobs of every planned search they needed."""
+    user_jobs = {}
+    for pair, user_ids in plan.items():
+        for user_id in user_ids:
+            user_jobs.setdefault(user_id, []).extend(results.get(pair, []))
+    return {user_id: _merge_jobs(jobs, len(jobs)) for user_id, jobs in user_jobs.items()}
+
 
 def build_search_queries_from_skills(skills):
     """
@@ -18,6 +18,7 @@ os.environ['SECRET_KEY'] = 'test-secret-key-for-testing-only'
 os.environ['FLASK_ENV'] = 'testing'
 os.environ['DATABASE_URL'] = 'postgresql://test_user@localhost:5432/test_job_crawler_db'
 os.environ['REDIS_URL'] = 'redis://localhost:6379/1'
+os.environ['HTTP_CACHE_ENABLED'] = 'false'
 
 from app import app, get_db_connection, load_user, User
 from flask_login import FlaskLoginClient
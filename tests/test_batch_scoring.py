@@ -0,0 +1,104 @@
+"""
+Tests for sparse-matrix batch scoring of users against jobs.
+"""
+import random
+from unittest.mock import MagicMock
+
+
+class TestScoreMatrix:
+    """Test the users x jobs score matrix."""
+
+    def test_scores_match_calculate_job_match_score(self):
+        """Test that every pair scores exactly what calculate_job_match_score gives."""
+        from batch_scoring import score_matrix
+        from matches import calculate_job_match_score
+        from skill_matcher import TECHNICAL_SKILLS
+
+        rng = random.Random(7)
+        # Includes users with no skills, repeated skills and mixed case
+        users = [(n, [rng.choice(TECHNICAL_SKILLS).upper() if n % 5 == 0 else rng.choice(TECHNICAL_SKILLS)
+                      for _ in range(rng.randrange(0, 14))]) for n in range(60)]
+        jobs = [(n, ' '.join(rng.sample(TECHNICAL_SKILLS, 3)) + ' Developer', rng.choice(['Google', 'Java Labs', None]),
+                 rng.choice([None, 'Experience with ' + ', '.join(rng.sample(TECHNICAL_SKILLS, 2))]))
+                for n in range(80)]
+        scores = score_matrix(users, jobs).toarray()
+
+        for row, (_, skills) in enumerate(users):
+            for column, (_, title, company, description) in enumerate(jobs):
+                job = {'title': title, 'company': company, 'description': description}
+                expected, _ = calculate_job_match_score(job, skills)
+                assert scores[row, column] == expected
+
+    def test_empty_batches(self):
+        """Test that no users, no jobs or no skills give an empty matrix of the right shape."""
+        from batch_scoring import score_matrix
+
+        assert score_matrix([], [(1, 'Python Developer', 'Acme', None)]).shape == (0, 1)
+        assert score_matrix([(1, ['Python'])], []).shape == (1, 0)
+        assert score_matrix([(1, [])], [(1, 'Python Developer', 'Acme', None)]).nnz == 0
+
+
+class TestTopMatches:
+    """Test the thresholded top-K per user."""
+
+    def test_top_k_by_score_then_newest_job(self):
+        """Test that each user keeps their best k jobs above the threshold, ties going to newer jobs."""
+        from batch_scoring import top_matches
+
+        users = [(1, ['Python', 'Django']), (2, ['Java']), (3, ['Rust'])]
+        jobs = [
+            (10, 'Python Developer', 'Acme', None),
+            (11, 'Python Django Engineer', 'Beta', None),
+            (12, 'Django Developer', 'Gamma', None),
+            (13, 'Java Developer', 'Delta', None),
+            (14, 'JavaScript Developer', 'Epsilon', None),
+        ]
+
+        best = top_matches(users, jobs, k=2, min_score=50, chunk_size=2)
+
+        assert best == {1: [(11, 100.0), (12, 50.0)], 2: [(13, 100.0)]}
+
+    def test_min_score_filters_weak_matches(self):
+        """Test that jobs under min_score are dropped and users left without any are omitted."""
+        from batch_scoring import top_matches
+
+        users = [(1, ['Python', 'Django', 'Flask', 'AWS'])]
+        jobs = [(10, 'Python Developer', 'Acme', None)]
+
+        assert top_matches(users, jobs, k=5, min_score=30) == {}
+        assert top_matches(users, jobs, k=5, min_score=25) == {1: [(10, 25.0)]}
+
+
+class TestAlertMatches:
+    """Test collecting alert emails for new jobs."""
+
+    def test_alerts_for_enabled_users_with_matched_skills(self):
+        """Test that alert-enabled users get their best new jobs with scores and matched skills."""
+        from batch_scoring import alert_matches
+
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [(1, 'a@example.com', ['Python', 'Flask']), (2, 'b@example.com', ['Rust'])],
+            [(10, 'Python Flask Developer', 'Acme', 'Remote', 'https://example.com/10', None),
+             (11, 'Python Developer', 'Beta', 'Pune', 'https://example.com/11', None)],
+        ]
+
+        alerts = alert_matches(cursor, ['https://example.com/10', 'https://example.com/11'], k=5, min_score=30)
+
+        assert 'email_alerts_enabled' in cursor.execute.call_args_list[0][0][0]
+        assert len(alerts) == 1
+        email, skills, jobs = alerts[0]
+        assert (email, skills) == ('a@example.com', ['Python', 'Flask'])
+        assert [(job['jobid'], job['match_score'], job['matched_skills']) for job in jobs] == [
+            (10, 100.0, ['Python', 'Flask']),
+            (11, 50.0, ['Python']),
+        ]
+        assert jobs[0]['apply_link'] == 'https://example.com/10'
+
+    def test_no_new_jobs_no_queries(self):
+        """Test that a cycle without new jobs does not query users."""
+        from batch_scoring import alert_matches
+
+        cursor = MagicMock()
+        assert alert_matches(cursor, []) == []
+        cursor.execute.assert_not_called()
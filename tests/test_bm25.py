@@ -0,0 +1,214 @@
+"""
+Tests for BM25 term statistics and ranking.
+"""
+import os
+import threading
+import time
+
+import psycopg2
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+class TestTokenize:
+    """Test splitting job text into terms."""
+
+    def test_keeps_skill_spellings_whole(self):
+        """Test that terms are lowercased and skills like c++ and node.js stay one term."""
+        from bm25 import tokenize
+
+        assert tokenize('Senior C++ / Node.js Developer, (C#)') == ['senior', 'c++', 'node.js', 'developer', 'c#']
+        assert tokenize(None) == []
+
+    def test_job_terms_cover_title_company_and_description(self):
+        """Test that term frequencies add up across the three fields."""
+        from bm25 import job_terms
+
+        terms = job_terms('Python Developer', 'Python Labs', None)
+        assert terms == {'python': 2, 'developer': 1, 'labs': 1}
+
+
+class TestStatistics:
+    """Test keeping the statistics tables current."""
+
+    def test_index_jobs_updates_postings_lengths_and_stats(self):
+        """Test that new jobs add postings, their lengths, doc frequencies and corpus totals."""
+        from bm25 import index_jobs
+
+        cursor = MagicMock()
+        jobs = [(1, 'Python Developer', 'Acme', None), (2, 'Python Python', None, 'Django')]
+        with patch('bm25.execute_values') as mock_values:
+            assert index_jobs(cursor, jobs) == 2
+
+        postings, lengths, doc_freqs = [call[0][2] for call in mock_values.call_args_list]
+        assert sorted(postings) == [('acme', 1, 1), ('developer', 1, 1), ('django', 2, 1),
+                                    ('python', 1, 1), ('python', 2, 2)]
+        assert lengths == [(1, 3), (2, 3)]
+        assert doc_freqs == [('acme', 1), ('developer', 1), ('django', 1), ('python', 2)]
+        assert 'doc_freq = term_stats.doc_freq + EXCLUDED.doc_freq' in mock_values.call_args_list[2][0][1]
+        assert cursor.execute.call_args[0][1] == (2, 6)
+
+    def test_index_new_jobs_skips_indexed_ones(self):
+        """Test that only jobs without a doc_length are read for indexing."""
+        from bm25 import index_new_jobs
+
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+        assert index_new_jobs(cursor, ['https://example.com/1']) == 0
+        sql, params = cursor.execute.call_args[0]
+        assert 'doc_length IS NULL' in sql
+        assert params == (['https://example.com/1'],)
+        assert index_new_jobs(cursor, []) == 0
+        assert cursor.execute.call_count == 1
+
+    def test_forget_jobs_subtracts_their_statistics(self):
+        """Test that expired jobs come out of term_stats and corpus_stats."""
+        from bm25 import forget_jobs
+
+        cursor = MagicMock()
+        forget_jobs(cursor, [3, 4])
+
+        statements = [call[0] for call in cursor.execute.call_args_list]
+        (lock_sql,), (rows_sql, rows_params), (terms_sql, terms_params), (corpus_sql, corpus_params) = statements
+        # corpus_stats first, then the term rows in sorted order, like index_jobs
+        assert lock_sql == 'SELECT 1 FROM corpus_stats FOR UPDATE'
+        assert 'ORDER BY term FOR UPDATE' in rows_sql
+        assert 'doc_freq = term_stats.doc_freq - gone.jobs' in terms_sql
+        assert 'doc_count = doc_count - gone.jobs' in corpus_sql
+        assert rows_params == terms_params == corpus_params == ([3, 4],)
+
+    def test_every_writer_locks_corpus_stats_first(self):
+        """Test that indexing and re-indexing take the corpus_stats row before any term row."""
+        from bm25 import index_jobs, reindex_jobs
+
+        cursor = MagicMock()
+        with patch('bm25.execute_values') as mock_values:
+            mock_values.side_effect = lambda *args, **kwargs: cursor.execute('execute_values')
+            index_jobs(cursor, [(1, 'Python Developer', 'Acme', None)])
+            assert cursor.execute.call_args_list[0][0][0] == 'SELECT 1 FROM corpus_stats FOR UPDATE'
+
+            cursor.reset_mock()
+            cursor.fetchall.return_value = []
+            reindex_jobs(cursor, [1])
+            assert cursor.execute.call_args_list[0][0][0] == 'SELECT 1 FROM corpus_stats FOR UPDATE'
+
+
+@pytest.mark.skipif(not os.environ.get('TEST_DATABASE_URL'), reason='needs TEST_DATABASE_URL (a scratch PostgreSQL)')
+class TestConcurrentWriters:
+    """Test the statistics writers against each other on two real connections."""
+
+    SCHEMA = 'test_bm25_concurrency'
+
+    def _connect(self):
+        conn = psycopg2.connect(os.environ['TEST_DATABASE_URL'])
+        with conn.cursor() as cursor:
+            cursor.execute(f"SET search_path TO {self.SCHEMA}")
+        conn.commit()
+        return conn
+
+    @pytest.fixture
+    def schema(self):
+        import migrations
+
+        conn = psycopg2.connect(os.environ['TEST_DATABASE_URL'])
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {self.SCHEMA} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {self.SCHEMA}")
+            cursor.execute(f"SET search_path TO {self.SCHEMA}")
+            for migration in (migrations.create_jobs_and_users, migrations.add_search_vector,
+                              migrations.add_seen_timestamps, migrations.add_bm25_statistics,
+                              migrations.add_description_enrichment):
+                migration(cursor)
+        conn.commit()
+        yield conn
+        conn.rollback()
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {self.SCHEMA} CASCADE")
+        conn.commit()
+        conn.close()
+
+    def test_reindex_and_ingestion_do_not_deadlock(self, schema):
+        """Test that enrichment's re-index and the scrape cycle's indexing of new jobs both commit."""
+        import bm25
+
+        with schema.cursor() as cursor:
+            cursor.execute("INSERT INTO jobs (title, company, apply_link) VALUES ('Python Developer', 'Acme', 'a') "
+                           "RETURNING jobid")
+            job_id = cursor.fetchone()[0]
+            bm25.index_jobs(cursor, [(job_id, 'Python Developer', 'Acme', None)])
+            cursor.execute("UPDATE jobs SET description = 'Django and Python' WHERE jobid = %s", (job_id,))
+        schema.commit()
+
+        enrichment, ingestion = self._connect(), self._connect()
+        forgotten = threading.Event()
+        errors = []
+        forget_jobs = bm25.forget_jobs
+
+        def slow_forget(cursor, job_ids):
+            # Hold the statistics the re-index has touched while the ingestion starts
+            forget_jobs(cursor, job_ids)
+            forgotten.set()
+            time.sleep(1.5)
+
+        def reindex():
+            try:
+                with patch('bm25.forget_jobs', slow_forget), enrichment.cursor() as cursor:
+                    bm25.reindex_jobs(cursor, [job_id])
+                enrichment.commit()
+            except psycopg2.Error as e:
+                errors.append(e)
+                enrichment.rollback()
+
+        def ingest():
+            forgotten.wait(5)
+            try:
+                with ingestion.cursor() as cursor:
+                    cursor.execute("INSERT INTO jobs (title, company, apply_link) "
+                                   "VALUES ('Django Python Engineer', 'Beta', 'b')")
+                    bm25.index_new_jobs(cursor, ['b'])
+                ingestion.commit()
+            except psycopg2.Error as e:
+                errors.append(e)
+                ingestion.rollback()
+
+        threads = [threading.Thread(target=reindex), threading.Thread(target=ingest)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        enrichment.close()
+        ingestion.close()
+
+        assert errors == []
+        with schema.cursor() as cursor:
+            cursor.execute("SELECT term, doc_freq FROM term_stats WHERE term IN ('django', 'python') ORDER BY term")
+            assert cursor.fetchall() == [('django', 2), ('python', 2)]
+            cursor.execute("SELECT doc_count, total_length FROM corpus_stats")
+            assert cursor.fetchone() == (2, 10)
+
+
+class TestSearch:
+    """Test the BM25 ranking query."""
+
+    def test_ranks_from_statistics_tables(self):
+        """Test that a query reads the statistics tables and pages by (rank, jobid)."""
+        from bm25 import search
+
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [{'jobid': 1, 'rank': 2.0}]
+        rows = search(cursor, ['python', 'flask', 'python'], 'jobid, title', " AND location_id = %s", [5],
+                      after={'rank': 2.5, 'id': 10}, limit=20)
+
+        assert rows == [{'jobid': 1, 'rank': 2.0}]
+        sql, params = cursor.execute.call_args[0]
+        assert 'FROM corpus_stats' in sql and 'JOIN job_terms t ON t.term = query.term' in sql
+        assert 'ORDER BY ranked.rank DESC, jobid DESC' in sql
+        assert params == (['flask', 'python'], 5, 2.5, 10, 21)
+
+    def test_no_terms_no_query(self):
+        """Test that a query without terms returns nothing without touching the database."""
+        from bm25 import search
+
+        cursor = MagicMock()
+        assert search(cursor, [], 'jobid') == []
+        cursor.execute.assert_not_called()
@@ -0,0 +1,138 @@
+"""
+Tests for the per-source circuit breakers.
+"""
+import pytest
+from unittest.mock import Mock, patch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    from circuit_breaker import CircuitBreaker
+    return CircuitBreaker('Indeed', failure_threshold=3, cooldown=60, max_cooldown=200, clock=clock)
+
+
+class TestCircuitBreaker:
+    """Test opening, cooldown backoff and half-open trials."""
+
+    def test_opens_after_repeated_blocking_responses(self, breaker):
+        """Test that 403/429/5xx and timeouts trip the breaker, other statuses do not."""
+        breaker.record(status=404)
+        breaker.record(status=403)
+        breaker.record(status=503)
+        assert breaker.allow()
+
+        breaker.record(error=TimeoutError('read timed out'))
+
+        assert breaker.state == 'open'
+        assert not breaker.allow()
+        assert breaker.is_open()
+
+    def test_success_resets_failure_count(self, breaker):
+        """Test that only consecutive failures count."""
+        breaker.record(status=429)
+        breaker.record(status=429)
+        breaker.record(status=200)
+        breaker.record(status=429)
+
+        assert breaker.state == 'closed'
+
+    def test_single_trial_after_cooldown(self, breaker, clock):
+        """Test that only one request probes a recovering source."""
+        for _ in range(3):
+            breaker.record(status=403)
+        clock.now += 61
+
+        assert not breaker.is_open()
+        assert breaker.allow()
+        assert not breaker.allow()
+        assert breaker.is_open()
+
+        breaker.record(status=200)
+        assert breaker.state == 'closed'
+        assert breaker.allow()
+
+    def test_failed_trial_doubles_cooldown(self, breaker, clock):
+        """Test exponential backoff, capped at max_cooldown."""
+        for _ in range(3):
+            breaker.record(status=403)
+
+        for expected in (120, 200, 200):
+            clock.now += breaker.cooldown + 1
+            assert breaker.allow()
+            breaker.record(status=403)
+            assert breaker.cooldown == expected
+            assert breaker.to_dict()['retry_in'] == expected
+
+        assert breaker.times_opened == 4
+        assert breaker.to_dict()['last_reason'] == 'HTTP 403'
+
+
+class TestBreakerIntegration:
+    """Test that scrapers respect open breakers."""
+
+    def test_open_source_is_skipped(self):
+        """Test that crawl_source does not call a source whose breaker is open."""
+        from source_registry import ScraperSource
+        from tasks import crawl_source
+
+        scrape = Mock(return_value=[])
+        source = ScraperSource('BlockedBoard', build_request=None, parse=None, scrape=scrape)
+        for _ in range(source.breaker.failure_threshold):
+            source.breaker.record(status=403)
+
+        assert crawl_source(source, 'python', 'Remote') == []
+        scrape.assert_not_called()
+        assert source.to_dict()['circuit']['state'] == 'open'
+
+    def test_fetch_page_reports_and_refuses(self):
+        """Test that fetch_page feeds the breaker and stops sending once it opens."""
+        import tasks
+        from circuit_breaker import CircuitOpenError
+
+        req = {'source': 'FlakyBoard', 'domain': 'example.com', 'warmup_url': None,
+               'url': 'https://example.com/jobs', 'params': {}, 'headers': {}, 'timeout': 5, 'verify': True}
+        throttled = Mock(status_code=429, headers={}, text='slow down')
+
+        with patch('tasks.scheduler.acquire'), \
+             patch('requests.Session.get', return_value=throttled) as mock_get:
+            for _ in range(3):
+                assert tasks.fetch_page(req).status == 429
+            with pytest.raises(CircuitOpenError):
+                tasks.fetch_page(req)
+
+        assert mock_get.call_count == 3
+
+    def test_async_trial_that_raises_is_reported(self):
+        """Test that any exception during a half-open trial reopens the breaker instead of wedging it."""
+        import asyncio
+        import tasks
+        from circuit_breaker import breakers
+
+        breaker = breakers.get('WedgedBoard')
+        for _ in range(breaker.failure_threshold):
+            breaker.record(status=503)
+        breaker.opened_until = 0
+        engine = Mock()
+        engine.fetch_request.side_effect = ValueError('bad header value')
+        req = {'source': 'WedgedBoard', 'url': 'https://example.com/wedged', 'params': {}, 'headers': {}}
+
+        page, error = asyncio.run(tasks._fetch_page_async(engine, req))
+
+        assert page is None and isinstance(error, ValueError)
+        assert breaker.state == 'open'
+        # The next cooldown ends in another trial rather than a source refused for good
+        breaker.opened_until = 0
+        assert breaker.allow()
@@ -0,0 +1,156 @@
+"""
+Tests for the PostgreSQL connection pool.
+"""
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+
+import psycopg2.extensions
+
+IDLE = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+INTRANS = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
+
+class FakeConnection:
+    """Stands in for a PooledConnection without a database."""
+
+    _pool = None
+
+    def __init__(self, *args, **kwargs):
+        self.closed = 0
+        self.autocommit = False
+        self.info = MagicMock(transaction_status=IDLE)
+        self.rollbacks = 0
+        self.pings = 0
+
+    def close(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.release(self)
+        else:
+            self.closed = 1
+
+    def discard(self):
+        self._pool = None
+        self.closed = 1
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = IDLE
+
+    def cursor(self):
+        cursor = MagicMock()
+        cursor.__enter__.return_value = cursor
+        cursor.execute.side_effect = lambda sql: setattr(self, 'pings', self.pings + 1)
+        return cursor
+
+
+@pytest.fixture
+def connect():
+    with patch('db_pool.psycopg2.connect', side_effect=FakeConnection) as mock_connect:
+        yield mock_connect
+
+
+def _pool(**options):
+    from db_pool import ConnectionPool
+    settings = {'minconn': 0, 'maxconn': 2, 'timeout': 1, 'ping_after': 60, 'connect_kwargs': {}}
+    settings.update(options)
+    return ConnectionPool(**settings)
+
+
+class TestConnectionPool:
+    """Test reuse, blocking, health checks and leak recovery."""
+
+    def test_close_returns_connection_for_reuse(self, connect):
+        """Test that closing a pooled connection keeps it open for the next checkout."""
+        pool = _pool()
+        first = pool.getconn()
+        first.close()
+        second = pool.getconn()
+
+        assert second is first
+        assert not first.closed
+        assert connect.call_count == 1
+        assert pool.to_dict()['in_use'] == 1
+
+    def test_exhausted_pool_waits_then_times_out(self, connect):
+        """Test that checkouts block for a free connection and record the wait."""
+        from db_pool import PoolTimeout
+
+        pool = _pool(maxconn=1, timeout=0.1)
+        held = pool.getconn()
+        with pytest.raises(PoolTimeout):
+            pool.getconn()
+
+        pool.timeout = 2
+        threading.Timer(0.05, held.close).start()
+        conn = pool.getconn()
+
+        assert conn is held
+        status = pool.to_dict()
+        assert status['stats']['timeouts'] == 1
+        assert status['stats']['waits'] == 1
+        assert status['stats']['wait_seconds_max'] >= 0.05
+        assert status['saturation'] == 1.0
+
+    def test_broken_connection_replaced_on_checkout(self, connect):
+        """Test that a connection closed by the server is discarded, not handed out."""
+        pool = _pool()
+        conn = pool.getconn()
+        conn.close()
+        conn.closed = 2
+
+        fresh = pool.getconn()
+
+        assert fresh is not conn
+        assert pool.stats['discarded'] == 1
+
+    def test_idle_connection_is_pinged(self, connect):
+        """Test that a connection idle past ping_after is checked with a round trip."""
+        pool = _pool(ping_after=0)
+        conn = pool.getconn()
+        conn.close()
+        pool.getconn()
+
+        assert conn.pings == 1
+
+    def test_open_transaction_rolled_back_on_release(self, connect):
+        """Test that uncommitted work never leaks into the next checkout."""
+        pool = _pool()
+        conn = pool.getconn()
+        conn.info.transaction_status = INTRANS
+        conn.autocommit = True
+        conn.close()
+
+        assert conn.rollbacks == 1
+        assert conn.autocommit is False
+
+    def test_release_thread_recovers_forgotten_connections(self, connect):
+        """Test that connections a thread never closed are returned for it."""
+        pool = _pool()
+        pool.getconn()
+        pool.getconn()
+
+        assert pool.release_thread() == 2
+        assert pool.to_dict()['in_use'] == 0
+        assert pool.to_dict()['idle'] == 2
+
+    def test_context_manager_returns_connection(self, connect):
+        """Test that db_connection() gives the connection back on exit."""
+        import db_pool
+
+        pool = _pool()
+        with patch('db_pool.get_pool', return_value=pool):
+            with db_pool.db_connection() as conn:
+                assert pool.to_dict()['in_use'] == 1
+
+        assert pool.to_dict()['in_use'] == 0
+        assert not conn.closed
+
+    def test_app_connections_come_from_pool(self):
+        """Test that get_db_connection checks out of the pool."""
+        import app
+
+        sentinel = object()
+        with patch('db_pool.get_connection', return_value=sentinel):
+            assert app.get_db_connection() is sentinel
@@ -0,0 +1,225 @@
+"""
+Tests for job-description enrichment, run against a local stand-in detail-page server.
+"""
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+PAGES = {
+    '/linkedin': b"""
+        <html><body><nav>Sign in</nav>
+        <div class="show-more-less-html__markup">
+          <p>We need a <strong>Python</strong> developer.</p>
+          <ul><li>Django &amp; Flask</li><li>PostgreSQL</li></ul>
+          <script>track()</script>
+        </div></body></html>
+    """,
+    '/json-ld': b"""
+        <html><head><script type="application/ld+json">
+          {"@context": "https://schema.org", "@type": "JobPosting",
+           "description": "&lt;p&gt;Build Kubernetes tooling in Go.&lt;/p&gt;"}
+        </script></head><body><div>Apply now</div></body></html>
+    """,
+    '/empty': b"<html><body><div>Nothing here</div></body></html>",
+}
+
+
+@pytest.fixture
+def detail_server():
+    """Local detail-page server that records paths and peak concurrency."""
+    state = {'paths': [], 'active': 0, 'peak': 0, 'lock': threading.Lock()}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            with state['lock']:
+                state['paths'].append(self.path)
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.05)
+            with state['lock']:
+                state['active'] -= 1
+            path = self.path.split('?')[0]
+            status = 200 if path in PAGES else 410 if path == '/expired' else 503
+            body = PAGES.get(path, b'')
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 64
+
+    server = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    state['base_url'] = f"http://{host}:{port}"
+    yield state
+    server.shutdown()
+
+
+def _conn(jobs):
+    """Connection whose pending-jobs query returns `jobs`."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = jobs
+    return conn, cursor
+
+
+class TestExtractDescription:
+    """Test pulling description text out of detail pages."""
+
+    def test_source_container_cleaned(self):
+        """Test that the description container's text is kept without tags, scripts or entities."""
+        from enrichment import extract_description
+
+        text = extract_description(PAGES['/linkedin'].decode())
+        assert text == 'We need a Python developer. Django & Flask PostgreSQL'
+
+    def test_json_ld_job_posting(self):
+        """Test that a schema.org JobPosting description is used when no container matches."""
+        from enrichment import extract_description
+
+        assert extract_description(PAGES['/json-ld'].decode()) == 'Build Kubernetes tooling in Go.'
+
+    def test_meta_description_last_resort(self):
+        """Test the meta description fallback, and '' when there is nothing."""
+        from enrichment import extract_description
+
+        page = '<html><head><meta name="description" content="Remote Rust role"></head></html>'
+        assert extract_description(page) == 'Remote Rust role'
+        assert extract_description(PAGES['/empty'].decode()) == ''
+
+
+class TestEnrichDescriptions:
+    """Test an enrichment cycle end to end."""
+
+    def test_cycle_fetches_extracts_and_writes_in_batches(self, detail_server):
+        """Test that pages are fetched concurrently per host and results committed batch by batch."""
+        from enrichment import enrich_descriptions
+
+        base = detail_server['base_url']
+        jobs = [(1, f'{base}/linkedin'), (2, f'{base}/json-ld'), (3, f'{base}/empty'),
+                (4, f'{base}/expired'), (5, f'{base}/down')]
+        jobs += [(10 + n, f'{base}/linkedin?n={n}') for n in range(5)]
+        conn, cursor = _conn(jobs)
+        with patch('enrichment.execute_values') as mock_values, patch('enrichment.bm25') as mock_bm25, \
+             patch('enrichment.matches') as mock_matches:
+            counts = enrich_descriptions(conn, budget=50, batch_size=4,
+                                         engine_kwargs={'per_host_limit': 3, 'scheduler': None})
+
+        assert counts == {'fetched': 10, 'enriched': 7, 'retry': 2}
+        assert 1 < detail_server['peak'] <= 3
+        # The budget caps the pending-jobs query
+        assert cursor.execute.call_args[0][1][-1] == 50
+        # 10 results in batches of 4: three writes, each committed (plus the initial read)
+        assert mock_values.call_count == 3
+        assert conn.commit.call_count == 4
+        written = dict(row for call in mock_values.call_args_list for row in call[0][2])
+        assert written[1] == 'We need a Python developer. Django & Flask PostgreSQL'
+        assert written[2] == 'Build Kubernetes tooling in Go.'
+        # No description found or a server error: retried later; gone: never retried
+        assert written[3] is None and written[5] is None
+        assert written[4] == ''
+        reindexed = [job_id for call in mock_bm25.reindex_jobs.call_args_list for job_id in call[0][1]]
+        assert sorted(reindexed) == [1, 2, 10, 11, 12, 13, 14]
+        rescored = [job_id for call in mock_matches.refresh_for_job_ids.call_args_list for job_id in call[0][1]]
+        assert sorted(rescored) == sorted(reindexed)
+
+    def test_batch_writes_leave_the_event_loop_free(self):
+        """Test that a slow database write doesn't stall the event loop (and the fetches on it)."""
+        import asyncio
+        from types import SimpleNamespace
+        from enrichment import _enrich
+
+        class Engine:
+            async def fetch(self, url, headers=None):
+                await asyncio.sleep(0.01)
+                return SimpleNamespace(ok=False, status=410, text='')
+
+        written = []
+
+        def flush(batch):
+            time.sleep(0.3)
+            written.extend(batch)
+
+        async def run():
+            ticks = [time.perf_counter()]
+
+            async def heartbeat():
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks.append(time.perf_counter())
+
+            beat = asyncio.ensure_future(heartbeat())
+            await _enrich([(n, f'https://example.com/{n}') for n in range(6)], Engine(), flush, 2)
+            beat.cancel()
+            ticks.append(time.perf_counter())
+            # Longest stretch the event loop went without running the heartbeat
+            return max(later - earlier for earlier, later in zip(ticks, ticks[1:]))
+
+        assert asyncio.run(run()) < 0.2
+        assert sorted(written) == [(n, '') for n in range(6)]
+
+    def test_nothing_pending(self):
+        """Test that a cycle with no pending jobs fetches nothing."""
+        from enrichment import enrich_descriptions
+
+        conn, cursor = _conn([])
+        with patch('enrichment.AsyncFetchEngine') as engine:
+            assert enrich_descriptions(conn, budget=10) == {'fetched': 0, 'enriched': 0, 'retry': 0}
+        engine.assert_not_called()
+
+
+class TestPendingJobs:
+    """Test picking up where earlier cycles left off."""
+
+    def test_pending_jobs_skip_exhausted_and_recent_attempts(self):
+        """Test that only jobs still missing a description and due for a retry are picked."""
+        from enrichment import pending_jobs
+
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [(7, 'https://example.com/7')]
+        assert pending_jobs(cursor, 20, max_attempts=3, retry_after_hours=6) == [(7, 'https://example.com/7')]
+        sql, params = cursor.execute.call_args[0]
+        assert 'description IS NULL' in sql
+        assert "description_checked_at < NOW() - %s * INTERVAL '1 hour'" in sql
+        assert params == (3, 6, 20)
+
+
+class TestSaveDescriptions:
+    """Test writing a batch of results back."""
+
+    def test_enriched_job_match_score_changes(self):
+        """Test that a skill only the fetched description mentions raises the job's stored score."""
+        from enrichment import save_descriptions
+        from skill_index import SkillIndex
+
+        skills = ['Python', 'Django']
+        index = SkillIndex()
+        index.add_jobs([(7, 'Backend Developer', 'Acme', None)])
+        assert list(index.match(skills)) == []
+
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [(7, 'Backend Developer', 'Acme', 'Python services on Django.')],
+            [(1, skills)],
+        ]
+        with patch('enrichment.execute_values') as mock_values, patch('enrichment.bm25') as mock_bm25, \
+             patch('matches.skill_index', index), patch('matches.execute_values') as mock_matches:
+            save_descriptions(cursor, [(8, None), (7, 'Python services on Django.')])
+
+        # Written (and so locked) in jobid order
+        assert mock_values.call_args[0][2] == [(7, 'Python services on Django.'), (8, None)]
+        mock_bm25.reindex_jobs.assert_called_once_with(cursor, [7])
+        assert mock_matches.call_args[0][2] == [(1, 7, 100.0, ['Python', 'Django'])]
+        # Later full rescores read the same index
+        assert list(index.match(skills)) == [(7, 100.0, ['Python', 'Django'])]
@@ -0,0 +1,168 @@
+"""
+Tests for the asyncio fetch engine, run against a local stand-in HTTP server.
+"""
+import asyncio
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LINKEDIN_PAGE = b"""
+<ul>
+  <li>
+    <h3 class="base-search-card__title">Python Developer</h3>
+    <h4 class="base-search-card__subtitle">Tech Corp</h4>
+    <span class="job-search-card__location">Remote</span>
+    <a class="base-card__full-link" href="https://www.linkedin.com/jobs/view/1?trk=x">View</a>
+  </li>
+</ul>
+"""
+
+
+@pytest.fixture
+def stand_in_server():
+    """Local HTTP server that records paths and peak concurrency."""
+    state = {'paths': [], 'active': 0, 'peak': 0, 'lock': threading.Lock()}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            with state['lock']:
+                state['paths'].append(self.path)
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.05)
+            with state['lock']:
+                state['active'] -= 1
+            status = 404 if self.path.startswith('/missing') else 200
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(LINKEDIN_PAGE)))
+            self.end_headers()
+            self.wfile.write(LINKEDIN_PAGE)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 64
+
+    server = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    state['base_url'] = f"http://{host}:{port}"
+    yield state
+    server.shutdown()
+
+
+def _fetch_all(requests, **engine_kwargs):
+    from fetch_engine import AsyncFetchEngine
+
+    async def run():
+        async with AsyncFetchEngine(**engine_kwargs) as engine:
+            return await engine.fetch_all(requests)
+
+    return asyncio.run(run())
+
+
+class TestAsyncFetchEngine:
+    """Test the pooled asyncio fetch engine."""
+
+    def test_fetch_all_keeps_order_and_status(self, stand_in_server):
+        """Test that results line up with the requests that produced them."""
+        base = stand_in_server['base_url']
+        results = _fetch_all([{'url': f"{base}/ok"}, {'url': f"{base}/missing"}])
+
+        assert [result.status for result in results] == [200, 404]
+        assert results[0].ok and not results[1].ok
+        assert b'Python Developer' in results[0].text.encode()
+
+    def test_per_host_concurrency_is_bounded(self, stand_in_server):
+        """Test that no more than per_host_limit requests hit one host at once."""
+        base = stand_in_server['base_url']
+        results = _fetch_all([{'url': f"{base}/jobs?i={i}"} for i in range(12)], per_host_limit=3)
+
+        assert all(result.ok for result in results)
+        assert 1 < stand_in_server['peak'] <= 3
+
+    def test_warmup_url_visited_once(self, stand_in_server):
+        """Test that a shared warm-up URL is only fetched once per engine."""
+        base = stand_in_server['base_url']
+        requests = [{'url': f"{base}/jobs?i={i}", 'warmup_url': f"{base}/"} for i in range(4)]
+        _fetch_all(requests)
+
+        assert stand_in_server['paths'].count('/') == 1
+
+    def test_connection_error_is_returned(self):
+        """Test that an unreachable host produces a result with an error."""
+        results = _fetch_all([{'url': 'http://127.0.0.1:9/', 'timeout': 2}])
+
+        assert results[0].status is None
+        assert results[0].error is not None
+
+
+class TestScrapeMany:
+    """Test batch scraping through the async engine."""
+
+    def test_scrape_many_groups_results_by_pair(self, stand_in_server):
+        """Test that each (query, location) pair gets its own parsed jobs."""
+        from tasks import scrape_many, parse_linkedin_jobs
+        from source_registry import ScraperSource
+
+        base = stand_in_server['base_url']
+
+        def build(query, location, page=0):
+            return {'source': 'LinkedIn', 'query': query, 'location': location,
+                    'url': f"{base}/search", 'params': {'q': query, 'l': location}}
+
+        source = ScraperSource('LinkedIn', build, parse_linkedin_jobs, scrape=None)
+        results = scrape_many([('python', 'Remote'), ('flask', 'Delhi'), ('python', 'Remote')],
+                              max_jobs=5, engine='async', sources=[source])
+
+        assert set(results) == {('python', 'Remote'), ('flask', 'Delhi')}
+        job = results[('python', 'Remote')][0]
+        assert job['title'] == 'Python Developer'
+        assert job['apply_link'] == 'https://www.linkedin.com/jobs/view/1'
+        assert len(stand_in_server['paths']) == 2
+        assert source.stats['calls'] == 2
+
+    def test_parsing_leaves_the_event_loop_free(self):
+        """Test that a slow page parse doesn't stall the event loop (and the fetches on it)."""
+        from types import SimpleNamespace
+        from source_registry import ScraperSource
+        from tasks import _scrape_source_async
+
+        class Engine:
+            async def fetch_request(self, req, headers=None):
+                return SimpleNamespace(status=200, headers={}, text='<ul></ul>', error=None)
+
+        def parse(html, request, max_jobs=10):
+            time.sleep(0.3)
+            return [{'title': 'Python Developer', 'apply_link': 'https://example.com/slow-parse'}]
+
+        def build(query, location, page=0):
+            return {'source': 'SlowParseBoard', 'query': query, 'location': location,
+                    'url': 'https://example.com/slow-parse', 'params': {'q': query}}
+
+        source = ScraperSource('SlowParseBoard', build, parse, scrape=None)
+
+        async def run():
+            ticks = [time.perf_counter()]
+
+            async def heartbeat():
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks.append(time.perf_counter())
+
+            beat = asyncio.ensure_future(heartbeat())
+            jobs = await _scrape_source_async(Engine(), source, asyncio.Semaphore(1), 'python', 'Remote')
+            beat.cancel()
+            ticks.append(time.perf_counter())
+            # Longest stretch the event loop went without running the heartbeat
+            return jobs, max(later - earlier for earlier, later in zip(ticks, ticks[1:]))
+
+        jobs, longest_stall = asyncio.run(run())
+        assert len(jobs) == 1
+        assert longest_stall < 0.2
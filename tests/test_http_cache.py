@@ -0,0 +1,114 @@
+"""
+Tests for the on-disk HTTP cache used by the scrapers.
+"""
+import os
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+URL = 'https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search'
+PARAMS = {'keywords': 'python developer', 'location': 'Remote', 'start': 0}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    from http_cache import HTTPCache
+    return HTTPCache(directory=str(tmp_path), ttl=60, max_bytes=10 * 1024 * 1024, enabled=True)
+
+
+class TestCacheKeys:
+    """Test request normalization."""
+
+    def test_param_order_and_host_case_do_not_matter(self):
+        """Test that equivalent requests share a key."""
+        from http_cache import make_key
+
+        assert make_key(URL, {'a': 1, 'b': 2}) == make_key(URL.replace('www.linkedin', 'WWW.LinkedIn'), {'b': 2, 'a': 1})
+        assert make_key(URL + '?a=1', {'b': 2}) == make_key(URL, {'a': 1, 'b': 2})
+        assert make_key(URL, {'a': 1}) != make_key(URL, {'a': 2})
+
+
+class TestHTTPCache:
+    """Test TTL, revalidation, parse reuse and eviction."""
+
+    def test_fresh_entry_served_without_request(self, cache):
+        """Test that a cached 200 inside the TTL needs no request."""
+        cache.resolve(URL, PARAMS, 200, {'ETag': '"v1"'}, '<li>job</li>')
+        page, headers = cache.prepare(URL, PARAMS)
+
+        assert page is not None and page.from_cache
+        assert page.text == '<li>job</li>'
+
+    def test_stale_entry_sends_validators_and_uses_304(self, cache):
+        """Test conditional revalidation of an expired entry."""
+        cache.resolve(URL, PARAMS, 200, {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}, '<li>job</li>')
+        cache.ttl = 0
+        page, headers = cache.prepare(URL, PARAMS, {'User-Agent': 'x'})
+
+        assert page is None
+        assert headers['If-None-Match'] == '"v1"'
+        assert headers['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+        assert headers['User-Agent'] == 'x'
+
+        revalidated = cache.resolve(URL, PARAMS, 304, {}, '')
+        assert revalidated.status == 200
+        assert revalidated.text == '<li>job</li>'
+
+    def test_unchanged_content_reuses_parsed_jobs(self, cache):
+        """Test that identical page content skips parsing, changed content does not."""
+        jobs = [{'title': 'Python Developer', 'apply_link': 'https://example.com/1'}]
+        page = cache.resolve(URL, PARAMS, 200, {}, '<li>job</li>')
+        cache.store_parsed(page, 10, jobs)
+
+        same = cache.resolve(URL, PARAMS, 200, {}, '<li>job</li>')
+        assert cache.load_parsed(same, 10) == jobs
+        assert cache.load_parsed(same, 5) is None
+
+        changed = cache.resolve(URL, PARAMS, 200, {}, '<li>new job</li>')
+        assert cache.load_parsed(changed, 10) is None
+
+    def test_errors_are_not_cached(self, cache):
+        """Test that non-200 responses never become cache entries."""
+        cache.resolve(URL, PARAMS, 429, {}, 'slow down')
+        page, _ = cache.prepare(URL, PARAMS)
+
+        assert page is None
+
+    def test_eviction_keeps_total_size_bounded(self, tmp_path):
+        """Test that least recently used entries are dropped first."""
+        from http_cache import HTTPCache
+
+        cache = HTTPCache(directory=str(tmp_path), ttl=60, max_bytes=6000, enabled=True)
+        for i in range(5):
+            cache.resolve(URL, {'start': i}, 200, {}, 'x' * 2000)
+            time.sleep(0.01)
+        cache.evict()
+
+        total = sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+        assert total <= 6000
+        assert cache.prepare(URL, {'start': 4})[0] is not None
+        assert cache.prepare(URL, {'start': 0})[0] is None
+
+
+class TestScraperCacheIntegration:
+    """Test that the blocking scrapers go through the cache."""
+
+    def test_cached_page_skips_network_and_parsing(self, cache):
+        """Test a second identical LinkedIn search hits neither the network nor the parser."""
+        import tasks
+
+        html = '<ul><li><h3 class="base-search-card__title">Python Developer</h3>' \
+               '<a class="base-card__full-link" href="https://www.linkedin.com/jobs/view/1">x</a></li></ul>'
+        response = Mock(status_code=200, headers={}, text=html)
+
+        with patch('tasks.http_cache', cache), \
+             patch('tasks.scheduler.acquire'), \
+             patch('requests.Session.get', return_value=response) as mock_get:
+            first = tasks.scrape_linkedin('python developer', 'Remote')
+            with patch('tasks.parse_linkedin_jobs') as mock_parse:
+                second = tasks.scrape_linkedin('python developer', 'Remote')
+
+        assert mock_get.call_count == 1
+        mock_parse.assert_not_called()
+        assert first == second
+        assert first[0]['title'] == 'Python Developer'
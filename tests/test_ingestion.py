@@ -0,0 +1,110 @@
+"""
+Tests for bulk job ingestion.
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+def _job(n, **overrides):
+    job = {'title': f'Job {n}', 'company': 'Corp', 'location': 'Remote',
+           'apply_link': f'https://example.com/{n}', 'source': 'Indeed'}
+    job.update(overrides)
+    return job
+
+
+@pytest.fixture(autouse=True)
+def location_ids():
+    with patch('ingestion.load_location_ids', return_value={'Remote': 7}) as mock_ids:
+        yield mock_ids
+
+
+class TestIngestJobs:
+    """Test the execute_values and COPY paths."""
+
+    def test_values_path_returns_only_new_jobs(self):
+        """Test that one statement is sent and RETURNING decides which jobs are new."""
+        from ingestion import ingest_jobs
+
+        cursor = MagicMock()
+        jobs = [_job(2), _job(1), _job(2), _job(3)]
+        returned = [('https://example.com/3', True), ('https://example.com/1', True)]
+        with patch('ingestion.execute_values', return_value=returned) as mock_values:
+            new = ingest_jobs(cursor, jobs)
+
+        assert [job['apply_link'] for job in new] == ['https://example.com/1', 'https://example.com/3']
+        mock_values.assert_called_once()
+        sql, rows = mock_values.call_args[0][1:3]
+        assert 'ON CONFLICT (apply_link) DO UPDATE SET last_seen = NOW()' in sql
+        assert 'RETURNING apply_link, (xmax = 0) AS inserted' in sql
+        # Duplicates in the batch are sent once, in apply_link order (the order rows are locked in)
+        assert [row[3] for row in rows] == ['https://example.com/1', 'https://example.com/2', 'https://example.com/3']
+        assert mock_values.call_args[1]['fetch'] is True
+
+    def test_copy_path_merges_from_staging(self):
+        """Test that large batches are COPYed into a staging table and merged once."""
+        from ingestion import ingest_jobs
+
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [('https://example.com/0', True), ('https://example.com/1', False)]
+        jobs = [_job(n) for n in range(5)]
+        new = ingest_jobs(cursor, jobs, method='copy')
+
+        assert new == [jobs[0]]
+        copy_sql, buffer = cursor.copy_expert.call_args[0]
+        assert copy_sql.startswith('COPY jobs_staging')
+        assert len(buffer.getvalue().splitlines()) == 5
+        statements = [call[0][0] for call in cursor.execute.call_args_list]
+        assert any('FROM jobs_staging ORDER BY apply_link ON CONFLICT (apply_link) DO UPDATE' in sql
+                   for sql in statements)
+
+    def test_seen_again_jobs_are_not_new(self):
+        """Test that rows whose last_seen was bumped by the upsert don't count as new."""
+        from ingestion import ingest_jobs
+
+        returned = [('https://example.com/1', False), ('https://example.com/2', True)]
+        with patch('ingestion.execute_values', return_value=returned) as mock_values:
+            new = ingest_jobs(MagicMock(), [_job(1), _job(2)])
+
+        assert [job['apply_link'] for job in new] == ['https://example.com/2']
+        # Recently touched rows are left alone instead of rewritten again
+        assert "WHERE jobs.last_seen < NOW() - INTERVAL '1 hour'" in mock_values.call_args[0][1]
+
+    def test_large_batches_choose_copy(self):
+        """Test the automatic switch to COPY above the threshold."""
+        import ingestion
+
+        with patch('ingestion.COPY_THRESHOLD', 3), \
+             patch('ingestion.insert_copy', return_value=set()) as mock_copy, \
+             patch('ingestion.insert_values', return_value=set()) as mock_values:
+            ingestion.ingest_jobs(MagicMock(), [_job(1), _job(2)])
+            ingestion.ingest_jobs(MagicMock(), [_job(1), _job(2), _job(3)])
+
+        assert mock_values.call_count == 1
+        assert mock_copy.call_count == 1
+
+    def test_nul_bytes_and_missing_links(self):
+        """Test that NUL bytes are stripped and jobs without a link are skipped."""
+        from ingestion import ingest_jobs
+
+        with patch('ingestion.execute_values', return_value=[]) as mock_values:
+            ingest_jobs(MagicMock(), [_job(1, title='Dev\x00eloper'), _job(2, apply_link='')])
+
+        rows = mock_values.call_args[0][2]
+        assert rows == [('Developer', 'Corp', 'Remote', 'https://example.com/1', 7)]
+
+    def test_locations_normalized_to_canonical_ids(self):
+        """Test that each job gets the id of its canonical location, or None."""
+        from ingestion import ingest_jobs
+
+        with patch('ingestion.execute_values', return_value=[]) as mock_values:
+            ingest_jobs(MagicMock(), [_job(1, location='Work from home'), _job(2, location='Kochi, Kerala')])
+
+        assert [row[-1] for row in mock_values.call_args[0][2]] == [7, None]
+
+    def test_empty_batch_sends_nothing(self):
+        """Test that an empty cycle does not touch the database."""
+        from ingestion import ingest_jobs
+
+        cursor = MagicMock()
+        assert ingest_jobs(cursor, []) == []
+        cursor.execute.assert_not_called()
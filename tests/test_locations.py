@@ -0,0 +1,83 @@
+"""
+Tests for location normalization and location filters.
+"""
+import pytest
+from unittest.mock import MagicMock
+
+
+class TestCanonicalLocation:
+    """Test alias matching of scraped location strings."""
+
+    @pytest.mark.parametrize('text,expected', [
+        ('Bengaluru, Karnataka', 'Bangalore, Karnataka'),
+        ('Bangalore Urban', 'Bangalore, Karnataka'),
+        ('Gurugram, Haryana, India', 'Gurgaon, Haryana'),
+        ('Navi Mumbai, Maharashtra', 'Mumbai, Maharashtra'),
+        ('New Delhi', 'Delhi'),
+        ('Work From Home', 'Remote'),
+        ('Pune, Maharashtra (Remote)', 'Remote'),
+        ('Kochi, Kerala', None),
+        ('', None),
+    ])
+    def test_aliases(self, text, expected):
+        """Test that spelling variants map to one canonical location."""
+        from locations import canonical_location
+
+        assert canonical_location(text) == expected
+
+    def test_known_location_needs_exact_match(self):
+        """Test that only a bare location (not a query mentioning one) is treated as a filter."""
+        from locations import is_known_location
+
+        assert is_known_location('Bengaluru')
+        assert is_known_location(' india ')
+        assert is_known_location('gurgaon, haryana')
+        assert not is_known_location('python developer bangalore')
+
+
+class TestLocationFilter:
+    """Test the SQL used for /search location filters."""
+
+    def test_city_alias_uses_location_id(self):
+        """Test that a canonical city becomes an indexed location_id lookup."""
+        from locations import location_filter
+
+        sql, params = location_filter('Gurugram')
+
+        assert 'location_id = (SELECT id FROM locations WHERE name = %s)' in sql
+        assert 'ILIKE' not in sql
+        assert params == ['Gurgaon, Haryana']
+
+    def test_country_covers_unlisted_cities(self):
+        """Test that India matches canonical Indian locations and strings naming India."""
+        from locations import location_filter
+
+        sql, params = location_filter('India')
+
+        assert 'country = %s' in sql and 'location ILIKE %s' in sql
+        assert params == ['India', '%India%']
+
+    def test_unknown_location_uses_substring(self):
+        """Test the trigram-indexed fallback for free text."""
+        from locations import location_filter
+
+        assert location_filter('Kochi') == (' AND location ILIKE %s', ['%Kochi%'])
+
+
+class TestBackfill:
+    """Test normalizing jobs stored before location_id existed."""
+
+    def test_backfill_groups_updates_by_location(self):
+        """Test that one UPDATE is sent per canonical location and unknown strings are left alone."""
+        from unittest.mock import patch
+        import locations
+
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [('Bengaluru',), ('Bangalore Urban',), ('Kochi',), ('Remote',)]
+        cursor.rowcount = 3
+        with patch('locations.load_location_ids', return_value={'Bangalore, Karnataka': 1, 'Remote': 2}):
+            updated = locations.backfill_location_ids(cursor)
+
+        updates = [call[0][1] for call in cursor.execute.call_args_list if call[0][0].startswith('UPDATE')]
+        assert updates == [(1, ['Bengaluru', 'Bangalore Urban']), (2, ['Remote'])]
+        assert updated == 6
@@ -0,0 +1,165 @@
+"""
+Tests for the precomputed user/job match table.
+"""
+from unittest.mock import MagicMock, patch
+
+
+class TestScoreRows:
+    """Test turning users and jobs into match rows."""
+
+    def test_only_matching_pairs_are_kept(self):
+        """Test that score 0 pairs are not stored."""
+        from matches import score_rows
+
+        users = [(1, ['Python', 'Django']), (2, ['Java'])]
+        jobs = [(10, 'Python Developer', 'Acme', None), (11, 'Django Engineer', None, None),
+                (12, 'Go Developer', 'Beta', None), (13, 'Backend Engineer', 'Gamma', 'Java and Python')]
+        rows = list(score_rows(users, jobs))
+
+        assert rows == [(1, 10, 50.0, ['Python']), (1, 11, 50.0, ['Django']),
+                        (1, 13, 50.0, ['Python']), (2, 13, 100.0, ['Java'])]
+
+
+class TestRefresh:
+    """Test the incremental refresh points."""
+
+    def test_refresh_for_jobs_scores_new_jobs_against_all_users(self):
+        """Test that only the new jobs are read and the matches are upserted."""
+        from matches import refresh_for_jobs
+
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [(10, 'Python Flask Developer', 'Acme', None)],
+            [(1, ['Python']), (2, ['Flask'])],
+        ]
+        with patch('matches.skill_index') as index, patch('matches.execute_values') as mock_values:
+            stored = refresh_for_jobs(cursor, ['https://example.com/10'])
+
+        assert stored == 2
+        assert cursor.execute.call_args_list[0][0][1] == (['https://example.com/10'],)
+        # New jobs go into the skill index as they are ingested
+        index.add_jobs.assert_called_once_with([(10, 'Python Flask Developer', 'Acme', None)])
+        sql, rows = mock_values.call_args[0][1:3]
+        assert 'ON CONFLICT (user_id, job_id) DO UPDATE' in sql
+        assert 'JOIN jobs ON jobs.jobid = v.job_id' in sql
+        assert rows == [(1, 10, 100.0, ['Python']), (2, 10, 100.0, ['Flask'])]
+
+    def test_refresh_for_jobs_without_new_jobs_is_free(self):
+        """Test that an empty batch does not touch the database."""
+        from matches import refresh_for_jobs
+
+        cursor = MagicMock()
+        assert refresh_for_jobs(cursor, []) == 0
+        cursor.execute.assert_not_called()
+
+    def test_refresh_for_job_ids_rescores_changed_jobs(self):
+        """Test that jobs whose text changed lose their old matches and are scored again."""
+        from matches import refresh_for_job_ids
+
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [(10, 'Backend Developer', 'Acme', 'Python services on Django.')],
+            [(1, ['Python', 'Django']), (2, ['Go'])],
+        ]
+        with patch('matches.skill_index') as index, patch('matches.execute_values') as mock_values:
+            assert refresh_for_job_ids(cursor, [10]) == 1
+
+        delete_sql, delete_params = cursor.execute.call_args_list[0][0]
+        assert delete_sql == 'DELETE FROM user_job_matches WHERE job_id = ANY(%s)'
+        assert delete_params == ([10],)
+        index.add_jobs.assert_called_once_with([(10, 'Backend Developer', 'Acme', 'Python services on Django.')])
+        assert mock_values.call_args[0][2] == [(1, 10, 100.0, ['Python', 'Django'])]
+        assert refresh_for_job_ids(MagicMock(), []) == 0
+
+    def test_refresh_for_user_replaces_their_matches(self):
+        """Test that a skills change drops the user's old matches and rescoring covers all jobs."""
+        from matches import refresh_for_user
+
+        cursor = MagicMock()
+        jobs = iter([(10, 'Python Developer', 'Acme', None), (11, 'Java Developer', 'Beta', None)])
+        with patch('matches.stream_rows', return_value=jobs) as mock_stream, \
+             patch('matches.skill_index', ready=False), \
+             patch('matches.execute_values') as mock_values:
+            stored = refresh_for_user(cursor, 5, ['Java'])
+
+        assert stored == 1
+        # Jobs are streamed through a server-side cursor on the same connection
+        assert mock_stream.call_args[0][0] is cursor.connection
+        first_sql, first_params = cursor.execute.call_args_list[0][0]
+        assert first_sql.startswith('DELETE FROM user_job_matches')
+        assert first_params == (5,)
+        assert mock_values.call_args[0][2] == [(5, 11, 100.0, ['Java'])]
+
+    def test_refresh_for_user_without_skills_only_clears(self):
+        """Test that clearing skills leaves no matches behind."""
+        from matches import refresh_for_user
+
+        cursor = MagicMock()
+        with patch('matches.stream_rows') as mock_stream, patch('matches.execute_values') as mock_values:
+            assert refresh_for_user(cursor, 5, []) == 0
+        mock_stream.assert_not_called()
+        assert cursor.execute.call_count == 1
+        mock_values.assert_not_called()
+
+    def test_large_refresh_is_written_in_batches(self):
+        """Test that a long job stream is stored PAGE_SIZE rows per statement."""
+        from matches import refresh_for_user
+
+        jobs = ((n, 'Python Developer', 'Acme', None) for n in range(25))
+        with patch('matches.PAGE_SIZE', 10), \
+             patch('matches.stream_rows', return_value=jobs), \
+             patch('matches.skill_index', ready=False), \
+             patch('matches.execute_values') as mock_values:
+            assert refresh_for_user(MagicMock(), 5, ['Python']) == 25
+        assert [len(call[0][2]) for call in mock_values.call_args_list] == [10, 10, 5]
+
+    def test_refresh_for_user_reads_the_skill_index_when_ready(self):
+        """Test that a built index replaces the scan over the jobs table."""
+        from matches import refresh_for_user
+        from skill_index import SkillIndex
+
+        index = SkillIndex()
+        index.add_jobs([(10, 'Python Developer', 'Acme', None), (11, 'Java Developer', 'Beta', None)])
+        index.ready = True
+        with patch('matches.skill_index', index), \
+             patch('matches.stream_rows') as mock_stream, \
+             patch('matches.execute_values') as mock_values:
+            assert refresh_for_user(MagicMock(), 5, ['Java', 'Go']) == 1
+        mock_stream.assert_not_called()
+        assert mock_values.call_args[0][2] == [(5, 11, 50.0, ['Java'])]
+
+    def test_refresh_for_user_catches_up_with_other_workers_jobs(self):
+        """Test that jobs ingested by another process are scored before the index is used."""
+        from matches import refresh_for_user
+        from skill_index import SkillIndex
+
+        index = SkillIndex()
+        index.add_jobs([(10, 'Java Developer', 'Acme', None)])
+        index.ready = True
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ('2026-01-01T00:00:00+00:00',)
+        cursor.fetchall.return_value = [(12, 'Senior Java Engineer', 'Beta', None)]
+        with patch('matches.skill_index', index), patch('matches.execute_values') as mock_values:
+            assert refresh_for_user(cursor, 5, ['Java']) == 2
+        assert sorted(mock_values.call_args[0][2]) == [(5, 10, 100.0, ['Java']), (5, 12, 100.0, ['Java'])]
+
+    def test_refresh_for_user_with_new_skills_scans_and_learns(self):
+        """Test that skills the index has no lists for are scored from the table scan, which fills them in."""
+        from matches import refresh_for_user
+        from skill_index import SkillIndex
+
+        jobs = [(10, 'ML Engineer', 'Acme', None), (11, 'Java Developer', 'Beta', 'Some ML work')]
+        index = SkillIndex()
+        index.add_jobs(jobs)
+        index.ready = True
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ('2026-01-01T00:00:00+00:00',)
+        cursor.fetchall.return_value = []
+        with patch('matches.skill_index', index), \
+             patch('matches.stream_rows', return_value=iter(jobs)) as mock_stream, \
+             patch('matches.execute_values') as mock_values:
+            assert refresh_for_user(cursor, 5, ['ML', 'Java']) == 2
+        mock_stream.assert_called_once()
+        assert sorted(mock_values.call_args[0][2]) == [(5, 10, 50.0, ['ML']), (5, 11, 100.0, ['ML', 'Java'])]
+        assert index.covers(['ML', 'Java'])
+        assert index.postings('ml') == {10, 11}
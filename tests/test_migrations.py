@@ -0,0 +1,167 @@
+"""
+Tests for the versioned schema migration runner.
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+class FakeSchemaDB:
+    """Records statements and tracks schema_migrations rows without a database."""
+
+    def __init__(self, applied=(), has_table=True):
+        self.applied = set(applied)
+        self.has_table = has_table or bool(applied)
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = 0
+        self.autocommit = True
+        self._result = []
+
+    def cursor(self):
+        cursor = MagicMock()
+        cursor.execute.side_effect = self._execute
+        cursor.fetchone.side_effect = lambda: self._result[0]
+        cursor.fetchall.side_effect = lambda: list(self._result)
+        cursor.__enter__.return_value = cursor
+        return cursor
+
+    def _execute(self, sql, params=None):
+        self.statements.append(sql)
+        if 'to_regclass' in sql:
+            self._result = [(self.has_table,)]
+        elif 'MAX(version)' in sql:
+            self._result = [(max(self.applied, default=0),)]
+        elif sql.startswith('SELECT version FROM schema_migrations'):
+            self._result = [(v,) for v in sorted(self.applied)]
+        elif 'CREATE TABLE IF NOT EXISTS schema_migrations' in sql:
+            self.has_table = True
+        elif sql.startswith('INSERT INTO schema_migrations'):
+            self.applied.add(params[0])
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+def _steps(count):
+    """Replacement MIGRATIONS whose functions record that they ran."""
+    ran = []
+    return [(n, f'step {n}', lambda cursor, n=n: ran.append(n)) for n in range(1, count + 1)], ran
+
+
+class TestMigrate:
+    """Test applying migrations."""
+
+    def test_fresh_database_applies_everything_in_order(self):
+        """Every migration runs once and is recorded."""
+        import migrations
+        steps, ran = _steps(3)
+        db = FakeSchemaDB(has_table=False)
+        with patch.object(migrations, 'MIGRATIONS', steps):
+            assert migrations.migrate(db) == [1, 2, 3]
+        assert ran == [1, 2, 3]
+        assert db.applied == {1, 2, 3}
+
+    def test_only_pending_migrations_run(self):
+        """Versions already in schema_migrations are skipped."""
+        import migrations
+        steps, ran = _steps(3)
+        db = FakeSchemaDB(applied={1, 2})
+        with patch.object(migrations, 'MIGRATIONS', steps):
+            assert migrations.migrate(db) == [3]
+        assert ran == [3]
+
+    def test_runs_under_advisory_lock(self):
+        """The lock is taken before any migration and released afterwards."""
+        import migrations
+        steps, _ = _steps(1)
+        db = FakeSchemaDB(has_table=False)
+        with patch.object(migrations, 'MIGRATIONS', steps):
+            migrations.migrate(db)
+        assert 'pg_advisory_lock' in db.statements[0]
+        assert 'pg_advisory_unlock' in db.statements[-1]
+
+    def test_failure_stops_and_is_not_recorded(self):
+        """A failing migration is rolled back, later ones wait, and the lock is released."""
+        import migrations
+        steps, ran = _steps(3)
+        steps[1] = (2, 'broken', MagicMock(side_effect=RuntimeError('boom')))
+        db = FakeSchemaDB(has_table=False)
+        with patch.object(migrations, 'MIGRATIONS', steps):
+            with pytest.raises(RuntimeError):
+                migrations.migrate(db)
+        assert ran == [1]
+        assert db.applied == {1}
+        assert 'pg_advisory_unlock' in db.statements[-1]
+
+    def test_versions_are_unique_and_increasing(self):
+        """MIGRATIONS is append-only and ordered."""
+        import migrations
+        versions = [version for version, _, _ in migrations.MIGRATIONS]
+        assert versions == sorted(set(versions))
+        assert migrations.LATEST_VERSION == versions[-1]
+
+
+class TestCheckSchema:
+    """Test the startup check."""
+
+    def test_current_schema_only_reads_the_version(self):
+        """An up-to-date database costs the version lookup and no locking."""
+        import migrations
+        db = FakeSchemaDB(applied=range(1, migrations.LATEST_VERSION + 1))
+        assert migrations.check_schema(db) == migrations.LATEST_VERSION
+        assert len(db.statements) == 2
+        assert not any('pg_advisory_lock' in sql for sql in db.statements)
+
+    def test_missing_table_means_version_zero(self):
+        """A never-migrated database reports 0 without querying schema_migrations."""
+        import migrations
+        db = FakeSchemaDB(has_table=False)
+        assert migrations.check_schema(db, auto_migrate=False) == 0
+        assert len(db.statements) == 1
+
+    def test_behind_schema_migrates_when_enabled(self):
+        """Pending migrations are applied at startup with auto-migrate on."""
+        import migrations
+        steps, ran = _steps(2)
+        db = FakeSchemaDB(applied={1})
+        with patch.object(migrations, 'MIGRATIONS', steps), patch.object(migrations, 'LATEST_VERSION', 2):
+            assert migrations.check_schema(db, auto_migrate=True) == 2
+        assert ran == [2]
+
+    def test_behind_schema_only_warns_when_disabled(self, capsys):
+        """With auto-migrate off nothing runs and the CLI is suggested."""
+        import migrations
+        steps, ran = _steps(2)
+        db = FakeSchemaDB(applied={1})
+        with patch.object(migrations, 'MIGRATIONS', steps), patch.object(migrations, 'LATEST_VERSION', 2):
+            assert migrations.check_schema(db, auto_migrate=False) == 1
+        assert ran == []
+        assert 'python migrations.py' in capsys.readouterr().out
+
+
+class TestCli:
+    """Test the command-line entry point."""
+
+    def test_status_lists_pending(self, capsys):
+        """`status` prints the version and pending migrations without applying them."""
+        import migrations
+        steps, ran = _steps(2)
+        db = FakeSchemaDB(applied={1})
+        with patch.object(migrations, 'MIGRATIONS', steps), \
+                patch('migrations.psycopg2.connect', return_value=db):
+            assert migrations.main(['status']) == 0
+        out = capsys.readouterr().out
+        assert 'pending: 2 step 2' in out
+        assert ran == []
+
+    def test_unknown_command(self):
+        """Unknown commands print usage and fail."""
+        import migrations
+        assert migrations.main(['bogus']) == 2
@@ -0,0 +1,88 @@
+"""
+Tests for the per-source HTML parsers over saved search page fixtures.
+"""
+import os
+import pytest
+from unittest.mock import patch
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+BACKENDS = ['html.parser']
+try:
+    import lxml  # noqa: F401
+    BACKENDS.append('lxml')
+except ImportError:
+    pass
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+class TestSourceParsers:
+    """Test card extraction for every source on every available backend."""
+
+    def test_parse_indeed(self, backend):
+        """Test Indeed cards, including relative links made absolute."""
+        from tasks import parse_indeed_jobs
+
+        with patch('tasks.HTML_PARSER', backend):
+            jobs = parse_indeed_jobs(_fixture('indeed_search.html'), {'domain': 'in.indeed.com', 'location': 'India'}, max_jobs=50)
+
+        assert len(jobs) == 15
+        assert jobs[0] == {
+            'title': 'Python Developer',
+            'company': 'Infosys',
+            'location': 'Bengaluru, Karnataka',
+            'apply_link': 'https://in.indeed.com/rc/clk?jk=3e8abc&from=vj',
+            'source': 'Indeed'
+        }
+
+    def test_parse_linkedin(self, backend):
+        """Test LinkedIn cards with tracking params stripped from links."""
+        from tasks import parse_linkedin_jobs
+
+        with patch('tasks.HTML_PARSER', backend):
+            jobs = parse_linkedin_jobs(_fixture('linkedin_search.html'), {'location': 'India'}, max_jobs=50)
+
+        assert len(jobs) == 25
+        assert jobs[0]['company'] == 'Swiggy'
+        assert jobs[0]['location'] == 'Bangalore Urban'
+        assert all('?' not in job['apply_link'] for job in jobs)
+
+    def test_parse_timesjobs(self, backend):
+        """Test TimesJobs multi-class cards and the '(More Jobs)' suffix cleanup."""
+        from tasks import parse_timesjobs_jobs
+
+        with patch('tasks.HTML_PARSER', backend):
+            jobs = parse_timesjobs_jobs(_fixture('timesjobs_search.html'), {'location': 'India'}, max_jobs=50)
+
+        assert len(jobs) == 20
+        assert jobs[0]['title'] == 'DevOps Engineer - AWS'
+        assert jobs[0]['company'] == 'Wipro'
+        assert jobs[0]['location'] == 'Pune, Maharashtra'
+
+    def test_max_jobs_is_respected(self, backend):
+        """Test that parsing stops once max_jobs cards were extracted."""
+        from tasks import parse_linkedin_jobs
+
+        with patch('tasks.HTML_PARSER', backend):
+            jobs = parse_linkedin_jobs(_fixture('linkedin_search.html'), {'location': 'India'}, max_jobs=10)
+
+        assert len(jobs) == 10
+
+
+class TestCardStrainers:
+    """Test that only job-card subtrees are built."""
+
+    def test_noise_outside_cards_is_not_parsed(self):
+        """Test that navigation lists around the cards never reach the tree."""
+        from tasks import make_soup, TIMESJOBS_CARDS
+
+        soup = make_soup(_fixture('timesjobs_search.html'), TIMESJOBS_CARDS)
+
+        assert soup.find('div', class_='nav-item') is None
+        assert len(soup.find_all('li', class_='job-bx')) == 20
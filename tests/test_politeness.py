@@ -0,0 +1,88 @@
+"""
+Tests for the per-domain politeness scheduler.
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+
+
+LIMITS = {
+    'in.indeed.com': {'rate': 10, 'burst': 2},
+    'linkedin.com': {'rate': 10, 'burst': 1},
+}
+
+
+class TestTokenBucket:
+    """Test token bucket accounting."""
+
+    def test_burst_is_free_then_rate_limited(self):
+        """Test that the first `burst` requests go out immediately."""
+        from politeness import TokenBucket
+
+        bucket = TokenBucket(rate=2, burst=2)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.5, abs=0.05)
+        # Later callers queue behind earlier reservations
+        assert bucket.reserve() == pytest.approx(1.0, abs=0.05)
+
+    def test_tokens_refill_over_time(self):
+        """Test that an idle bucket refills up to its burst size."""
+        from politeness import TokenBucket
+
+        bucket = TokenBucket(rate=100, burst=1)
+        bucket.reserve()
+        time.sleep(0.05)
+
+        assert bucket.reserve() == 0
+
+
+class TestPolitenessScheduler:
+    """Test domain matching and per-domain independence."""
+
+    def test_subdomains_share_configured_bucket(self):
+        """Test that www.linkedin.com uses the linkedin.com bucket."""
+        from politeness import PolitenessScheduler
+
+        scheduler = PolitenessScheduler(LIMITS)
+
+        assert scheduler.bucket_for('https://www.linkedin.com/jobs') is scheduler.bucket_for('linkedin.com')
+        assert scheduler.bucket_for('in.indeed.com:443') is not None
+
+    def test_unconfigured_hosts_are_not_throttled(self):
+        """Test that hosts without a limit pass straight through."""
+        from politeness import PolitenessScheduler
+
+        scheduler = PolitenessScheduler(LIMITS)
+
+        assert scheduler.bucket_for('127.0.0.1') is None
+        assert scheduler.acquire('http://127.0.0.1:8000/') == 0
+
+    @patch('politeness.time.sleep')
+    def test_domains_do_not_wait_on_each_other(self, mock_sleep):
+        """Test that exhausting one domain leaves another untouched."""
+        from politeness import PolitenessScheduler
+
+        scheduler = PolitenessScheduler(LIMITS)
+        scheduler.acquire('linkedin.com')
+        waited = scheduler.acquire('linkedin.com')
+
+        assert waited > 0
+        assert scheduler.acquire('in.indeed.com') == 0
+        mock_sleep.assert_called_once()
+
+    def test_acquire_async_waits_for_slot(self):
+        """Test the asyncio variant used by the fetch engine."""
+        from politeness import PolitenessScheduler
+
+        scheduler = PolitenessScheduler(LIMITS)
+
+        async def run():
+            start = time.monotonic()
+            await scheduler.acquire_async('www.linkedin.com')
+            await scheduler.acquire_async('www.linkedin.com')
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) >= 0.08
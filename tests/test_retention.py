@@ -0,0 +1,88 @@
+"""
+Tests for expiring jobs that are no longer seen.
+"""
+from unittest.mock import MagicMock, patch
+
+
+def _conn(*rowcounts):
+    """Connection whose batches pick, then lock, the given numbers of job ids in turn."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    results = []
+    for count in rowcounts:
+        results += [[(n,) for n in range(count)]] * (2 if count else 1)
+    cursor.fetchall.side_effect = results
+    return conn, cursor
+
+
+class TestExpireStaleJobs:
+    """Test the batched retention DELETE."""
+
+    def test_deletes_in_batches_until_short_batch(self):
+        """Test that full batches keep going and each batch is committed."""
+        from retention import expire_stale_jobs
+
+        conn, cursor = _conn(100, 100, 40)
+        with patch('retention.forget_jobs') as forget:
+            assert expire_stale_jobs(conn, days=30, batch_size=100) == 240
+
+        # Picking the batch, locking it and a DELETE per batch
+        assert cursor.execute.call_count == 9
+        assert conn.commit.call_count == 3
+        sql, params = cursor.execute.call_args_list[-3][0]
+        assert "last_seen < NOW() - %s * INTERVAL '1 day'" in sql
+        assert 'ORDER BY last_seen' in sql
+        assert 'FOR UPDATE' not in sql
+        assert params == (30, 100)
+        # Rows are locked in jobid order, re-checking they are still stale
+        sql, params = cursor.execute.call_args_list[-2][0]
+        assert 'ORDER BY jobid' in sql and 'FOR UPDATE' in sql
+        assert "last_seen < NOW() - %s * INTERVAL '1 day'" in sql
+        assert params == (list(range(40)), 30)
+        sql, params = cursor.execute.call_args[0]
+        assert 'DELETE FROM jobs WHERE jobid = ANY(%s)' in sql
+        assert params == (list(range(40)),)
+        # BM25 statistics are updated in each batch's transaction
+        assert forget.call_count == 3
+        assert forget.call_args[0] == (cursor, list(range(40)))
+
+    def test_expired_ids_reported_per_batch(self):
+        """Test that on_expired gets each committed batch's job ids."""
+        from retention import expire_stale_jobs
+
+        conn, _ = _conn(2, 1)
+        expired = []
+        with patch('retention.forget_jobs'):
+            expire_stale_jobs(conn, days=30, batch_size=2, on_expired=expired.append)
+        assert expired == [[0, 1], [0]]
+
+    def test_rows_seen_again_meanwhile_are_kept(self):
+        """Test that candidates an ingestion bumped before they were locked are not deleted."""
+        from retention import expire_stale_jobs
+
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.side_effect = [[(3,), (1,), (2,)], [(1,), (3,)]]
+        with patch('retention.forget_jobs') as forget:
+            assert expire_stale_jobs(conn, days=30, batch_size=10) == 2
+        forget.assert_called_once_with(cursor, [1, 3])
+        assert cursor.execute.call_args[0][1] == ([1, 3],)
+
+    def test_nothing_stale(self):
+        """Test that a single empty batch ends the run."""
+        from retention import expire_stale_jobs
+
+        conn, cursor = _conn(0)
+        with patch('retention.forget_jobs') as forget:
+            assert expire_stale_jobs(conn, days=30, batch_size=100) == 0
+        assert cursor.execute.call_count == 1
+        forget.assert_not_called()
+
+    def test_max_batches_caps_one_run(self):
+        """Test that a large backlog can be spread over several cycles."""
+        from retention import expire_stale_jobs
+
+        conn, cursor = _conn(10, 10, 10)
+        with patch('retention.forget_jobs'):
+            assert expire_stale_jobs(conn, days=1, batch_size=10, max_batches=2) == 20
+        assert conn.commit.call_count == 2
@@ -61,7 +61,7 @@ class TestJobSearch:
             assert response.status_code == 200
             import json
             data = json.loads(response.data)
-            assert isinstance(data, list)
+            assert isinstance(data['jobs'], list)
     
     @patch('app.get_db_connection')
     @patch('app.current_user')
@@ -96,7 +96,7 @@ class TestJobSearch:
             assert response.status_code == 200
             import json
             data = json.loads(response.data)
-            assert isinstance(data, list)
+            assert isinstance(data['jobs'], list)
     
     @patch('app.get_db_connection')
     @patch('app.current_user')
@@ -131,7 +131,7 @@ class TestJobSearch:
             assert response.status_code == 200
             import json
             data = json.loads(response.data)
-            assert isinstance(data, list)
+            assert isinstance(data['jobs'], list)
 
 
 class TestLocationFiltering:
@@ -245,3 +245,60 @@ class TestEmailSettings:
                         mock_cursor.execute.assert_called()
                         mock_conn.commit.assert_called()
 
+
+
+class TestAdminEndpoints:
+    """Test that source toggling and pool stats are admin-only."""
+
+    def _request(self, client, method, url, email, **kwargs):
+        from app import app
+
+        app.config['LOGIN_DISABLED'] = True
+        try:
+            with patch('app.current_user') as user, patch('app.ADMIN_EMAILS', {'admin@example.com'}), \
+                    patch('app.source_registry') as registry, patch('app.db_pool') as pool:
+                user.email = email
+                registry.set_enabled.return_value.to_dict.return_value = {'name': 'Indeed', 'enabled': False}
+                pool.pool_status.return_value = {'size': 2}
+                response = getattr(client, method)(url, **kwargs)
+        finally:
+            app.config['LOGIN_DISABLED'] = False
+        return response, registry
+
+    def test_non_admin_cannot_toggle_sources_or_see_pool(self, client):
+        """Test that an ordinary account gets a 403 and no source is changed."""
+        response, registry = self._request(client, 'post', '/sources/Indeed', 'user@example.com',
+                                           json={'enabled': False})
+        assert response.status_code == 403
+        registry.set_enabled.assert_not_called()
+
+        response, _ = self._request(client, 'get', '/db-pool', 'user@example.com')
+        assert response.status_code == 403
+
+    def test_admin_toggle_requires_csrf_token(self, client):
+        """Test that an admin's toggle is refused without a token and applied with one."""
+        from app import app
+
+        app.config['WTF_CSRF_ENABLED'] = True
+        try:
+            response, registry = self._request(client, 'post', '/sources/Indeed', 'Admin@example.com',
+                                               json={'enabled': False})
+            assert response.status_code == 400
+            registry.set_enabled.assert_not_called()
+
+            response, _ = self._request(client, 'get', '/sources', 'admin@example.com')
+            token = response.headers['X-CSRFToken']
+            response, registry = self._request(client, 'post', '/sources/Indeed', 'admin@example.com',
+                                               json={'enabled': False}, headers={'X-CSRFToken': token})
+            assert response.status_code == 200
+            registry.set_enabled.assert_called_once_with('Indeed', False)
+        finally:
+            app.config['WTF_CSRF_ENABLED'] = False
+
+    def test_admin_sees_pool_stats(self, client):
+        """Test that /db-pool answers for an admin."""
+        import json
+
+        response, _ = self._request(client, 'get', '/db-pool', 'admin@example.com')
+        assert response.status_code == 200
+        assert json.loads(response.data) == {'size': 2}
@@ -0,0 +1,317 @@
+"""
+Tests for the scraping aggregator in tasks.py.
+"""
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+
+def _job(source, n):
+    return {
+        'title': f'{source} Job {n}',
+        'company': f'{source} Corp',
+        'location': 'Remote',
+        'apply_link': f'https://example.com/{source.lower()}/{n}',
+        'source': source
+    }
+
+
+def _slow_scraper(source, delay):
+    def scraper(query, location, max_jobs=10, page=0):
+        time.sleep(delay)
+        return [_job(source, 1), _job(source, 2)]
+    return scraper
+
+
+def _source(name, scrape, **settings):
+    from source_registry import ScraperSource
+    return ScraperSource(name, build_request=None, parse=None, scrape=scrape, **settings)
+
+
+class TestScrapeJobsFanOut:
+    """Test concurrent multi-source fan-out in scrape_jobs."""
+
+    def test_concurrent_cost_is_slowest_source(self):
+        """Test that sources run in parallel rather than back to back."""
+        from tasks import scrape_jobs
+
+        sources = [_source(name, _slow_scraper(name, 0.3)) for name in ('Indeed', 'LinkedIn', 'TimesJobs')]
+        start = time.monotonic()
+        jobs = scrape_jobs('python developer', 'Remote', max_jobs=20, concurrent=True, max_workers=3, sources=sources)
+        elapsed = time.monotonic() - start
+
+        assert len(jobs) == 6
+        assert elapsed < 0.8
+
+    def test_concurrent_drops_source_past_deadline(self):
+        """Test that a source missing its own deadline is skipped."""
+        from tasks import scrape_jobs
+
+        sources = [
+            _source('Indeed', _slow_scraper('Indeed', 1.5), timeout=0.3),
+            _source('LinkedIn', _slow_scraper('LinkedIn', 0.05), timeout=0.3),
+            _source('TimesJobs', _slow_scraper('TimesJobs', 0.05), timeout=0.3),
+        ]
+        start = time.monotonic()
+        jobs = scrape_jobs('python developer', 'Remote', concurrent=True, sources=sources)
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 1.0
+        assert {job['source'] for job in jobs} == {'LinkedIn', 'TimesJobs'}
+
+    def test_concurrent_survives_failing_source(self):
+        """Test that an exception in one source does not lose the others."""
+        from tasks import scrape_jobs
+
+        def broken(query, location, max_jobs=10, page=0):
+            raise RuntimeError('boom')
+
+        failing = _source('Indeed', broken)
+        sources = [failing, _source('LinkedIn', _slow_scraper('LinkedIn', 0)), _source('TimesJobs', _slow_scraper('TimesJobs', 0))]
+        jobs = scrape_jobs('python developer', 'Remote', concurrent=True, sources=sources)
+
+        assert len(jobs) == 4
+        assert failing.stats['failures'] == 1
+
+    @patch('tasks.time.sleep')
+    def test_sequential_mode_still_available(self, mock_sleep):
+        """Test that the sequential path queries every source, dedupes links and no longer sleeps."""
+        from tasks import scrape_jobs
+
+        duplicate = lambda query, location, max_jobs=10, page=0: [_job('Indeed', 1)]
+        sources = [
+            _source('Indeed', duplicate),
+            _source('LinkedIn', duplicate),
+            _source('TimesJobs', lambda query, location, max_jobs=10, page=0: [_job('TimesJobs', 1)]),
+        ]
+        jobs = scrape_jobs('python developer', 'Remote', concurrent=False, sources=sources)
+
+        assert len(jobs) == 2
+        mock_sleep.assert_not_called()
+
+
+class TestSourceRegistry:
+    """Test the scraper source registry and its per-source settings."""
+
+    def test_default_sources_are_registered(self):
+        """Test that all three scrapers are registered in order."""
+        from tasks import registry
+
+        assert [source.name for source in registry.all()] == ['Indeed', 'LinkedIn', 'TimesJobs']
+
+    def test_settings_override_registration_defaults(self):
+        """Test that SOURCE_SETTINGS-style overrides win over defaults."""
+        from source_registry import SourceRegistry
+
+        registry = SourceRegistry({'Slow': {'enabled': False, 'weight': 0.5}})
+        source = registry.register('Slow', None, None, _slow_scraper('Slow', 0), concurrency=1)
+
+        assert source.concurrency == 1
+        assert source.max_jobs == 5
+        assert registry.enabled() == []
+
+    def test_disabled_source_is_not_dispatched(self):
+        """Test that switching a source off at runtime removes it from scrape_jobs."""
+        from source_registry import SourceRegistry
+        from tasks import scrape_jobs, resolve_sources
+
+        registry = SourceRegistry({})
+        registry.register('Indeed', None, None, _slow_scraper('Indeed', 0))
+        registry.register('LinkedIn', None, None, _slow_scraper('LinkedIn', 0))
+        registry.set_enabled('Indeed', False)
+
+        with patch('tasks.registry', registry):
+            jobs = scrape_jobs('python developer', 'Remote', concurrent=True)
+            assert [source.name for source in resolve_sources(['LinkedIn', 'Unknown'])] == ['LinkedIn']
+
+        assert {job['source'] for job in jobs} == {'LinkedIn'}
+
+    def test_run_records_timing_and_respects_weight(self):
+        """Test that each run is timed per source and capped by its weight."""
+        seen = {}
+
+        def scraper(query, location, max_jobs=10, page=0):
+            seen['max_jobs'] = max_jobs
+            return [_job('Indeed', 1)]
+
+        source = _source('Indeed', scraper, weight=2.0)
+        source.run('python developer', 'Remote')
+        stats = source.to_dict()['stats']
+
+        assert seen['max_jobs'] == 20
+        assert stats['calls'] == 1 and stats['jobs'] == 1
+        assert stats['last_seconds'] is not None
+
+
+class TestPlanScrapeCycle:
+    """Test cross-user deduplication of background scrape searches."""
+
+    DEFAULT_LOCATIONS = ["Bangalore, Karnataka", "Chandigarh", "Delhi", "Remote"]
+
+    def test_shared_searches_are_planned_once(self):
+        """Test that users with the same skills and location share searches."""
+        from tasks import plan_scrape_cycle
+
+        users = [
+            {'id': 1, 'skills': ['Python'], 'preferred_location': 'Remote'},
+            {'id': 2, 'skills': ['python'], 'preferred_location': 'remote'},
+            {'id': 3, 'skills': ['Python'], 'preferred_location': 'Remote'},
+        ]
+        plan = plan_scrape_cycle(users, self.DEFAULT_LOCATIONS)
+
+        assert len(plan) == 2
+        assert all(user_ids == [1, 2, 3] for user_ids in plan.values())
+        assert {location for _, location in plan} == {'Remote'}
+
+    def test_users_without_skills_are_skipped(self):
+        """Test that users with no skills contribute no searches."""
+        from tasks import plan_scrape_cycle
+
+        plan = plan_scrape_cycle([{'id': 1, 'skills': [], 'preferred_location': None}], self.DEFAULT_LOCATIONS)
+
+        assert plan == {}
+
+    def test_per_user_limits_still_apply(self):
+        """Test that each user is capped at 3 locations x 3 queries."""
+        from tasks import plan_scrape_cycle
+
+        users = [{'id': 1, 'skills': ['Python', 'Flask', 'Django'], 'preferred_location': 'India'}]
+        plan = plan_scrape_cycle(users, self.DEFAULT_LOCATIONS)
+
+        assert len(plan) == 9
+        assert {location for _, location in plan} == set(self.DEFAULT_LOCATIONS[:3])
+
+    def test_results_fan_back_out_to_each_user(self):
+        """Test that every user receives the jobs of the searches they needed."""
+        from tasks import fan_out_results
+
+        plan = {
+            ('python developer', 'Remote'): [1, 2],
+            ('flask developer', 'Delhi'): [2],
+        }
+        results = {
+            ('python developer', 'Remote'): [_job('Indeed', 1), _job('LinkedIn', 1)],
+            ('flask developer', 'Delhi'): [_job('Indeed', 1), _job('TimesJobs', 2)],
+        }
+        user_jobs = fan_out_results(plan, results)
+
+        assert len(user_jobs[1]) == 2
+        # Indeed job 1 appears in both of user 2's searches but is only counted once
+        assert len(user_jobs[2]) == 3
+
+
+def _paged_scraper(source, per_page=10):
+    calls = []
+
+    def scraper(query, location, max_jobs=10, page=0):
+        calls.append(page)
+        return [_job(source, page * per_page + n) for n in range(per_page)]
+    scraper.calls = calls
+    return scraper
+
+
+class TestIncrementalCrawl:
+    """Test pagination with early termination on known jobs."""
+
+    def test_stops_on_page_of_known_jobs(self):
+        """Test that paging stops once a page is mostly jobs already in the database."""
+        from tasks import KnownLinks, crawl_source
+
+        scraper = _paged_scraper('LinkedIn')
+        stored = {_job('LinkedIn', n)['apply_link'] for n in range(10, 40)}
+        lookups = []
+
+        def lookup(links):
+            lookups.append(list(links))
+            return stored.intersection(links)
+
+        known = KnownLinks(lookup=lookup, stop_ratio=0.8)
+        jobs = crawl_source(_source('LinkedIn', scraper, max_pages=5), 'python', 'Remote', known)
+
+        assert scraper.calls == [0, 1]
+        assert len(jobs) == 20
+        # One batched lookup per page
+        assert [len(batch) for batch in lookups] == [10, 10]
+
+    def test_page_budget_caps_crawl(self):
+        """Test that a source with only new jobs stops at its page budget."""
+        from tasks import KnownLinks, crawl_source
+
+        scraper = _paged_scraper('Indeed')
+        jobs = crawl_source(_source('Indeed', scraper, max_pages=3), 'python', 'Remote', KnownLinks())
+
+        assert scraper.calls == [0, 1, 2]
+        assert len(jobs) == 30
+
+    def test_without_tracker_only_first_page(self):
+        """Test that callers without known-link tracking keep single-page behaviour."""
+        from tasks import scrape_jobs
+
+        scraper = _paged_scraper('TimesJobs')
+        scrape_jobs('python', 'Remote', concurrent=False, sources=[_source('TimesJobs', scraper, max_pages=3)])
+
+        assert scraper.calls == [0]
+
+    def test_repeat_search_in_same_crawl_stops_early(self):
+        """Test that links seen earlier in the crawl count as known for the stop rule."""
+        from tasks import KnownLinks, crawl_source
+
+        known = KnownLinks()
+        crawl_source(_source('Indeed', _paged_scraper('Indeed'), max_pages=1), 'python', 'Remote', known)
+        scraper = _paged_scraper('Indeed')
+        crawl_source(_source('Indeed', scraper, max_pages=3), 'python developer', 'Remote', known)
+
+        assert scraper.calls == [0]
+
+    def test_new_jobs_are_not_capped(self):
+        """Test that max_jobs only bounds already-stored jobs when paging."""
+        from tasks import KnownLinks, scrape_jobs
+
+        stored = {_job('Indeed', n)['apply_link'] for n in range(20, 30)}
+        known = KnownLinks(lookup=stored.intersection)
+        jobs = scrape_jobs('python', 'Remote', max_jobs=5, concurrent=False, known_links=known,
+                           sources=[_source('Indeed', _paged_scraper('Indeed'), max_pages=3)])
+
+        new = [job for job in jobs if job['apply_link'] not in stored]
+        assert len(new) == 20
+        assert len(jobs) == 20
+
+    def test_request_builders_page_offsets(self):
+        """Test that each source asks for the right result page."""
+        from tasks import build_indeed_request, build_linkedin_request, build_timesjobs_request
+
+        assert 'start' not in build_indeed_request('python', 'Remote')['params']
+        assert build_indeed_request('python', 'Remote', page=2)['params']['start'] == 20
+        assert build_linkedin_request('python', 'Remote', page=1)['params']['start'] == 25
+        assert 'sequence' not in build_timesjobs_request('python', 'Remote')['params']
+        assert build_timesjobs_request('python', 'Remote', page=1)['params']['sequence'] == 2
+
+    @pytest.mark.parametrize('name,fixture,card_link,page_size', [
+        ('LinkedIn', 'linkedin_search.html', 'https://in.linkedin.com/jobs/view/', 25),
+        ('TimesJobs', 'timesjobs_search.html', 'https://www.timesjobs.com/job-detail/', 20),
+    ])
+    def test_consecutive_pages_produce_every_card(self, name, fixture, card_link, page_size):
+        """Test that the second page starts right after the first, so no result is skipped between them."""
+        import itertools
+        import re
+        from types import SimpleNamespace
+        from tasks import KnownLinks, crawl_source, scrape_linkedin, scrape_timesjobs
+
+        with open(os.path.join(os.path.dirname(__file__), 'fixtures', fixture), encoding='utf-8') as f:
+            html = f.read()
+
+        def fetch_page(req):
+            # Serves results [offset, offset + page_size), numbered into each card's link
+            params = req['params']
+            offset = params['start'] if 'start' in params else (params.get('sequence', 1) - 1) * page_size
+            numbers = itertools.count(offset)
+            text = re.sub(re.escape(card_link), lambda m: f'{card_link}{next(numbers)}/', html)
+            return SimpleNamespace(status=200, text=text, content_hash=None)
+
+        scraper = scrape_linkedin if name == 'LinkedIn' else scrape_timesjobs
+        with patch('tasks.fetch_page', side_effect=fetch_page):
+            jobs = crawl_source(_source(name, scraper, max_pages=2), 'python', 'Remote', KnownLinks())
+
+        results = {int(job['apply_link'][len(card_link):].split('/')[0]) for job in jobs}
+        assert results == set(range(2 * page_size))
@@ -0,0 +1,334 @@
+"""
+Tests for the /search text query.
+"""
+from unittest.mock import Mock, patch
+
+
+def _cursor(*results):
+    cursor = Mock()
+    cursor.fetchall.side_effect = list(results)
+    return cursor
+
+
+def _sql(cursor):
+    return [call[0][0] for call in cursor.execute.call_args_list]
+
+
+class TestSearchJobsText:
+    """Test full-text search with the substring fallback."""
+
+    def test_full_text_query_ranked(self):
+        """Test that a query runs against the tsvector index, ranked, without ILIKE."""
+        from app import search_jobs_text
+
+        row = {'title': 'Python Developer'}
+        cursor = _cursor([row])
+        jobs, mode = search_jobs_text(Mock(), cursor, 'python -java', " AND location ILIKE %s", ['%Remote%'], limit=20)
+
+        assert jobs == [row]
+        assert mode == 'fts'
+        sql = _sql(cursor)
+        assert len(sql) == 1
+        assert "websearch_to_tsquery('english', %s)" in sql[0]
+        assert 'ORDER BY rank DESC, jobid DESC' in sql[0]
+        assert 'ILIKE %s OR' not in sql[0]
+        assert cursor.execute.call_args[0][1] == ('python -java', '%Remote%', 21)
+
+    def test_no_full_text_hits_falls_back_to_substring(self):
+        """Test that a partial word still finds jobs through ILIKE."""
+        from app import search_jobs_text
+
+        row = {'title': 'Python Developer'}
+        cursor = _cursor([], [row])
+        jobs, mode = search_jobs_text(Mock(), cursor, 'pyth', limit=20)
+
+        assert jobs == [row]
+        assert mode == 'substring'
+        assert 'title ILIKE %s' in _sql(cursor)[1]
+        assert cursor.execute.call_args[0][1] == ('%pyth%', '%pyth%', '%pyth%', 21)
+
+    def test_substring_mode_skips_full_text(self):
+        """Test that match=substring keeps the old behaviour."""
+        from app import search_jobs_text
+
+        cursor = _cursor([])
+        search_jobs_text(Mock(), cursor, 'python', match='substring')
+
+        sql = _sql(cursor)
+        assert len(sql) == 1
+        assert 'websearch_to_tsquery' not in sql[0]
+
+    def test_missing_index_falls_back(self):
+        """Test that a database without search_vector rolls back and uses ILIKE."""
+        import psycopg2
+        from app import search_jobs_text
+
+        conn = Mock()
+        cursor = _cursor([])
+        cursor.execute.side_effect = [psycopg2.ProgrammingError('column "search_vector" does not exist'), None]
+        search_jobs_text(conn, cursor, 'python')
+
+        conn.rollback.assert_called_once()
+        assert 'ILIKE' in _sql(cursor)[1]
+
+    def test_next_page_continues_in_same_mode(self):
+        """Test that a cursor resumes after its (rank, jobid) without falling back."""
+        from app import search_jobs_text
+
+        cursor = _cursor([])
+        jobs, mode = search_jobs_text(Mock(), cursor, 'python', after={'mode': 'fts', 'rank': 0.5, 'id': 42}, limit=10)
+
+        assert (jobs, mode) == ([], 'fts')
+        sql = _sql(cursor)
+        assert len(sql) == 1
+        assert '(ts_rank(search_vector, tsq), jobid) < (%s::real, %s)' in sql[0]
+        assert cursor.execute.call_args[0][1] == ('python', 0.5, 42, 11)
+
+        cursor = _cursor([])
+        search_jobs_text(Mock(), cursor, 'pyth', after={'mode': 'substring', 'id': 42}, limit=10)
+        assert 'jobid < %s' in _sql(cursor)[0]
+        assert 'websearch_to_tsquery' not in _sql(cursor)[0]
+
+    def test_sort_recent_orders_matches_newest_first(self):
+        """Test that sort=recent keeps the full-text match but pages by jobid."""
+        from app import search_jobs_text
+
+        row = {'jobid': 9, 'title': 'Python Developer'}
+        cursor = _cursor([row])
+        jobs, mode = search_jobs_text(Mock(), cursor, 'python', sort='recent', limit=10)
+
+        assert (jobs, mode) == ([row], 'fts_recent')
+        assert 'search_vector @@ tsq' in _sql(cursor)[0]
+        assert 'ORDER BY jobid DESC' in _sql(cursor)[0]
+
+        cursor = _cursor([])
+        search_jobs_text(Mock(), cursor, 'python', after={'mode': 'fts_recent', 'id': 9}, limit=10)
+        assert 'AND jobid < %s' in _sql(cursor)[0]
+        assert cursor.execute.call_args[0][1] == ('python', 9, 11)
+
+
+class TestSearchPagination:
+    """Test keyset pagination of the /search endpoint."""
+
+    def _get(self, client, url, rows, skills=None, results=None):
+        from app import app
+
+        conn = Mock()
+        cursor = Mock()
+        cursor.fetchall.return_value = rows
+        if results is not None:
+            cursor.fetchall.side_effect = results
+        conn.cursor.return_value = cursor
+        app.config['LOGIN_DISABLED'] = True
+        try:
+            with patch('app.get_db_connection', return_value=conn), patch('app.current_user') as user:
+                user.skills = skills or []
+                user.preferred_location = None
+                response = client.get(url)
+        finally:
+            app.config['LOGIN_DISABLED'] = False
+        return response, cursor
+
+    def test_recent_jobs_page_and_cursor(self, client):
+        """Test that a full page returns next_cursor and the query is LIMITed."""
+        import json
+        from app import decode_search_cursor
+
+        rows = [{'jobid': 100 - n, 'title': f'Job {n}', 'company': 'Corp', 'location': 'Remote'} for n in range(4)]
+        response, cursor = self._get(client, '/search?limit=3', rows)
+
+        data = json.loads(response.data)
+        assert [job['jobid'] for job in data['jobs']] == [100, 99, 98]
+        assert decode_search_cursor(data['next_cursor']) == {'mode': 'recent', 'id': 98}
+        sql, params = cursor.execute.call_args[0]
+        assert 'ORDER BY jobid DESC LIMIT %s' in sql
+        assert params[-1] == 4
+
+        response, cursor = self._get(client, f"/search?limit=3&cursor={data['next_cursor']}", rows[:1])
+        data = json.loads(response.data)
+        assert data['next_cursor'] is None
+        assert cursor.execute.call_args[0][1] == (98, 4)
+
+    def test_fts_rank_kept_out_of_response(self, client):
+        """Test that the rank is carried in the cursor, not in the jobs."""
+        import json
+        from app import decode_search_cursor
+
+        rows = [{'jobid': 7 - n, 'title': 'Python Dev', 'company': 'Corp', 'location': 'Remote', 'rank': 0.25}
+                for n in range(2)]
+        response, _ = self._get(client, '/search?q=python&limit=1', rows)
+
+        data = json.loads(response.data)
+        assert 'rank' not in data['jobs'][0]
+        assert decode_search_cursor(data['next_cursor']) == {'mode': 'fts', 'id': 7, 'rank': 0.25}
+
+    def test_personalized_pages_by_score(self, client):
+        """Test that personalized pages read user_job_matches and continue below (score, jobid)."""
+        import json
+        from app import decode_search_cursor
+
+        matches = [
+            {'jobid': 1, 'title': 'Python Flask Developer', 'company': 'A', 'location': 'Remote',
+             'match_score': 100.0, 'matched_skills': ['Python', 'Flask']},
+            {'jobid': 2, 'title': 'Python Developer', 'company': 'B', 'location': 'Remote',
+             'match_score': 50.0, 'matched_skills': ['Python']},
+        ]
+        response, cursor = self._get(client, '/search?personalized=true&limit=1', None,
+                                     skills=['Python', 'Flask'], results=[matches])
+        first = json.loads(response.data)
+        assert [job['jobid'] for job in first['jobs']] == [1]
+        assert decode_search_cursor(first['next_cursor']) == {'mode': 'personalized', 'score': 100.0, 'id': 1}
+        sql, params = cursor.execute.call_args[0]
+        assert 'FROM user_job_matches m JOIN jobs' in sql
+        assert 'ORDER BY m.score DESC, m.job_id DESC' in sql
+        # A full page of matches needs no second query
+        assert cursor.execute.call_count == 1
+
+        unmatched = [{'jobid': 3, 'title': 'Java Developer', 'company': 'C', 'location': 'Remote'}]
+        response, cursor = self._get(client, f"/search?personalized=true&limit=5&cursor={first['next_cursor']}",
+                                     None, skills=['Python', 'Flask'], results=[matches[1:], unmatched])
+        rest = json.loads(response.data)
+        assert [job['jobid'] for job in rest['jobs']] == [2, 3]
+        assert rest['jobs'][1]['match_score'] == 0
+        assert rest['next_cursor'] is None
+        first_sql, first_params = cursor.execute.call_args_list[0][0]
+        assert '(m.score, m.job_id) < (%s, %s)' in first_sql
+        assert first_params[-3:] == (100.0, 1, 6)
+        second_sql, second_params = cursor.execute.call_args_list[1][0]
+        assert 'NOT EXISTS' in second_sql
+        assert second_params[-1] == 5
+
+    def test_personalized_zero_score_cursor_skips_matches(self, client):
+        """Test that a cursor past the matches only pages through unmatched jobs."""
+        from app import encode_search_cursor
+
+        token = encode_search_cursor({'mode': 'personalized', 'score': 0, 'id': 40})
+        response, cursor = self._get(client, f'/search?personalized=true&limit=2&cursor={token}', None,
+                                     skills=['Python'], results=[[]])
+
+        assert response.status_code == 200
+        assert cursor.execute.call_count == 1
+        sql, params = cursor.execute.call_args[0]
+        assert 'NOT EXISTS' in sql and 'AND jobid < %s' in sql
+        assert params[-2:] == (40, 3)
+
+    def test_posted_within_filters_on_first_seen(self, client):
+        """Test that posted_within adds an indexed first_seen bound."""
+        response, cursor = self._get(client, '/search?posted_within=7&limit=3', [])
+
+        assert response.status_code == 200
+        sql, params = cursor.execute.call_args[0]
+        assert "first_seen >= NOW() - %s * INTERVAL '1 day'" in sql
+        assert params == (7, 4)
+
+    def test_bad_cursor_rejected(self, client):
+        """Test that a malformed cursor is a 400, not a server error."""
+        response, _ = self._get(client, '/search?cursor=not-a-cursor', [])
+
+        assert response.status_code == 400
+
+    def test_cursor_with_wrong_field_types_rejected(self, client):
+        """Test that a decodable cursor whose keys have the wrong types is a 400 before any query runs."""
+        import json
+        from app import encode_search_cursor
+
+        bad = [{'mode': 'recent', 'id': True}, {'mode': 'fts', 'id': 7, 'rank': 'high'},
+               {'mode': 'bm25', 'id': 9, 'rank': None}, {'mode': 'personalized', 'id': 1, 'score': [50]},
+               {'mode': 'personalized', 'id': 1, 'score': float('nan')}, {'mode': 3, 'id': 1},
+               {'mode': 'other', 'id': 1}]
+        for position in bad:
+            response, cursor = self._get(client, f'/search?cursor={encode_search_cursor(position)}', [])
+            assert response.status_code == 400, position
+            assert json.loads(response.data)['message'] == 'Invalid cursor'
+            cursor.execute.assert_not_called()
+
+    def test_bm25_rank_uses_skills_and_pins_cursor(self, client):
+        """Test that rank=bm25 ranks by the user's skill terms and later pages stay in BM25 order."""
+        import json
+        from app import decode_search_cursor
+
+        rows = [{'jobid': 9 - n, 'title': 'Python Flask Developer', 'company': 'Corp', 'location': 'Remote',
+                 'rank': 3.5 - n} for n in range(2)]
+        response, cursor = self._get(client, '/search?personalized=true&rank=bm25&limit=1', rows,
+                                     skills=['Python', 'Flask'])
+
+        data = json.loads(response.data)
+        assert [job['jobid'] for job in data['jobs']] == [9]
+        assert 'rank' not in data['jobs'][0]
+        assert decode_search_cursor(data['next_cursor']) == {'mode': 'bm25', 'id': 9, 'rank': 3.5}
+        sql, params = cursor.execute.call_args[0]
+        assert 'FROM term_stats, corpus' in sql
+        assert 'user_job_matches' not in sql
+        assert params == (['flask', 'python'], 2)
+
+        response, cursor = self._get(client, f"/search?personalized=true&limit=1&cursor={data['next_cursor']}",
+                                     rows[1:], skills=['Python', 'Flask'])
+        sql, params = cursor.execute.call_args[0]
+        assert '(ranked.rank, jobid) < (%s, %s)' in sql
+        assert params == (['flask', 'python'], 3.5, 9, 2)
+
+    def test_bm25_rank_rejects_min_score(self, client):
+        """Test that min_score with BM25 ranking is a 400, not silently ignored."""
+        import json
+        from app import encode_search_cursor
+
+        response, cursor = self._get(client, '/search?personalized=true&rank=bm25&min_score=50', [],
+                                     skills=['Python', 'Flask'])
+        assert response.status_code == 400
+        assert 'min_score' in json.loads(response.data)['message']
+        cursor.execute.assert_not_called()
+
+        # Also when the BM25 ranking comes from the cursor
+        after = encode_search_cursor({'mode': 'bm25', 'id': 9, 'rank': 3.5})
+        response, _ = self._get(client, f'/search?personalized=true&min_score=50&cursor={after}', [],
+                                skills=['Python', 'Flask'])
+        assert response.status_code == 400
+
+    def test_min_score_rejected_without_personalized(self, client):
+        """Test that min_score on a regular search is a 400, not silently ignored."""
+        import json
+
+        response, cursor = self._get(client, '/search?q=python&min_score=50', [], skills=['Python'])
+        assert response.status_code == 400
+        assert 'personalized' in json.loads(response.data)['message']
+        cursor.execute.assert_not_called()
+
+    def test_min_score_for_user_without_skills_matches_nothing(self, client):
+        """Test that a user with no skills gets no jobs above a min_score rather than every job."""
+        import json
+
+        rows = [{'jobid': 5, 'title': 'Python Developer', 'company': 'Corp', 'location': 'Remote'}]
+        response, cursor = self._get(client, '/search?personalized=true&min_score=50', rows)
+
+        assert response.status_code == 200
+        assert json.loads(response.data) == {'jobs': [], 'next_cursor': None}
+        cursor.execute.assert_not_called()
+
+    def test_personalized_min_score_cuts_off_index_read(self, client):
+        """Test that min_score bounds the match range and skips the zero-score tail."""
+        import json
+
+        matches = [{'jobid': 1, 'title': 'Python Flask Developer', 'company': 'A', 'location': 'Remote',
+                    'match_score': 100.0, 'matched_skills': ['Python', 'Flask']}]
+        response, cursor = self._get(client, '/search?personalized=true&limit=5&min_score=50', None,
+                                     skills=['Python', 'Flask'], results=[matches])
+
+        data = json.loads(response.data)
+        assert [job['jobid'] for job in data['jobs']] == [1]
+        assert data['next_cursor'] is None
+        assert cursor.execute.call_count == 1
+        sql, params = cursor.execute.call_args[0]
+        assert 'AND m.score >= %s' in sql
+        assert params[-2:] == (50.0, 6)
+
+    def test_personalized_min_score_past_matches_is_empty(self, client):
+        """Test that a zero-score cursor with a min_score returns no unmatched jobs."""
+        import json
+        from app import encode_search_cursor
+
+        token = encode_search_cursor({'mode': 'personalized', 'score': 0, 'id': 40})
+        response, cursor = self._get(client, f'/search?personalized=true&min_score=250&cursor={token}', None,
+                                     skills=['Python'], results=[])
+
+        assert json.loads(response.data)['jobs'] == []
+        cursor.execute.assert_not_called()
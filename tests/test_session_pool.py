@@ -0,0 +1,100 @@
+"""
+Tests for the warmed session pool used by the blocking scrapers.
+"""
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+
+@pytest.fixture
+def pool():
+    from session_pool import SessionPool
+    return SessionPool(size=1, ttl=60, scheduler=None)
+
+
+class TestSessionPool:
+    """Test reuse, warm-up, expiry and exclusive checkout."""
+
+    def test_session_reused_and_warmed_once(self, pool):
+        """Test that repeated checkouts share one session and one homepage visit."""
+        with patch('requests.Session.get') as mock_get:
+            with pool.checkout('Indeed', 'in.indeed.com', warmup_url='https://in.indeed.com/') as first:
+                pass
+            with pool.checkout('Indeed', 'in.indeed.com', warmup_url='https://in.indeed.com/') as second:
+                pass
+
+        assert first is second
+        assert mock_get.call_count == 1
+        assert pool.stats['created'] == 1
+        assert pool.stats['reused'] == 1
+
+    def test_pools_are_keyed_by_source_and_domain(self, pool):
+        """Test that different domains never share cookies."""
+        with pool.checkout('Indeed', 'in.indeed.com') as indian, pool.checkout('Indeed', 'www.indeed.com') as us:
+            assert indian is not us
+
+    def test_expired_session_is_rewarmed(self, pool):
+        """Test that a session past its TTL is replaced and warmed again."""
+        with patch('requests.Session.get') as mock_get:
+            with pool.checkout('Indeed', 'in.indeed.com', warmup_url='https://in.indeed.com/') as first:
+                pass
+            first.created_at -= 120
+            with pool.checkout('Indeed', 'in.indeed.com', warmup_url='https://in.indeed.com/') as second:
+                pass
+
+        assert first is not second
+        assert mock_get.call_count == 2
+        assert pool.stats['expired'] == 1
+
+    def test_invalidated_session_is_replaced(self, pool):
+        """Test that a session marked invalid is not handed out again."""
+        with pool.checkout('LinkedIn', 'linkedin.com') as first:
+            first.invalidate()
+        with pool.checkout('LinkedIn', 'linkedin.com') as second:
+            pass
+
+        assert first is not second
+        assert pool.stats['invalidated'] == 1
+
+    def test_checkout_is_exclusive(self, pool):
+        """Test that a second thread waits for the only session instead of sharing it."""
+        order = []
+
+        def worker(name):
+            with pool.checkout('LinkedIn', 'linkedin.com') as session:
+                order.append((name, 'in', id(session)))
+                time.sleep(0.05)
+                order.append((name, 'out', id(session)))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Each checkout finishes before the next one starts
+        assert [step for _, step, _ in order] == ['in', 'out', 'in', 'out']
+        assert pool.stats['created'] == 1
+
+
+class TestFetchPageSessions:
+    """Test that fetch_page goes through the pool."""
+
+    def test_403_refreshes_session_and_retries(self, pool):
+        """Test that a refused search is retried once on a freshly warmed session."""
+        import tasks
+
+        refused = Mock(status_code=403, headers={}, text='blocked')
+        ok = Mock(status_code=200, headers={}, text='<div>jobs</div>')
+        req = tasks.build_indeed_request('python developer', 'Bangalore')
+
+        with patch('tasks.session_pool', pool), \
+             patch('tasks.scheduler.acquire'), \
+             patch('requests.Session.get', side_effect=[None, refused, None, ok]) as mock_get:
+            page = tasks.fetch_page(req)
+
+        assert page.status == 200
+        # warm-up, search, warm-up again on a new session, search
+        assert mock_get.call_count == 4
+        assert pool.stats['invalidated'] == 1
@@ -0,0 +1,169 @@
+"""
+Tests for the in-memory skill -> job inverted index.
+"""
+import random
+
+
+TITLES = ['Python Developer', 'Senior Java Engineer', 'JavaScript / React Dev', 'Data Scientist (ML)',
+          'Go Backend Engineer', 'C++ Systems Programmer', 'DevOps - AWS & Docker', 'Full Stack Node.js']
+COMPANIES = ['Acme', 'Google', 'Go Digital', None, 'Pythonic Labs', 'R&D Corp']
+DESCRIPTIONS = [None, '', 'Python services on AWS.', 'SQL, Docker and some R.', 'Java/JavaScript shop']
+SKILLS = ['Python', 'Java', 'JavaScript', 'go', 'C++', 'AWS', 'react', 'Docker', 'ML', 'r', 'SQL', 'Python']
+
+
+def _jobs(count, seed=7):
+    rng = random.Random(seed)
+    return [(n, rng.choice(TITLES), rng.choice(COMPANIES), rng.choice(DESCRIPTIONS)) for n in range(count)]
+
+
+class TestSkillIndex:
+    """Test posting lists against calculate_job_match_score."""
+
+    def _expected(self, jobs, skills):
+        from matches import calculate_job_match_score
+
+        expected = {}
+        for job_id, title, company, description in jobs:
+            job = {'title': title, 'company': company, 'description': description}
+            score, matched = calculate_job_match_score(job, skills)
+            if score > 0:
+                expected[job_id] = (score, matched)
+        return expected
+
+    def test_matches_identical_to_substring_scoring(self):
+        """Test that every job's score and matched skills equal the original function's."""
+        from skill_index import SkillIndex
+
+        jobs = _jobs(300)
+        index = SkillIndex(SKILLS)
+        index.add_jobs(jobs)
+        rng = random.Random(3)
+        for _ in range(20):
+            skills = rng.sample(SKILLS, rng.randint(1, 6))
+            got = {job_id: (score, matched) for job_id, score, matched in index.match(skills)}
+            assert got == self._expected(jobs, skills)
+
+    def test_posting_lists_built_as_jobs_are_added(self):
+        """Test that jobs are matched against the vocabulary on add, keeping their skills, not their text."""
+        from skill_index import SkillIndex
+
+        index = SkillIndex(['Python', 'Java', 'Flask'])
+        index.add_jobs([(1, 'Python Flask Developer', 'Acme', 'A long description that is not kept.')])
+        assert index._skills_of == {1: ('python', 'flask')}
+        assert index.covers(['PYTHON', 'java']) and not index.covers(['Python', 'Rust'])
+        assert index.postings('rust') is None
+
+    def test_posting_lists_follow_adds_and_removes(self):
+        """Test that posting lists are kept current incrementally."""
+        from skill_index import SkillIndex
+
+        index = SkillIndex()
+        index.add_jobs([(1, 'Python Developer', 'Acme', None)])
+        assert index.postings('PYTHON') == {1}
+
+        index.add_jobs([(2, 'Senior Python Engineer', 'Beta', None), (3, 'Java Developer', 'Gamma', None)])
+        assert index.postings('python') == {1, 2}
+        assert index.postings('java') == {3}
+
+        index.remove_jobs([1, 3, 99])
+        assert index.postings('python') == {2}
+        assert index.postings('java') == set()
+        assert len(index) == 1
+
+    def test_fetched_description_replaces_the_skills(self):
+        """Test that re-adding a job with its description updates its posting lists."""
+        from skill_index import SkillIndex
+
+        index = SkillIndex()
+        index.add_jobs([(1, 'Backend Developer', 'Acme', None)])
+        assert index.postings('django') == set()
+
+        index.add_jobs([(1, 'Backend Developer', 'Acme', 'Python services on Django.')])
+        assert index.postings('django') == {1}
+        assert list(index.match(['Python', 'Go'])) == [(1, 50.0, ['Python'])]
+        assert len(index) == 1
+
+    def test_learn_fills_in_skills_outside_the_vocabulary(self):
+        """Test that a pass over the jobs covers new skills, including jobs added or removed meanwhile."""
+        from skill_index import SkillIndex
+
+        jobs = _jobs(200)
+        index = SkillIndex()
+        index.add_jobs(jobs)
+        skills = ['ML', 'r', 'Python']
+        assert not index.covers(skills)
+
+        seen = []
+        for job in index.learn(skills, jobs):
+            seen.append(job)
+            if len(seen) == 50:
+                # Another thread ingests and expires jobs in the middle of the pass
+                index.add_jobs([(500, 'ML Engineer', 'Acme', None)])
+                index.remove_jobs([0, 199])
+        assert seen == jobs
+        assert index.covers(skills)
+
+        current = [job for job in jobs if job[0] not in (0, 199)] + [(500, 'ML Engineer', 'Acme', None)]
+        got = {job_id: (score, matched) for job_id, score, matched in index.match(skills)}
+        assert got == self._expected(current, skills)
+
+    def test_unfinished_learn_leaves_skills_uncovered(self):
+        """Test that a pass that fails partway doesn't mark its skills as covered."""
+        from skill_index import SkillIndex
+
+        def failing():
+            yield (1, 'ML Engineer', 'Acme', None)
+            raise RuntimeError('connection lost')
+
+        index = SkillIndex()
+        index.add_jobs([(1, 'ML Engineer', 'Acme', None)])
+        try:
+            list(index.learn(['ML'], failing()))
+        except RuntimeError:
+            pass
+        assert not index.covers(['ML'])
+        # Jobs added since are matched against the skill, and the next pass completes it
+        index.add_jobs([(2, 'Senior ML Engineer', 'Beta', None)])
+        list(index.learn(['ML'], [(1, 'ML Engineer', 'Acme', None), (2, 'Senior ML Engineer', 'Beta', None)]))
+        assert index.postings('ml') == {1, 2}
+
+    def test_build_covers_every_users_skills(self):
+        """Test that the load matches jobs against the taxonomy and the skills users have."""
+        from unittest.mock import MagicMock, patch
+        from skill_index import SkillIndex
+
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = ('2026-01-01T00:00:00+00:00',)
+        cursor.fetchall.return_value = [('ML',), ('Python',)]
+        jobs = [(1, 'ML Engineer', 'Acme', 'Python'), (2, 'Java Developer', 'Beta', None)]
+        index = SkillIndex()
+        with patch('skill_index.stream_rows', return_value=iter(jobs)):
+            index.build(conn)
+
+        assert index.ready
+        assert 'unnest(skills)' in cursor.execute.call_args[0][0]
+        assert index.postings('ml') == {1} and index.postings('java') == {2}
+
+    def test_catch_up_reads_jobs_other_processes_ingested(self):
+        """Test that catch_up adds jobs past the newest one the index has seen."""
+        from unittest.mock import MagicMock
+        from skill_index import SkillIndex
+
+        index = SkillIndex()
+        index.add_jobs([(5, 'Python Developer', 'Acme', None)])
+        assert index.postings('python') == {5}
+
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ('2026-01-01T00:00:00+00:00',)
+        cursor.fetchall.return_value = [(5, 'Python Developer', 'Acme', None), (7, 'Python Engineer', 'Beta', None)]
+        assert index.catch_up(cursor) == 2
+        assert index.postings('python') == {5, 7}
+        sql, params = cursor.execute.call_args[0]
+        assert 'jobid > %s OR first_seen >=' in sql
+        assert 'OR description_checked_at >=' in sql
+        assert params[:2] == (5, None)
+
+        cursor.fetchall.return_value = []
+        index.catch_up(cursor)
+        assert cursor.execute.call_args[0][1][:2] == (7, '2026-01-01T00:00:00+00:00')
@@ -0,0 +1,71 @@
+"""
+Tests for the Aho-Corasick skill matcher.
+"""
+import random
+
+
+class TestSkillMatcher:
+    """Test single-pass multi-pattern matching."""
+
+    def test_whole_words_only(self):
+        """Test that word-character edges need a boundary and punctuation edges don't."""
+        from skill_matcher import SkillMatcher
+
+        for native in (True, False):
+            matcher = SkillMatcher(['go', 'java', 'c++', '.net', 'rest api', 'node.js'], native=native)
+            assert matcher.find('Google hires JavaScript devs') == []
+            assert matcher.find('Go, Java and C++ on ASP.NET') == ['go', 'java', 'c++', '.net']
+            assert matcher.find('Built a REST API in Node.js.') == ['rest api', 'node.js']
+
+    def test_overlapping_and_nested_patterns(self):
+        """Test that patterns sharing prefixes and suffixes are all found."""
+        from skill_matcher import SkillMatcher
+
+        for native in (True, False):
+            matcher = SkillMatcher(['sql', 'mysql', 'postgresql', 'my'], native=native)
+            assert matcher.find('postgresql and mysql') == ['postgresql', 'mysql']
+            assert matcher.find('my sql') == ['my', 'sql']
+
+    def test_agrees_with_per_skill_regex(self):
+        """Test the automaton against one skill_pattern search per skill on random text."""
+        from skill_matcher import SkillMatcher, skill_pattern, TECHNICAL_SKILLS
+
+        rng = random.Random(11)
+        pieces = list(TECHNICAL_SKILLS) + ['google', 'javascripts', 'x', ' ', ', ', '.', '-', 'restful', '++']
+        native = SkillMatcher(TECHNICAL_SKILLS)
+        pure = SkillMatcher(TECHNICAL_SKILLS, native=False)
+        for _ in range(200):
+            text = ''.join(rng.choice(pieces) + rng.choice(['', ' ', '/']) for _ in range(rng.randint(1, 30)))
+            expected = {skill.lower() for skill in TECHNICAL_SKILLS if skill_pattern(skill).search(text.lower())}
+            assert set(native.find(text)) == expected, text
+            assert pure.find(text) == native.find(text), text
+
+    def test_user_matchers_are_cached(self):
+        """Test that the same skill list reuses its compiled matcher."""
+        from skill_matcher import matcher_for
+
+        assert matcher_for(['Python', 'Flask']) is matcher_for(['Python', 'Flask'])
+
+
+class TestExtraction:
+    """Test resume parsing on top of the taxonomy matcher."""
+
+    def test_taxonomy_skills_found_as_words(self):
+        """Test that skills are found once each and substrings of other words are not."""
+        from app import extract_skills_from_text
+
+        skills = extract_skills_from_text("Worked at Google on JavaScript, spaCy and PostgreSQL.\n")
+        assert 'Javascript' in skills
+        assert 'spaCy' in skills
+        assert 'Postgresql' in skills
+        assert 'Go' not in skills
+        assert 'Java' not in skills
+
+    def test_skills_section_fragments(self):
+        """Test that skills-section fragments are kept only when they relate to the taxonomy."""
+        from skill_matcher import is_taxonomy_fragment
+
+        assert is_taxonomy_fragment('flask')
+        assert is_taxonomy_fragment('tensor')  # part of tensorflow
+        assert is_taxonomy_fragment('python 3')
+        assert not is_taxonomy_fragment('leadership')
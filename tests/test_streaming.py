@@ -0,0 +1,79 @@
+"""
+Tests for streaming reads through server-side cursors.
+"""
+import json
+from unittest.mock import MagicMock, patch
+
+
+def _conn(rows):
+    """Connection whose (named) cursor iterates over `rows`."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.__iter__.side_effect = lambda: iter(rows)
+    return conn, cursor
+
+
+class TestStreamRows:
+    """Test the server-side cursor generator."""
+
+    def test_uses_named_cursor_with_itersize(self):
+        """Test that rows come from a named cursor fetched itersize at a time."""
+        from streaming import stream_rows
+
+        conn, cursor = _conn([(1,), (2,), (3,)])
+        assert list(stream_rows(conn, "SELECT jobid FROM jobs", itersize=500)) == [(1,), (2,), (3,)]
+
+        assert conn.cursor.call_args[1]['name'].startswith('stream_')
+        assert cursor.itersize == 500
+        cursor.execute.assert_called_once_with("SELECT jobid FROM jobs", ())
+        cursor.close.assert_called_once()
+
+    def test_nothing_runs_until_consumed(self):
+        """Test that the query is lazy and the cursor closes when the consumer stops early."""
+        from streaming import stream_rows
+
+        conn, cursor = _conn([(n,) for n in range(10)])
+        rows = stream_rows(conn, "SELECT jobid FROM jobs")
+        conn.cursor.assert_not_called()
+
+        assert next(rows) == (0,)
+        rows.close()
+        cursor.close.assert_called_once()
+
+    def test_batched_and_ndjson(self):
+        """Test the batching and serialization stages."""
+        from datetime import datetime
+        from streaming import batched, ndjson
+
+        assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+        lines = list(ndjson([{'jobid': 1, 'first_seen': datetime(2024, 1, 2)}]))
+        assert lines == ['{"jobid":1,"first_seen":"2024-01-02 00:00:00"}\n']
+
+
+class TestExportJobs:
+    """Test the streamed /jobs/export endpoint."""
+
+    def test_streams_ndjson_from_server_side_cursor(self, client):
+        """Test that jobs are streamed one JSON line each and the connection is returned."""
+        from app import app
+
+        rows = [{'jobid': 2, 'title': 'Python Dev', 'match_score': 50.0},
+                {'jobid': 1, 'title': 'Java Dev', 'match_score': 0}]
+        conn, cursor = _conn(rows)
+        app.config['LOGIN_DISABLED'] = True
+        try:
+            with patch('app.get_db_connection', return_value=conn), patch('app.current_user') as user:
+                user.id = 5
+                response = client.get('/jobs/export?location=Remote')
+                body = response.get_data(as_text=True)
+        finally:
+            app.config['LOGIN_DISABLED'] = False
+
+        assert response.mimetype == 'application/x-ndjson'
+        assert [json.loads(line)['jobid'] for line in body.splitlines()] == [2, 1]
+        sql, params = cursor.execute.call_args[0]
+        assert 'LEFT JOIN user_job_matches m' in sql
+        assert 'location_id = (SELECT id FROM locations WHERE name = %s)' in sql
+        assert params == [5, 'Remote']
+        assert 'name' in conn.cursor.call_args[1]
+        conn.close.assert_called_once()